@@ -4,23 +4,106 @@
 """
 
 import tkinter as tk
-from tkinter import ttk, scrolledtext, messagebox, filedialog, simpledialog
+from tkinter import ttk, scrolledtext, messagebox, filedialog
+import tkinter.font as tkfont
 import json
 import os
-import requests
+import io
 from datetime import datetime
 from typing import Dict, List, Any, Optional, Callable
 import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, Future
+from contextlib import contextmanager
+from collections import deque, OrderedDict
 import re
+import hashlib
 import traceback
-from dataclasses import dataclass, asdict, field
+from dataclasses import dataclass, field, fields
 from enum import Enum
+from itertools import islice
+from functools import lru_cache
 import logging
 
 # 配置日誌
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# orjson為選用依賴，未安裝時退回標準庫json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def json_dumps_bytes(obj: Any, indent: bool = True) -> bytes:
+    """序列化為UTF-8編碼的JSON位元組，適合直接以二進位模式寫檔"""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, option=option)
+    return json_dumps(obj, indent).encode("utf-8")
+
+def json_dumps(obj: Any, indent: bool = True) -> str:
+    """序列化為JSON字串（保留非ASCII字元），可用時使用orjson加速"""
+    if orjson is not None:
+        return json_dumps_bytes(obj, indent).decode("utf-8")
+    if indent:
+        return json.dumps(obj, ensure_ascii=False, indent=2)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+# orjson.JSONDecodeError 繼承自 json.JSONDecodeError，既有的例外處理不需修改
+json_loads = orjson.loads if orjson is not None else json.loads
+
+# 中日韓字元（大致每字1個token）
+_CJK_CHAR_PATTERN = re.compile(r'[\u3000-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uff00-\uffef]')
+
+def estimate_tokens(text: str) -> int:
+    """粗略估算文本的token數：中日韓字元約1字1token，其他字元約4字1token"""
+    if not text:
+        return 0
+    cjk_count = len(_CJK_CHAR_PATTERN.findall(text))
+    return cjk_count + (len(text) - cjk_count + 3) // 4
+
+# API預設配置（供設定對話框的快速套用按鈕使用）
+_PRESETS = {
+    "ollama": {
+        "provider": "custom",
+        "base_url": "http://localhost:11434/v1",
+        "model": "gemma3:12b-it-qat",
+        "description": "Ollama 本地模型服務"
+    },
+    "openai": {
+        "provider": "openai",
+        "base_url": "https://api.openai.com/v1",
+        "model": "gpt-4.1-mini-2025-04-14",
+        "description": "OpenAI 官方服務"
+    },
+    "anthropic": {
+        "provider": "anthropic",
+        "base_url": "https://api.anthropic.com",
+        "model": "claude-sonnet-4-20250514",
+        "description": "Anthropic Claude 服務"
+    },
+    "openrouter": {
+        "provider": "custom",
+        "base_url": "https://openrouter.ai/api/v1",
+        "model": "deepseek/deepseek-chat-v3-0324",
+        "description": "OpenRouter 聚合服務"
+    }
+}
+
+# 設定對話框下拉選單的固定選項
+_PROVIDERS = ("openai", "anthropic", "ollama", "lm-studio", "localai", "text-generation-webui", "vllm", "custom")
+_LANGUAGES = ("zh-TW", "zh-CN", "en-US", "ja-JP")
+
+@lru_cache(maxsize=8)
+def _format_preset_message(preset_type: str) -> str:
+    """產生套用預設配置後的提示訊息（預設配置固定不變，可直接快取）"""
+    preset = _PRESETS[preset_type]
+    return (f"已應用 {preset['description']} 的預設配置：\n\n"
+            f"API地址：{preset['base_url']}\n"
+            f"模型：{preset['model']}\n\n"
+            f"請確認設定後點擊保存。")
+
 class TaskType(Enum):
     """任務類型枚舉"""
     OUTLINE = "outline"
@@ -28,6 +111,7 @@ class TaskType(Enum):
     CHAPTER_OUTLINE = "chapter_outline"
     PARAGRAPHS = "paragraphs"
     WRITING = "writing"
+    BATCH_WRITING = "batch_writing"
     WORLD_BUILDING = "world_building"
 
 class CreationStatus(Enum):
@@ -37,6 +121,9 @@ class CreationStatus(Enum):
     COMPLETED = "已完成"
     ERROR = "錯誤"
 
+# 狀態值到枚舉成員的對照表，載入項目時直接查表
+_STATUS_BY_VALUE = {status.value: status for status in CreationStatus}
+
 class WritingStyle(Enum):
     """寫作風格枚舉"""
     FIRST_PERSON = "第一人稱"
@@ -51,6 +138,9 @@ class PacingStyle(Enum):
     BALANCED = "平衡型"
     EPISODIC = "章回體"
 
+# 風格顯示值到枚舉成員的對照表，供下拉選單事件直接查表
+_STYLE_BY_VALUE = {style.value: style for style in WritingStyle}
+
 @dataclass
 class APIConfig:
     """API配置數據類"""
@@ -71,7 +161,25 @@ class APIConfig:
     planning_provider: str = "openai"
     planning_api_key: str = ""
 
-@dataclass
+    # 世界設定提取模型（留空則使用對應端點的模型）
+    world_building_model: str = ""
+
+@lru_cache(maxsize=None)
+def _field_names(cls) -> tuple:
+    """數據類的欄位名稱（每個類別只需以 fields() 內省一次）"""
+    return tuple(f.name for f in fields(cls))
+
+def _api_config_to_dict(api_config: APIConfig) -> Dict[str, Any]:
+    """將API配置轉為可寫入文件的字典（欄位皆為純量，免去 asdict 的遞迴深拷貝）"""
+    return {name: getattr(api_config, name) for name in _field_names(api_config.__class__)}
+
+def _set_fields(obj: Any, values: Dict[str, Any]):
+    """略過 __init__，直接填入 slots 屬性（供 from_dict 使用）"""
+    set_attr = object.__setattr__
+    for name, value in values.items():
+        set_attr(obj, name, value)
+
+@dataclass(slots=True)
 class Paragraph:
     """段落數據類"""
     order: int
@@ -84,11 +192,70 @@ class Paragraph:
     status: CreationStatus = CreationStatus.NOT_STARTED
     word_count: int = 0
     
+    # token數快取，內容被替換時自動失效
+    _token_count_source: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    _token_count: int = field(default=0, init=False, repr=False, compare=False)
+    
+    # 樹視圖顯示文字快取，段落位置或目的改變時自動失效
+    _tree_label_key: Optional[tuple] = field(default=None, init=False, repr=False, compare=False)
+    _tree_label: str = field(default="", init=False, repr=False, compare=False)
+    
     def __post_init__(self):
         if self.key_points is None:
             self.key_points = []
+    
+    def get_token_count(self) -> int:
+        """獲取段落內容的估算token數（快取）"""
+        if self._token_count_source is not self.content:
+            self._token_count_source = self.content
+            self._token_count = estimate_tokens(self.content)
+        return self._token_count
+    
+    def get_tree_label(self, index: int) -> str:
+        """獲取段落在樹視圖中的顯示文字（快取）"""
+        key = self._tree_label_key
+        if key is None or key[0] != index or key[1] is not self.purpose:
+            self._tree_label_key = (index, self.purpose)
+            self._tree_label = f"📄 第{index+1}段: {self.purpose[:20]}..."
+        return self._tree_label
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Paragraph":
+        """從項目文件的字典重建段落（略過 __init__ 的參數處理，直接填入屬性）"""
+        get = data.get
+        paragraph = object.__new__(cls)
+        _set_fields(paragraph, {
+            "order": data["order"],
+            "purpose": data["purpose"],
+            "content_type": get("content_type", ""),
+            "key_points": get("key_points") or [],
+            "estimated_words": get("estimated_words", 0),
+            "mood": get("mood", ""),
+            "content": get("content", ""),
+            "status": _STATUS_BY_VALUE.get(get("status"), CreationStatus.NOT_STARTED),
+            "word_count": get("word_count", 0),
+            "_token_count_source": None,
+            "_token_count": 0,
+            "_tree_label_key": None,
+            "_tree_label": "",
+        })
+        return paragraph
+    
+    def to_dict(self) -> Dict:
+        """轉換為可序列化的字典（狀態直接轉為字符串，不經過asdict的深拷貝）"""
+        return {
+            "order": self.order,
+            "purpose": self.purpose,
+            "content_type": self.content_type,
+            "key_points": list(self.key_points),
+            "estimated_words": self.estimated_words,
+            "mood": self.mood,
+            "content": self.content,
+            "status": self.status.value,
+            "word_count": self.word_count,
+        }
 
-@dataclass
+@dataclass(slots=True)
 class Chapter:
     """章節數據類"""
     title: str
@@ -101,6 +268,15 @@ class Chapter:
     content: str = ""
     status: CreationStatus = CreationStatus.NOT_STARTED
     
+    # 大綱JSON字串快取，大綱物件被替換時自動失效
+    _outline_json_source: Optional[Dict] = field(default=None, init=False, repr=False, compare=False)
+    _outline_json_cache: Dict = field(default_factory=dict, init=False, repr=False, compare=False)
+    
+    # 段落統計快取：(段落列表, 段落修訂號, (總字數, 已完成段落數))
+    _paragraph_stats_cache: Optional[tuple] = field(default=None, init=False, repr=False, compare=False)
+    # 本章段落修訂號，段落被寫入、新增或刪除時由 mark_paragraphs_changed 遞增
+    _paragraph_revision: int = field(default=0, init=False, repr=False, compare=False)
+    
     def __post_init__(self):
         if self.key_events is None:
             self.key_events = []
@@ -110,8 +286,80 @@ class Chapter:
             self.outline = {}
         if self.paragraphs is None:
             self.paragraphs = []
+    
+    def mark_paragraphs_changed(self):
+        """段落內容、狀態或增刪變更後調用，只使本章的段落統計快取失效"""
+        self._paragraph_revision += 1
+    
+    def get_paragraph_stats(self) -> tuple:
+        """獲取 (總字數, 已完成段落數)，段落未變動時直接返回快取"""
+        paragraphs = self.paragraphs
+        revision = self._paragraph_revision
+        cache = self._paragraph_stats_cache
+        if cache is not None and cache[0] is paragraphs and cache[1] == revision:
+            return cache[2]
+        
+        total_words = 0
+        completed_count = 0
+        for paragraph in paragraphs:
+            total_words += paragraph.word_count
+            if paragraph.status == CreationStatus.COMPLETED:
+                completed_count += 1
+        
+        stats = (total_words, completed_count)
+        self._paragraph_stats_cache = (paragraphs, revision, stats)
+        return stats
+    
+    def get_outline_json(self, indent: bool = True) -> str:
+        """獲取章節大綱的JSON字串（快取）"""
+        if self._outline_json_source is not self.outline:
+            self._outline_json_source = self.outline
+            self._outline_json_cache = {}
+        
+        outline_json = self._outline_json_cache.get(indent)
+        if outline_json is None:
+            outline_json = json_dumps(self.outline, indent=indent)
+            self._outline_json_cache[indent] = outline_json
+        return outline_json
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Chapter":
+        """從項目文件的字典重建章節及其段落（略過 __init__ 的參數處理）"""
+        get = data.get
+        paragraph_from_dict = Paragraph.from_dict
+        chapter = object.__new__(cls)
+        _set_fields(chapter, {
+            "title": data["title"],
+            "summary": data["summary"],
+            "key_events": get("key_events") or [],
+            "characters_involved": get("characters_involved") or [],
+            "estimated_words": get("estimated_words", 3000),
+            "outline": get("outline") or {},
+            "paragraphs": [paragraph_from_dict(para_data) for para_data in get("paragraphs", [])],
+            "content": get("content", ""),
+            "status": _STATUS_BY_VALUE.get(get("status"), CreationStatus.NOT_STARTED),
+            "_outline_json_source": None,
+            "_outline_json_cache": {},
+            "_paragraph_stats_cache": None,
+            "_paragraph_revision": 0,
+        })
+        return chapter
+    
+    def to_dict(self) -> Dict:
+        """轉換為可序列化的字典（含所有段落）"""
+        return {
+            "title": self.title,
+            "summary": self.summary,
+            "key_events": list(self.key_events),
+            "characters_involved": list(self.characters_involved),
+            "estimated_words": self.estimated_words,
+            "outline": dict(self.outline),
+            "paragraphs": [paragraph.to_dict() for paragraph in self.paragraphs],
+            "content": self.content,
+            "status": self.status.value,
+        }
 
-@dataclass
+@dataclass(slots=True)
 class WorldBuilding:
     """世界設定數據類"""
     characters: Dict[str, str] = None
@@ -122,6 +370,11 @@ class WorldBuilding:
     style_guide: str = ""
     chapter_notes: List[str] = None  # 新增：章節註記，記錄各項設定出現的章節
     
+    # 情節點集合鏡像，用於O(1)去重；列表被替換或由其他路徑修改時重建
+    _plot_set: set = field(default_factory=set, init=False, repr=False, compare=False)
+    _plot_set_source: Optional[List[str]] = field(default=None, init=False, repr=False, compare=False)
+    _plot_set_size: int = field(default=0, init=False, repr=False, compare=False)
+    
     def __post_init__(self):
         if self.characters is None:
             self.characters = {}
@@ -135,6 +388,33 @@ class WorldBuilding:
             self.relationships = []
         if self.chapter_notes is None:
             self.chapter_notes = []
+    
+    def add_plot_point(self, plot: str) -> bool:
+        """新增情節點（自動去重），返回是否實際新增"""
+        if self._plot_set_source is not self.plot_points or self._plot_set_size != len(self.plot_points):
+            self._plot_set = set(self.plot_points)
+            self._plot_set_source = self.plot_points
+            self._plot_set_size = len(self.plot_points)
+        
+        if plot in self._plot_set:
+            return False
+        
+        self.plot_points.append(plot)
+        self._plot_set.add(plot)
+        self._plot_set_size = len(self.plot_points)
+        return True
+    
+    def to_dict(self) -> Dict:
+        """轉換為可序列化的字典（淺拷貝容器，不含內部快取屬性）"""
+        return {
+            "characters": dict(self.characters),
+            "settings": dict(self.settings),
+            "terminology": dict(self.terminology),
+            "plot_points": list(self.plot_points),
+            "relationships": [dict(relation) for relation in self.relationships],
+            "style_guide": self.style_guide,
+            "chapter_notes": list(self.chapter_notes),
+        }
 
 @dataclass
 class GlobalWritingConfig:
@@ -200,6 +480,22 @@ class NovelProject:
             self.api_config = APIConfig()
         if self.global_config is None:
             self.global_config = GlobalWritingConfig()
+    
+    def get_total_word_count(self) -> int:
+        """全書總字數（累加各章快取的段落字數，不重新計算內容長度）"""
+        return sum(chapter.get_paragraph_stats()[0] for chapter in self.chapters)
+    
+    def to_dict(self) -> Dict:
+        """轉換為項目文件格式的字典（API與寫作配置另行保存）"""
+        return {
+            "title": self.title,
+            "theme": self.theme,
+            "outline": self.outline,
+            "outline_additional_prompt": self.outline_additional_prompt,
+            "chapters_additional_prompt": self.chapters_additional_prompt,
+            "chapters": [chapter.to_dict() for chapter in self.chapters],
+            "world_building": self.world_building.to_dict(),
+        }
 
 class APIException(Exception):
     """API相關異常"""
@@ -231,13 +527,40 @@ def safe_execute(func: Callable) -> Callable:
 class APIConnector:
     """LLM API連接器 - 重構版"""
     
+    # 連線池大小，需涵蓋執行緒池中同時進行的API調用
+    HTTP_POOL_SIZE = 8
+    
     def __init__(self, config: APIConfig, debug_callback: Callable = None):
         self.config = config
         self.debug_callback = debug_callback or (lambda x: None)
         
+        # 共用 Session 以保持連線（keep-alive），首次API調用時才建立
+        self._session = None
+        self._session_lock = threading.Lock()
+    
+    @property
+    def session(self):
+        """共用的 requests.Session；requests 及其依賴載入較慢，延後到首次調用才匯入，縮短啟動時間"""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+                    
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=self.HTTP_POOL_SIZE, pool_maxsize=self.HTTP_POOL_SIZE)
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    self._session = session
+        return self._session
+        
     def call_api(self, messages: List[Dict], max_tokens: int = 2000, 
-                temperature: float = 0.7, use_planning_model: bool = False) -> Dict:
-        """調用LLM API with retry logic"""
+                temperature: float = 0.7, use_planning_model: bool = False,
+                token_callback: Callable = None, model_override: str = "") -> Dict:
+        """調用LLM API with retry logic，提供token_callback時以串流模式接收回應
+        
+        model_override 非空時沿用所選端點，但改用指定的模型名稱。
+        """
         
         # 根據是否使用規劃模型選擇配置
         if use_planning_model and self.config.use_planning_model:
@@ -252,16 +575,22 @@ class APIConnector:
             base_url = self.config.base_url
             model = self.config.model
         
+        if model_override:
+            model = model_override
+        
+        # 重試判斷需要 requests 的例外類型，與 Session 一樣延後到首次調用才匯入
+        import requests
+        
         for attempt in range(self.config.max_retries):
             try:
                 logger.info(f"API調用嘗試 {attempt + 1}/{self.config.max_retries} (模型: {model})")
                 
                 if provider == "openai":
-                    return self._call_openai_api(messages, max_tokens, temperature, api_key, base_url, model)
+                    return self._call_openai_api(messages, max_tokens, temperature, api_key, base_url, model, token_callback)
                 elif provider == "anthropic":
-                    return self._call_anthropic_api(messages, max_tokens, temperature, api_key, base_url, model)
+                    return self._call_anthropic_api(messages, max_tokens, temperature, api_key, base_url, model, token_callback)
                 elif provider == "custom":
-                    return self._call_custom_api(messages, max_tokens, temperature, api_key, base_url, model)
+                    return self._call_custom_api(messages, max_tokens, temperature, api_key, base_url, model, token_callback)
                 else:
                     raise APIException(f"不支持的API提供商: {provider}")
                     
@@ -274,7 +603,8 @@ class APIConnector:
                 raise APIException(f"API調用錯誤: {str(e)}")
     
     def _call_openai_api(self, messages: List[Dict], max_tokens: int, 
-                        temperature: float, api_key: str, base_url: str, model: str) -> Dict:
+                        temperature: float, api_key: str, base_url: str, model: str,
+                        token_callback: Callable = None) -> Dict:
         """調用OpenAI格式API"""
         headers = {
             "Authorization": f"Bearer {api_key}",
@@ -292,7 +622,12 @@ class APIConnector:
         if self.config.disable_thinking:
             data["thinking"] = False
         
-        response = requests.post(
+        if token_callback:
+            data["stream"] = True
+            return self._stream_response(f"{base_url}/chat/completions", headers, data, model,
+                                         self._extract_openai_delta, token_callback)
+        
+        response = self.session.post(
             f"{base_url}/chat/completions",
             headers=headers,
             json=data,
@@ -310,7 +645,8 @@ class APIConnector:
             raise APIException(f"API調用失敗: {response.status_code} {response.text}")
     
     def _call_anthropic_api(self, messages: List[Dict], max_tokens: int, 
-                           temperature: float, api_key: str, base_url: str, model: str) -> Dict:
+                           temperature: float, api_key: str, base_url: str, model: str,
+                           token_callback: Callable = None) -> Dict:
         """調用Anthropic API"""
         headers = {
             "x-api-key": api_key,
@@ -334,7 +670,12 @@ class APIConnector:
         if system_message:
             data["system"] = system_message
         
-        response = requests.post(
+        if token_callback:
+            data["stream"] = True
+            return self._stream_response(f"{base_url}/messages", headers, data, model,
+                                         self._extract_anthropic_delta, token_callback)
+        
+        response = self.session.post(
             f"{base_url}/messages",
             headers=headers,
             json=data,
@@ -352,13 +693,74 @@ class APIConnector:
             raise APIException(f"API調用失敗: {response.status_code} {response.text}")
     
     def _call_custom_api(self, messages: List[Dict], max_tokens: int, 
-                        temperature: float, api_key: str, base_url: str, model: str) -> Dict:
+                        temperature: float, api_key: str, base_url: str, model: str,
+                        token_callback: Callable = None) -> Dict:
         """調用自訂API"""
-        return self._call_openai_api(messages, max_tokens, temperature, api_key, base_url, model)
+        return self._call_openai_api(messages, max_tokens, temperature, api_key, base_url, model, token_callback)
+    
+    def _stream_response(self, url: str, headers: Dict, data: Dict, model: str,
+                         extract_delta: Callable, token_callback: Callable) -> Dict:
+        """以SSE串流接收回應，逐段回傳給token_callback"""
+        chunks = []
+        if isinstance(token_callback, JSONContentStream):
+            token_callback.begin()
+        
+        with self.session.post(url, headers=headers, json=data,
+                           timeout=self.config.timeout, stream=True) as response:
+            if response.status_code != 200:
+                raise APIException(f"API調用失敗: {response.status_code} {response.text}")
+            
+            for line in response.iter_lines():
+                # SSE事件行格式為 "data: {...}"，其餘行（event:、空行）略過
+                if not line.startswith(b"data:"):
+                    continue
+                payload = line[5:].strip()
+                if payload == b"[DONE]":
+                    break
+                try:
+                    event = json_loads(payload)
+                except json.JSONDecodeError:
+                    continue
+                
+                token = extract_delta(event)
+                if token:
+                    chunks.append(token)
+                    token_callback(token)
+        
+        return {
+            "content": "".join(chunks),
+            "usage": {},
+            "model": model
+        }
+    
+    @staticmethod
+    def _extract_openai_delta(event: Dict) -> str:
+        """從OpenAI格式的串流事件中取出文字"""
+        choices = event.get("choices") or [{}]
+        return (choices[0].get("delta") or {}).get("content") or ""
+    
+    @staticmethod
+    def _extract_anthropic_delta(event: Dict) -> str:
+        """從Anthropic格式的串流事件中取出文字"""
+        if event.get("type") == "content_block_delta":
+            return event.get("delta", {}).get("text", "")
+        return ""
 
 class TextFormatter:
     """文本格式化器"""
     
+    # 預編譯正則表達式，避免每次格式化時重新查找/編譯
+    _ENGLISH_QUOTE_PATTERN = re.compile(r'"([^"]*)"')
+    _CHINESE_QUOTE_PATTERN = re.compile(r'「([^」]*)」')
+    _SENTENCE_BREAK_PATTERN = re.compile(r'([。！？])([^」\n])')
+    _QUOTE_END_BREAK_PATTERN = re.compile(r'([」])([。！？])([^」\n])')
+    _AFTER_DIALOGUE_PATTERN = re.compile(r'([」])([^。！？\n][^」]*?[。！？])')
+    _DIALOGUE_TRADITIONAL_PATTERN = re.compile(r'([。！？])(\s*)([^」\n]*?)「')
+    _DIALOGUE_ENGLISH_PATTERN = re.compile(r'([。！？])(\s*)([^"\n]*?)"')
+    _EXTRA_BLANK_LINES_PATTERN = re.compile(r'\n{3,}')
+    _LINE_END_CHAR_PATTERN = re.compile(r'[a-zA-Z0-9\u4e00-\u9fff]$')
+    _LINE_END_PUNCTUATION = ('。', '！', '？', '」', '"')
+    
     @staticmethod
     def format_novel_content(content: str, use_traditional_quotes: bool = True) -> str:
         """格式化小說內容"""
@@ -367,13 +769,11 @@ class TextFormatter:
         
         # 統一引號
         if use_traditional_quotes:
-            # 將所有英文引號轉換為中文引號
-            content = re.sub(r'"([^"]*)"', r'「\1」', content)
-            content = re.sub(r'"([^"]*)"', r'「\1」', content)
-            content = re.sub(r'"([^"]*)"', r'「\1」', content)
+            # 將所有英文引號轉換為中文引號（一次替換即可配對所有引號）
+            content = TextFormatter._ENGLISH_QUOTE_PATTERN.sub(r'「\1」', content)
         else:
             # 將所有中文引號轉換為英文引號
-            content = re.sub(r'「([^」]*)」', r'"\1"', content)
+            content = TextFormatter._CHINESE_QUOTE_PATTERN.sub(r'"\1"', content)
         
         # 處理段落分行
         content = TextFormatter._format_paragraphs(content)
@@ -382,7 +782,7 @@ class TextFormatter:
         content = TextFormatter._format_dialogue(content, use_traditional_quotes)
         
         # 清理多餘的空行
-        content = re.sub(r'\n{3,}', '\n\n', content)
+        content = TextFormatter._EXTRA_BLANK_LINES_PATTERN.sub('\n\n', content)
         
         # 確保句子結尾有適當的標點
         content = TextFormatter._fix_punctuation(content)
@@ -393,13 +793,13 @@ class TextFormatter:
     def _format_paragraphs(content: str) -> str:
         """格式化段落分行"""
         # 在句號、感嘆號、問號後添加換行（如果後面不是換行的話）
-        content = re.sub(r'([。！？])([^」\n])', r'\1\n\n\2', content)
+        content = TextFormatter._SENTENCE_BREAK_PATTERN.sub(r'\1\n\n\2', content)
         
         # 在引號結束後如果有句號等，也要換行
-        content = re.sub(r'([」])([。！？])([^」\n])', r'\1\2\n\n\3', content)
+        content = TextFormatter._QUOTE_END_BREAK_PATTERN.sub(r'\1\2\n\n\3', content)
         
         # 處理對話後的描述
-        content = re.sub(r'([」])([^。！？\n][^」]*?[。！？])', r'\1\n\n\2', content)
+        content = TextFormatter._AFTER_DIALOGUE_PATTERN.sub(r'\1\n\n\2', content)
         
         return content
     
@@ -408,10 +808,10 @@ class TextFormatter:
         """格式化對話"""
         if use_traditional_quotes:
             # 確保對話前有適當的分行
-            content = re.sub(r'([。！？])(\s*)([^」\n]*?)「', r'\1\n\n\3「', content)
+            content = TextFormatter._DIALOGUE_TRADITIONAL_PATTERN.sub(r'\1\n\n\3「', content)
         else:
             # 確保對話前有適當的分行
-            content = re.sub(r'([。！？])(\s*)([^"\n]*?)"', r'\1\n\n\3"', content)
+            content = TextFormatter._DIALOGUE_ENGLISH_PATTERN.sub(r'\1\n\n\3"', content)
         
         return content
     
@@ -421,94 +821,207 @@ class TextFormatter:
         # 確保句子結尾有標點
         lines = content.split('\n')
         fixed_lines = []
+        line_end_char = TextFormatter._LINE_END_CHAR_PATTERN.search
         
         for line in lines:
             line = line.strip()
-            if line and not re.search(r'[。！？」"]$', line):
+            if line and not line.endswith(TextFormatter._LINE_END_PUNCTUATION):
                 # 如果行末沒有標點，添加句號
-                if re.search(r'[a-zA-Z0-9\u4e00-\u9fff]$', line):
+                if line_end_char(line):
                     line += '。'
             fixed_lines.append(line)
         
         return '\n'.join(fixed_lines)
 
+# JSON提取：優先使用的程式碼區塊（預先編譯）
+_JSON_FENCE_PATTERN = re.compile(r'```(?:json)?\s*(.*?)\s*```', re.DOTALL)
+# 括號掃描只需要關心的結構字元，其餘文字由正則引擎直接跳過
+_JSON_STRUCTURAL_CHARS = re.compile(r'[{}"\\]')
+# raw_decode 從指定位置解析恰好一個JSON值並返回結束位置，括號與字串的比對都在C中完成
+_JSON_DECODER = json.JSONDecoder()
+
+def extract_json_from_content(content: str) -> Optional[Dict]:
+    """從內容中提取JSON：優先採用 ```json 程式碼區塊，其次才在全文中尋找物件"""
+    for match in _JSON_FENCE_PATTERN.findall(content):
+        result = _load_json_object(_clean_json_string(match.strip()))
+        if result:
+            return result
+    
+    # 從每個 { 直接解碼一個物件；解碼失敗時以括號掃描跳過該段，再找下一個
+    pos = content.find('{')
+    while pos != -1:
+        try:
+            result, end = _JSON_DECODER.raw_decode(content, pos)
+        except json.JSONDecodeError:
+            candidate = _find_first_balanced_object(content, pos)
+            if candidate is None:
+                break
+            end = pos + len(candidate)
+        else:
+            if result:
+                return result
+        pos = content.find('{', end)
+    
+    return None
+
+def _find_first_balanced_object(content: str, start: int = 0) -> Optional[str]:
+    """從 start 起找出第一個括號平衡的 {...} 片段（略過字串內的括號）"""
+    begin = content.find('{', start)
+    if begin == -1:
+        return None
+    
+    depth = 0
+    in_string = False
+    escaped_pos = -1
+    for match in _JSON_STRUCTURAL_CHARS.finditer(content, begin):
+        i = match.start()
+        char = content[i]
+        if in_string:
+            if i == escaped_pos:
+                continue
+            if char == '\\':
+                escaped_pos = i + 1
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                return content[begin:i + 1]
+    
+    return None
+
+def _load_json_object(json_str: str) -> Optional[Dict]:
+    """解析JSON字串，只接受非空的物件"""
+    try:
+        result = json_loads(json_str)
+    except json.JSONDecodeError:
+        return None
+    return result if isinstance(result, dict) and result else None
+
+def _clean_json_string(json_str: str) -> str:
+    """清理JSON字符串"""
+    json_str = json_str.lstrip('\ufeff').strip()
+    
+    start_brace = json_str.find('{')
+    if start_brace != -1:
+        json_str = json_str[start_brace:]
+    
+    end_brace = json_str.rfind('}')
+    if end_brace != -1:
+        json_str = json_str[:end_brace + 1]
+    
+    return json_str
+
 class JSONParser:
-    """JSON解析器 - 重構版"""
+    """JSON解析器 - 實作為模組層級函數，保留類別介面供既有調用"""
+    extract_json_from_content = staticmethod(extract_json_from_content)
+    _find_first_balanced_object = staticmethod(_find_first_balanced_object)
+    _load_json_object = staticmethod(_load_json_object)
+    _clean_json_string = staticmethod(_clean_json_string)
+
+class JSONContentStream:
+    """串流顯示轉接器：只把JSON回應中指定字串欄位的文字（已解碼跳脫字元）轉交給 emit
     
-    @staticmethod
-    def extract_json_from_content(content: str) -> Optional[Dict]:
-        """從內容中提取JSON"""
-        strategies = [
-            (r'```json\s*(.*?)\s*```', re.DOTALL),
-            (r'```\s*(\{.*?\})\s*```', re.DOTALL),
-            (r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}', re.DOTALL),
-        ]
-        
-        for pattern, flags in strategies:
-            matches = re.findall(pattern, content, flags)
-            
-            for match in matches:
-                json_str = match.strip() if isinstance(match, str) else match
-                json_str = JSONParser._clean_json_string(json_str)
-                
-                try:
-                    result = json.loads(json_str)
-                    if isinstance(result, dict) and result:
-                        return result
-                except json.JSONDecodeError:
-                    continue
-        
-        return JSONParser._attempt_json_repair(content)
+    寫作類任務要求模型輸出 {"content": "..."}，直接顯示串流片段會看到原始JSON與思考文字。
+    每次發出請求（含重試）前由 APIConnector 調用 begin()，重置解析狀態並通知顯示端清空。
+    """
     
-    @staticmethod
-    def _clean_json_string(json_str: str) -> str:
-        """清理JSON字符串"""
-        json_str = json_str.lstrip('\ufeff').strip()
-        
-        start_brace = json_str.find('{')
-        if start_brace != -1:
-            json_str = json_str[start_brace:]
+    _ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+    
+    def __init__(self, emit: Callable[[str], None], reset: Callable[[], None] = None, field: str = "content"):
+        self._emit = emit
+        self._reset = reset
+        self._field_pattern = re.compile(r'"%s"\s*:\s*"' % re.escape(field))
+        self.begin()
+    
+    def begin(self):
+        """新的請求開始：重置解析狀態，並通知顯示端清除上一次嘗試的內容"""
+        self._pending = ""
+        self._in_value = False
+        self._done = False
+        if self._reset:
+            self._reset()
+    
+    def __call__(self, chunk: str):
+        if self._done:
+            return
         
-        end_brace = json_str.rfind('}')
-        if end_brace != -1:
-            json_str = json_str[:end_brace + 1]
+        text = self._pending + chunk
+        self._pending = ""
+        if not self._in_value:
+            match = self._field_pattern.search(text)
+            if match is None:
+                # 保留結尾片段，欄位名稱可能被切在兩個片段之間
+                self._pending = text[-64:]
+                return
+            self._in_value = True
+            text = text[match.end():]
         
-        return json_str
+        decoded = self._decode(text)
+        if decoded:
+            self._emit(decoded)
     
-    @staticmethod
-    def _attempt_json_repair(content: str) -> Optional[Dict]:
-        """嘗試修復損壞的JSON"""
-        json_start = content.find('{')
-        if json_start == -1:
-            return None
-        
-        json_part = content[json_start:]
-        brace_count = 0
-        valid_end = -1
-        
-        for i, char in enumerate(json_part):
-            if char == '{':
-                brace_count += 1
-            elif char == '}':
-                brace_count -= 1
-                if brace_count == 0:
-                    valid_end = i + 1
+    def _decode(self, text: str) -> str:
+        """解碼字串值的一段內容，遇到結尾引號即停止；不完整的跳脫序列留待下一個片段"""
+        parts = []
+        start = 0
+        length = len(text)
+        while True:
+            i = text.find('\\', start)
+            quote = text.find('"', start)
+            if quote != -1 and (i == -1 or quote < i):
+                parts.append(text[start:quote])
+                self._done = True
+                break
+            if i == -1:
+                parts.append(text[start:])
+                break
+            
+            parts.append(text[start:i])
+            if i + 1 >= length:
+                self._pending = text[i:]
+                break
+            code = text[i + 1]
+            if code == 'u':
+                if i + 6 > length:
+                    self._pending = text[i:]
                     break
-        
-        if valid_end > 0:
-            repaired_json = json_part[:valid_end]
-            try:
-                return json.loads(repaired_json)
-            except json.JSONDecodeError:
-                pass
-        
-        return None
+                try:
+                    char_code = int(text[i + 2:i + 6], 16)
+                except ValueError:
+                    char_code = None
+                start = i + 6
+                if char_code is not None and 0xD800 <= char_code <= 0xDBFF:
+                    # UTF-16 代理對需與下一個 \uXXXX 合併成一個字元
+                    if i + 12 > length:
+                        self._pending = text[i:]
+                        break
+                    if text[i + 6:i + 8] == '\\u':
+                        try:
+                            low = int(text[i + 8:i + 12], 16)
+                        except ValueError:
+                            low = 0
+                        if 0xDC00 <= low <= 0xDFFF:
+                            char_code = 0x10000 + ((char_code - 0xD800) << 10) + (low - 0xDC00)
+                            start = i + 12
+                if char_code is not None:
+                    parts.append(chr(char_code))
+            else:
+                parts.append(self._ESCAPES.get(code, code))
+                start = i + 2
+        return "".join(parts)
 
 class DynamicPromptBuilder:
     """動態Prompt構建器"""
     
     def __init__(self, global_config: GlobalWritingConfig):
         self.global_config = global_config
+        # 全局配置變更時會建立新的構建器，只取決於全局配置的段落寫作風格區塊在此預先生成一次
+        self._style_block = self._build_style_block()
     
     def build_outline_prompt(self, title: str, theme: str, stage_config: StageSpecificConfig) -> str:
         """構建大綱生成prompt"""
@@ -589,6 +1102,40 @@ class DynamicPromptBuilder:
 
         return self._add_common_suffix(base_prompt, stage_config)
 
+    def _build_style_block(self) -> str:
+        """段落寫作共用的風格、持續主題與必要元素區塊"""
+        parts = [f"""【寫作風格】
+- 敘述方式：{self.global_config.writing_style.value}
+- 語調：{self.global_config.tone}
+- 對話風格：{self.global_config.dialogue_style}
+- 描述密度：{self.global_config.description_density}
+- 情感強度：{self.global_config.emotional_intensity}"""]
+
+        # 添加持續考慮事項
+        if self.global_config.continuous_themes:
+            parts.append(f"【持續主題】在寫作中請考慮體現：{', '.join(self.global_config.continuous_themes)}")
+
+        if self.global_config.must_include_elements:
+            parts.append(f"【必要元素】請適當融入：{', '.join(self.global_config.must_include_elements)}")
+
+        return "\n\n".join(parts)
+
+    def build_chapter_prefix(self, chapter: Chapter) -> str:
+        """構建同一章節各段寫作共用的prompt前綴（風格、持續主題與章節背景）
+        
+        前綴內容只取決於全局配置與章節本身，同章各段的prompt開頭因此逐字相同，
+        支援前綴快取的API伺服器可重用這部分的計算。
+        """
+        # 添加上下文
+        background = f"""【章節背景】
+- 章節標題：{chapter.title}
+- 章節目標：{chapter.summary}"""
+
+        if chapter.outline:
+            background += f"\n- 章節大綱：{chapter.get_outline_json(indent=False)}"
+
+        return f"{self._style_block}\n\n{background}"
+
     def build_paragraph_writing_prompt(self, context: Dict, stage_config: StageSpecificConfig, 
                                      selected_context: str = "") -> str:
         """構建段落寫作prompt - 最重要的改進"""
@@ -597,18 +1144,12 @@ class DynamicPromptBuilder:
         paragraph = context['paragraph']
         chapter = context['chapter']
         previous_content = context.get('previous_content', '')
+        chapter_prefix = context.get('chapter_prefix') or self.build_chapter_prefix(chapter)
         
         # 計算目標字數
         target_words = self._calculate_paragraph_words(paragraph.estimated_words, stage_config)
         
-        base_prompt = f"""請寫作第{chapter_index+1}章第{paragraph_index+1}段：
-
-【寫作風格】
-- 敘述方式：{self.global_config.writing_style.value}
-- 語調：{self.global_config.tone}
-- 對話風格：{self.global_config.dialogue_style}
-- 描述密度：{self.global_config.description_density}
-- 情感強度：{self.global_config.emotional_intensity}
+        task = f"""請寫作第{chapter_index+1}章第{paragraph_index+1}段：
 
 【段落任務】
 - 目的：{paragraph.purpose}
@@ -616,28 +1157,53 @@ class DynamicPromptBuilder:
 - 氛圍要求：{paragraph.mood}"""
 
         if paragraph.key_points:
-            base_prompt += f"\n- 要點：{', '.join(paragraph.key_points)}"
+            task += f"\n- 要點：{', '.join(paragraph.key_points)}"
 
-        # 添加持續考慮事項
-        if self.global_config.continuous_themes:
-            base_prompt += f"""
+        parts = [chapter_prefix, task]
 
-【持續主題】在寫作中請考慮體現：{', '.join(self.global_config.continuous_themes)}"""
+        # 用戶選中的參考內容
+        reference = selected_context.strip()
+        if reference:
+            parts.append(f"【特別參考】用戶指定參考內容，請與之保持一致：\n{reference}")
 
-        if self.global_config.must_include_elements:
-            base_prompt += f"""
+        # 前文內容
+        if previous_content:
+            parts.append(f"【前文內容】以下是前面的段落，請承接但不重複：\n{previous_content}")
 
-【必要元素】請適當融入：{', '.join(self.global_config.must_include_elements)}"""
+        # 篇幅控制指導
+        parts.append(f"【篇幅控制】\n{self._get_length_guidance(target_words, stage_config.length_preference)}")
 
-        # 添加上下文
-        base_prompt += f"""
+        return self._add_common_suffix("\n\n".join(parts), stage_config)
 
-【章節背景】
-- 章節標題：{chapter.title}
-- 章節目標：{chapter.summary}"""
+    def build_paragraph_batch_prompt(self, context: Dict, stage_config: StageSpecificConfig,
+                                     selected_context: str = "") -> str:
+        """構建批次段落寫作prompt - 共用的風格與背景只出現一次，各段任務以 [編號] 區分"""
+        chapter_index = context['chapter_index']
+        chapter = context['chapter']
+        paragraphs = context['paragraphs']  # [(段落索引, 段落), ...]
+        previous_content = context.get('previous_content', '')
+        chapter_prefix = context.get('chapter_prefix') or self.build_chapter_prefix(chapter)
+        
+        first_index = paragraphs[0][0]
+        last_index = paragraphs[-1][0]
+        base_prompt = f"""{chapter_prefix}
 
-        if chapter.outline:
-            base_prompt += f"\n- 章節大綱：{json.dumps(chapter.outline, ensure_ascii=False)}"
+請依序寫作第{chapter_index+1}章第{first_index+1}段至第{last_index+1}段，共{len(paragraphs)}段："""
+
+        # 各段落任務
+        word_count_instruction = self._get_word_count_instruction(stage_config.word_count_strict)
+        total_words = 0
+        for number, (paragraph_index, paragraph) in enumerate(paragraphs, 1):
+            target_words = self._calculate_paragraph_words(paragraph.estimated_words, stage_config)
+            total_words += target_words
+            base_prompt += f"""
+
+### [{number}] 第{paragraph_index+1}段
+- 目的：{paragraph.purpose}
+- 目標字數：{target_words}字（{word_count_instruction}）
+- 氛圍要求：{paragraph.mood}"""
+            if paragraph.key_points:
+                base_prompt += f"\n- 要點：{', '.join(paragraph.key_points)}"
 
         # 用戶選中的參考內容
         if selected_context.strip():
@@ -657,7 +1223,10 @@ class DynamicPromptBuilder:
         base_prompt += f"""
 
 【篇幅控制】
-{self._get_length_guidance(target_words, stage_config.length_preference)}"""
+各段分別符合上方的目標字數；全部段落合計{self._get_length_guidance(total_words, stage_config.length_preference)}
+
+【輸出要求】
+請在 paragraphs 陣列中按 [1] 至 [{len(paragraphs)}] 的順序各輸出一段，number 填寫對應編號。"""
 
         return self._add_common_suffix(base_prompt, stage_config)
 
@@ -736,6 +1305,7 @@ class PromptManager:
         TaskType.CHAPTER_OUTLINE: 6000,
         TaskType.PARAGRAPHS: 8000,
         TaskType.WRITING: 10000,
+        TaskType.BATCH_WRITING: 16000,
         TaskType.WORLD_BUILDING: 4000
     }
     
@@ -820,6 +1390,21 @@ JSON格式：
     "word_count": 實際字數
 }""",
             
+            TaskType.BATCH_WRITING: """
+結構要求：
+- 依編號順序寫作每一段，各段內容前後連貫
+- number 必須與任務中的 [編號] 一致
+JSON格式：
+{
+    "paragraphs": [
+        {
+            "number": 1,
+            "content": "完整的段落內容",
+            "word_count": 實際字數
+        }
+    ]
+}""",
+            
             TaskType.WORLD_BUILDING: """
 JSON格式：
 {
@@ -846,13 +1431,23 @@ class LLMService:
         self.json_retry_max = 3  # JSON解析重試次數
     
     def call_llm_with_thinking(self, prompt: str, task_type: TaskType, 
-                              max_tokens: int = None, use_planning_model: bool = False) -> Optional[Dict]:
-        """使用thinking模式調用LLM，包含JSON解析重試機制"""
+                              max_tokens: int = None, use_planning_model: bool = False,
+                              token_callback: Callable = None) -> Optional[Dict]:
+        """使用thinking模式調用LLM，包含JSON解析重試機制
+        
+        提供token_callback時以串流模式調用，每收到一段文字即回調一次，
+        完整回應仍在串流結束後統一解析JSON。
+        """
         if max_tokens is None:
             max_tokens = PromptManager.get_token_limit(task_type)
         
         system_prompt = PromptManager.create_system_prompt(task_type)
         
+        # 世界設定提取屬於分類式任務，可改用較輕量的模型
+        model_override = ""
+        if task_type == TaskType.WORLD_BUILDING:
+            model_override = getattr(self.api_connector.config, 'world_building_model', "")
+        
         messages = [
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": prompt}
@@ -866,7 +1461,8 @@ class LLMService:
             try:
                 self.debug_callback(f"📤 正在調用API... (JSON解析嘗試 {json_attempt + 1}/{self.json_retry_max})")
                 
-                result = self.api_connector.call_api(messages, max_tokens, use_planning_model=use_planning_model)
+                result = self.api_connector.call_api(messages, max_tokens, use_planning_model=use_planning_model,
+                                                     token_callback=token_callback, model_override=model_override)
                 content = result.get("content", "")
                 
                 self.debug_callback(f"✅ API調用成功，回應長度: {len(content)} 字符")
@@ -878,11 +1474,11 @@ class LLMService:
                 
                 self.debug_callback(f"📝 API完整回應:\n{content}")
                 
-                json_data = JSONParser.extract_json_from_content(content)
+                json_data = extract_json_from_content(content)
                 
                 if json_data:
                     self.debug_callback("✅ JSON解析成功")
-                    self.debug_callback(f"📋 解析結果:\n{json.dumps(json_data, ensure_ascii=False, indent=2)}")
+                    self.debug_callback(f"📋 解析結果:\n{json_dumps(json_data)}")
                     return json_data
                 else:
                     self.debug_callback(f"❌ JSON解析失敗 (嘗試 {json_attempt + 1}/{self.json_retry_max})")
@@ -1017,15 +1613,66 @@ class LLMService:
             logger.debug(f"提取思考內容時發生錯誤: {str(e)}")
             return None
 
+def _build_language_instruction(language: str, use_traditional_quotes: bool) -> str:
+    """構建寫作語言指令"""
+    language_instructions = {
+        "zh-TW": "請使用繁體中文寫作",
+        "zh-CN": "請使用簡體中文寫作", 
+        "en-US": "Please write in English",
+        "ja-JP": "日本語で書いてください"
+    }
+    
+    base_instruction = language_instructions.get(language, "請使用繁體中文寫作")
+    
+    if language.startswith("zh"):  # 中文
+        if use_traditional_quotes:
+            quote_instruction = "，對話請使用中文引號「」格式"
+        else:
+            quote_instruction = "，對話請使用英文引號\"\"格式"
+    else:  # 其他語言
+        quote_instruction = ', use appropriate quotation marks for dialogue'
+    
+    formatting_instruction = "。請確保內容分段清晰，每個句子後適當換行，避免所有文字擠在一起。" if language.startswith("zh") else ". Please ensure clear paragraph breaks and proper line spacing."
+    
+    return base_instruction + quote_instruction + formatting_instruction
+
 class NovelWriterCore:
     """小說編寫器核心邏輯"""
     
+    # 預先展開所有已知語言與引號組合的語言指令
+    _LANGUAGE_INSTRUCTIONS = {
+        (language, use_traditional_quotes): _build_language_instruction(language, use_traditional_quotes)
+        for language in ("zh-TW", "zh-CN", "en-US", "ja-JP")
+        for use_traditional_quotes in (True, False)
+    }
+    
+    # 前文段落的token預算
+    PREVIOUS_CONTENT_TOKEN_BUDGET = 1500
+    # 寫作prompt的估算token上限，超出時縮短用戶參考內容，避免請求送出後才被伺服器拒絕
+    PROMPT_TOKEN_BUDGET = 12000
+    # 段落寫作結果快取的最大筆數
+    WRITE_CACHE_SIZE = 64
+    
     def __init__(self, project: NovelProject, llm_service: LLMService):
         self.project = project
         self.llm_service = llm_service
         self.current_chapter = 0
         self.current_paragraph = 0
         
+        # 世界設定字串快取，以 (版本號, 字串) 保存，版本號變動即失效
+        self._world_version = 0
+        self._world_context_cache: Optional[tuple] = None
+        self._world_summary_cache: Optional[tuple] = None
+        # 自動寫作時下一章的準備與本章的段落寫作會並行，世界設定的讀寫需互斥
+        self._world_lock = threading.RLock()
+        
+        # 段落寫作結果快取：(章節索引, 段落索引, prompt摘要) -> LLM回應中的 content/word_count
+        self._write_cache: OrderedDict = OrderedDict()
+        self._write_cache_lock = threading.Lock()
+        
+        # 各章段落寫作共用的prompt前綴：章節索引 -> (章節, 標題, 摘要, 大綱, 前綴)
+        self._chapter_prefix: Dict[int, tuple] = {}
+        
         # 初始化動態Prompt構建器
         self.prompt_builder = DynamicPromptBuilder(self.project.global_config)
         
@@ -1037,6 +1684,55 @@ class NovelWriterCore:
             TaskType.PARAGRAPHS: StageSpecificConfig(),
             TaskType.WRITING: StageSpecificConfig(),
         }
+        self._writing_stage_config = self.stage_configs[TaskType.WRITING]
+        
+        self.refresh_language_settings()
+    
+    def refresh_language_settings(self):
+        """從API配置讀取語言和引號設定，API配置變更後需重新調用"""
+        api_config = self.project.api_config
+        self._use_traditional_quotes = getattr(api_config, 'use_traditional_quotes', True)
+        self._language_instruction = self._get_language_instruction(
+            getattr(api_config, 'language', 'zh-TW'), self._use_traditional_quotes
+        )
+    
+    def invalidate_world_cache(self):
+        """世界設定變動後使快取失效"""
+        self._world_version += 1
+    
+    def invalidate_write_cache(self, chapter_index: Optional[int] = None, paragraph_index: Optional[int] = None):
+        """清除段落寫作快取，未指定索引時清除全部"""
+        with self._write_cache_lock:
+            if chapter_index is None:
+                self._write_cache.clear()
+                return
+            stale = [key for key in self._write_cache
+                     if key[0] == chapter_index and (paragraph_index is None or key[1] == paragraph_index)]
+            for key in stale:
+                del self._write_cache[key]
+    
+    def invalidate_prefix(self, chapter_index: Optional[int] = None):
+        """清除章節prompt前綴快取，未指定索引時清除全部"""
+        if chapter_index is None:
+            self._chapter_prefix.clear()
+        else:
+            self._chapter_prefix.pop(chapter_index, None)
+    
+    def _get_chapter_prefix(self, chapter_index: int, chapter: Chapter) -> str:
+        """取得章節共用的prompt前綴，章節物件、標題、摘要或大綱被替換時重新構建"""
+        cached = self._chapter_prefix.get(chapter_index)
+        if (cached is not None and cached[0] is chapter and cached[1] == chapter.title
+                and cached[2] == chapter.summary and cached[3] is chapter.outline):
+            return cached[4]
+        
+        prefix = self.prompt_builder.build_chapter_prefix(chapter)
+        self._chapter_prefix[chapter_index] = (chapter, chapter.title, chapter.summary, chapter.outline, prefix)
+        return prefix
+    
+    @property
+    def world_version(self) -> int:
+        """世界設定版本號，每次變動遞增"""
+        return self._world_version
     
     def set_global_config(self, **kwargs):
         """設置全局配置"""
@@ -1046,6 +1742,7 @@ class NovelWriterCore:
         
         # 重新初始化prompt構建器
         self.prompt_builder = DynamicPromptBuilder(self.project.global_config)
+        self.invalidate_prefix()
     
     def set_stage_config(self, task_type: TaskType, **kwargs):
         """設置階段特定配置"""
@@ -1076,7 +1773,7 @@ class NovelWriterCore:
         result = self.llm_service.call_llm_with_thinking(prompt, TaskType.OUTLINE, use_planning_model=True)
         
         if result:
-            self.project.outline = json.dumps(result, ensure_ascii=False, indent=2)
+            self.project.outline = json_dumps(result)
             self._update_world_building_from_outline(result)
             
             # 通知樹視圖更新
@@ -1183,7 +1880,7 @@ class NovelWriterCore:
 基於以下章節大綱，請劃分出具體的段落：
 
 章節標題：{chapter.title}
-章節大綱：{json.dumps(chapter.outline, ensure_ascii=False, indent=2)}
+章節大綱：{chapter.get_outline_json()}
 
 請將章節劃分為適當數量的段落，每段都有明確的目的和內容重點。
         """
@@ -1214,8 +1911,13 @@ class NovelWriterCore:
         return []
     
     @safe_execute
-    def write_paragraph(self, chapter_index: int, paragraph_index: int, tree_callback: Callable = None, selected_context: str = "") -> str:
-        """寫作段落 - 使用動態Prompt構建器"""
+    def write_paragraph(self, chapter_index: int, paragraph_index: int, tree_callback: Callable = None, selected_context: str = "",
+                        token_callback: Callable = None, use_cache: bool = False) -> str:
+        """寫作段落 - 使用動態Prompt構建器
+        
+        use_cache=True 時，prompt（涵蓋額外指示、參考內容、目標字數與前文）與上次完全相同即直接重用上次結果；
+        重新生成、重試與自動寫作需要新的內容，維持預設的 False。
+        """
         if chapter_index >= len(self.project.chapters):
             raise ValueError("章節索引超出範圍")
         
@@ -1232,28 +1934,43 @@ class NovelWriterCore:
             'paragraph_index': paragraph_index,
             'paragraph': paragraph,
             'chapter': chapter,
-            'previous_content': self._get_previous_paragraphs_content(chapter_index, paragraph_index)
+            'previous_content': self._get_previous_paragraphs_content(chapter_index, paragraph_index),
+            'chapter_prefix': self._get_chapter_prefix(chapter_index, chapter)
         }
         
         # 構建動態prompt
-        stage_config = self.stage_configs[TaskType.WRITING]
-        prompt = self.prompt_builder.build_paragraph_writing_prompt(
-            context, stage_config, selected_context
+        prompt = self._build_writing_prompt(
+            self.prompt_builder.build_paragraph_writing_prompt, context, selected_context
         )
-        
-        # 獲取API配置中的語言和引號設定
-        language = getattr(self.project.api_config, 'language', 'zh-TW')
-        use_traditional_quotes = getattr(self.project.api_config, 'use_traditional_quotes', True)
-        
-        # 添加語言指示到prompt
-        language_instruction = self._get_language_instruction(language, use_traditional_quotes)
-        prompt = language_instruction + "\n\n" + prompt
-        
-        result = self.llm_service.call_llm_with_thinking(prompt, TaskType.WRITING, use_planning_model=False) # 寫作使用主要模型
+        use_traditional_quotes = self._use_traditional_quotes
+        
+        cache_key = (chapter_index, paragraph_index,
+                     hashlib.blake2b(prompt.encode("utf-8"), digest_size=16).hexdigest())
+        cached = None
+        if use_cache:
+            with self._write_cache_lock:
+                cached = self._write_cache.get(cache_key)
+                if cached is not None:
+                    self._write_cache.move_to_end(cache_key)
+        
+        if cached is not None:
+            logger.info(f"段落寫作命中快取：第{chapter_index+1}章第{paragraph_index+1}段")
+            result = dict(cached)
+        else:
+            result = self.llm_service.call_llm_with_thinking(prompt, TaskType.WRITING, use_planning_model=False, # 寫作使用主要模型
+                                                             token_callback=token_callback)
         
         if result and "content" in result:
             raw_content = result["content"]
             
+            # 空白內容不快取，避免重試時一直取回同樣的空結果
+            if cached is None and isinstance(raw_content, str) and raw_content.strip():
+                with self._write_cache_lock:
+                    self._write_cache[cache_key] = {key: result[key] for key in ("content", "word_count") if key in result}
+                    self._write_cache.move_to_end(cache_key)
+                    if len(self._write_cache) > self.WRITE_CACHE_SIZE:
+                        self._write_cache.popitem(last=False)
+            
             # 應用文本格式化
             formatted_content = TextFormatter.format_novel_content(
                 raw_content, use_traditional_quotes
@@ -1262,9 +1979,11 @@ class NovelWriterCore:
             paragraph.content = formatted_content
             paragraph.word_count = result.get("word_count", len(formatted_content))
             paragraph.status = CreationStatus.COMPLETED
+            chapter.mark_paragraphs_changed()
             
-            # 更新世界設定
-            self._update_world_building_from_content(formatted_content, chapter_index, paragraph_index)
+            # 更新世界設定（快取命中的內容先前已分析過）
+            if cached is None:
+                self._update_world_building_from_content(formatted_content, chapter_index, paragraph_index)
             
             # 通知樹視圖更新
             if tree_callback:
@@ -1274,6 +1993,76 @@ class NovelWriterCore:
         
         return ""
     
+    @safe_execute
+    def write_paragraphs_batch(self, chapter_index: int, paragraph_indices: List[int],
+                               tree_callback: Callable = None, selected_context: str = "") -> Dict[int, str]:
+        """批次寫作同一章節的多個段落 - 一次LLM調用生成多段，依編號拆回各段落
+        
+        返回 {段落索引: 格式化後的內容}，回應中缺少的段落不會出現在結果中。
+        """
+        if chapter_index >= len(self.project.chapters):
+            raise ValueError("章節索引超出範圍")
+        
+        chapter = self.project.chapters[chapter_index]
+        paragraph_indices = sorted(paragraph_indices)
+        
+        if not paragraph_indices:
+            return {}
+        if paragraph_indices[-1] >= len(chapter.paragraphs):
+            raise ValueError("段落索引超出範圍")
+        
+        entries = [(i, chapter.paragraphs[i]) for i in paragraph_indices]
+        
+        # 準備上下文（前文從批次的第一段往前取）
+        context = {
+            'chapter_index': chapter_index,
+            'chapter': chapter,
+            'paragraphs': entries,
+            'previous_content': self._get_previous_paragraphs_content(chapter_index, paragraph_indices[0]),
+            'chapter_prefix': self._get_chapter_prefix(chapter_index, chapter)
+        }
+        
+        prompt = self._build_writing_prompt(
+            self.prompt_builder.build_paragraph_batch_prompt, context, selected_context
+        )
+        
+        result = self.llm_service.call_llm_with_thinking(prompt, TaskType.BATCH_WRITING, use_planning_model=False)
+        items = result.get("paragraphs") if result else None
+        if not isinstance(items, list):
+            return {}
+        
+        use_traditional_quotes = self._use_traditional_quotes
+        written = {}
+        for position, item in enumerate(items):
+            if not isinstance(item, dict) or not item.get("content"):
+                continue
+            
+            # 依編號對應回段落，編號缺失或無效時按回應順序對應
+            number = item.get("number")
+            slot = number - 1 if isinstance(number, int) and 1 <= number <= len(entries) else position
+            if slot >= len(entries) or entries[slot][0] in written:
+                continue
+            
+            paragraph_index, paragraph = entries[slot]
+            formatted_content = TextFormatter.format_novel_content(item["content"], use_traditional_quotes)
+            
+            paragraph.content = formatted_content
+            paragraph.word_count = item.get("word_count", len(formatted_content))
+            paragraph.status = CreationStatus.COMPLETED
+            chapter.mark_paragraphs_changed()
+            written[paragraph_index] = formatted_content
+            
+            if tree_callback:
+                tree_callback("paragraph_written", {"chapter_index": chapter_index, "paragraph_index": paragraph_index, "content": formatted_content})
+        
+        # 整批內容只提取一次世界設定
+        if written:
+            first_written = min(written)
+            combined = "\n\n".join(written[i] for i in sorted(written))
+            self._update_world_building_from_content(combined, chapter_index, first_written)
+        
+        return written
+    
     def _update_world_building_from_outline(self, outline_data: Dict):
         """從大綱更新世界設定"""
         if "main_characters" in outline_data:
@@ -1286,6 +2075,8 @@ class NovelWriterCore:
         
         if "world_setting" in outline_data:
             self.project.world_building.settings["總體世界觀"] = outline_data["world_setting"]
+        
+        self.invalidate_world_cache()
     
     def _update_world_building_from_content(self, content: str, chapter_index: int = None, paragraph_index: int = None):
         """從內容更新世界設定"""
@@ -1326,164 +2117,299 @@ class NovelWriterCore:
                         else:
                             chapter_note = f"第{chapter_index+1}章"
                 
-                # 記錄有新增內容的標記
-                has_new_content = False
+                # 單次遍歷：更新設定的同時記錄新增項目名稱
+                with self._world_lock:
+                    world = self.project.world_building
+                    new_char_names = []
+                    new_setting_names = []
+                    new_term_names = []
+                    new_plot_count = 0
                 
-                # 更新角色
-                for char in result.get("new_characters", []):
-                    name = char.get("name", "")
-                    desc = char.get("desc", char.get("description", ""))
-                    if name and name not in self.project.world_building.characters:
-                        self.project.world_building.characters[name] = desc
-                        has_new_content = True
+                    # 更新角色
+                    for char in result.get("new_characters", []):
+                        name = char.get("name", "")
+                        desc = char.get("desc", char.get("description", ""))
+                        if name:
+                            known_count = len(world.characters)
+                            world.characters.setdefault(name, desc)
+                            if len(world.characters) != known_count:
+                                new_char_names.append(name)
                 
-                # 更新場景
-                for setting in result.get("new_settings", []):
-                    name = setting.get("name", "")
-                    desc = setting.get("desc", setting.get("description", ""))
-                    if name and name not in self.project.world_building.settings:
-                        self.project.world_building.settings[name] = desc
-                        has_new_content = True
+                    # 更新場景
+                    for setting in result.get("new_settings", []):
+                        name = setting.get("name", "")
+                        desc = setting.get("desc", setting.get("description", ""))
+                        if name:
+                            known_count = len(world.settings)
+                            world.settings.setdefault(name, desc)
+                            if len(world.settings) != known_count:
+                                new_setting_names.append(name)
                 
-                # 更新名詞
-                for term in result.get("new_terms", []):
-                    term_name = term.get("term", "")
-                    definition = term.get("def", term.get("definition", ""))
-                    if term_name and term_name not in self.project.world_building.terminology:
-                        self.project.world_building.terminology[term_name] = definition
-                        has_new_content = True
+                    # 更新名詞
+                    for term in result.get("new_terms", []):
+                        term_name = term.get("term", "")
+                        definition = term.get("def", term.get("definition", ""))
+                        if term_name:
+                            known_count = len(world.terminology)
+                            world.terminology.setdefault(term_name, definition)
+                            if len(world.terminology) != known_count:
+                                new_term_names.append(term_name)
                 
-                # 更新情節點
-                for plot in result.get("plot_points", []):
-                    if plot and plot not in self.project.world_building.plot_points:
-                        self.project.world_building.plot_points.append(plot)
-                        has_new_content = True
+                    # 更新情節點
+                    for plot in result.get("plot_points", []):
+                        if plot and world.add_plot_point(plot):
+                            new_plot_count += 1
                 
-                # 如果有新增內容且有章節信息，添加章節註記
-                if has_new_content and chapter_note:
-                    # 構建註記信息
-                    new_items = []
-                    if result.get("new_characters"):
-                        char_names = [char.get("name", "") for char in result.get("new_characters", []) if char.get("name", "")]
-                        if char_names:
-                            new_items.append(f"新增角色：{', '.join(char_names)}")
-                    
-                    if result.get("new_settings"):
-                        setting_names = [setting.get("name", "") for setting in result.get("new_settings", []) if setting.get("name", "")]
-                        if setting_names:
-                            new_items.append(f"新增場景：{', '.join(setting_names)}")
-                    
-                    if result.get("new_terms"):
-                        term_names = [term.get("term", "") for term in result.get("new_terms", []) if term.get("term", "")]
-                        if term_names:
-                            new_items.append(f"新增名詞：{', '.join(term_names)}")
-                    
-                    if result.get("plot_points"):
-                        new_items.append(f"新增情節點：{len(result.get('plot_points', []))}個")
+                    has_new_content = bool(new_char_names or new_setting_names or new_term_names or new_plot_count)
+                
+                    # 如果有新增內容且有章節信息，添加章節註記
+                    if has_new_content and chapter_note:
+                        # 構建註記信息
+                        new_items = []
+                        if new_char_names:
+                            new_items.append(f"新增角色：{', '.join(new_char_names)}")
+                        if new_setting_names:
+                            new_items.append(f"新增場景：{', '.join(new_setting_names)}")
+                        if new_term_names:
+                            new_items.append(f"新增名詞：{', '.join(new_term_names)}")
+                        if new_plot_count:
+                            new_items.append(f"新增情節點：{new_plot_count}個")
                     
-                    if new_items:
                         note_content = f"{chapter_note} - {'; '.join(new_items)}"
-                        self.project.world_building.chapter_notes.append(note_content)
+                        world.chapter_notes.append(note_content)
+                
+                    if has_new_content:
+                        self.invalidate_world_cache()
         
         except Exception as e:
             logger.warning(f"世界設定更新失敗: {str(e)}")
     
     def _get_world_context(self) -> str:
         """獲取世界設定上下文"""
-        world = self.project.world_building
-        context = []
-        
-        if world.characters:
-            context.append("人物設定：")
-            for name, desc in world.characters.items():
-                context.append(f"- {name}: {desc}")
+        version = self._world_version
+        if self._world_context_cache is not None and self._world_context_cache[0] == version:
+            return self._world_context_cache[1]
         
-        if world.settings:
-            context.append("場景設定：")
-            for name, desc in world.settings.items():
-                context.append(f"- {name}: {desc}")
+        world = self.project.world_building
+        sections = []
         
-        if world.terminology:
-            context.append("專有名詞：")
-            for term, desc in world.terminology.items():
-                context.append(f"- {term}: {desc}")
+        with self._world_lock:
+            if world.characters:
+                sections.append("人物設定：\n" + "\n".join(f"- {name}: {desc}" for name, desc in world.characters.items()))
+            
+            if world.settings:
+                sections.append("場景設定：\n" + "\n".join(f"- {name}: {desc}" for name, desc in world.settings.items()))
+            
+            if world.terminology:
+                sections.append("專有名詞：\n" + "\n".join(f"- {term}: {desc}" for term, desc in world.terminology.items()))
         
-        return "\n".join(context)
+        context = "\n".join(sections)
+        self._world_context_cache = (version, context)
+        return context
     
     def _get_world_summary(self) -> str:
         """獲取世界設定簡要總結"""
+        version = self._world_version
+        if self._world_summary_cache is not None and self._world_summary_cache[0] == version:
+            return self._world_summary_cache[1]
+        
         world = self.project.world_building
         summary = []
         
-        if world.characters:
-            char_names = list(world.characters.keys())
-            summary.append(f"已知角色：{', '.join(char_names[:10])}")
-        
-        if world.settings:
-            setting_names = list(world.settings.keys())
-            summary.append(f"已知場景：{', '.join(setting_names[:8])}")
+        with self._world_lock:
+            if world.characters:
+                summary.append(f"已知角色：{', '.join(islice(world.characters, 10))}")
+            
+            if world.settings:
+                summary.append(f"已知場景：{', '.join(islice(world.settings, 8))}")
+            
+            if world.terminology:
+                summary.append(f"已知名詞：{', '.join(islice(world.terminology, 8))}")
         
-        if world.terminology:
-            term_names = list(world.terminology.keys())
-            summary.append(f"已知名詞：{', '.join(term_names[:8])}")
+        world_summary = "\n".join(summary) if summary else "目前設定檔為空"
+        self._world_summary_cache = (version, world_summary)
+        return world_summary
+    
+    def _build_writing_prompt(self, build_prompt: Callable, context: Dict, selected_context: str) -> str:
+        """構建加上語言指示的寫作prompt，估算超出 PROMPT_TOKEN_BUDGET 時依序縮短用戶參考內容與前文
         
-        return "\n".join(summary) if summary else "目前設定檔為空"
+        兩者都縮短後仍超出上限時拋出 ValueError，不送出必定被拒絕的請求。
+        """
+        def build() -> str:
+            return self._language_instruction + "\n\n" + build_prompt(context, self._writing_stage_config, selected_context)
+        
+        prompt = build()
+        overflow = estimate_tokens(prompt) - self.PROMPT_TOKEN_BUDGET
+        
+        # 參考內容保留開頭部分
+        if overflow > 0 and selected_context:
+            original_length = len(selected_context)
+            while overflow > 0 and selected_context:
+                selected_context = self._trim_to_tokens(selected_context, estimate_tokens(selected_context) - overflow)
+                prompt = build()
+                overflow = estimate_tokens(prompt) - self.PROMPT_TOKEN_BUDGET
+            logger.warning(f"寫作prompt超出上限，參考內容由{original_length}字截短為{len(selected_context)}字")
+        
+        # 前文保留最接近本段的結尾部分
+        previous_content = context.get('previous_content', '')
+        if overflow > 0 and previous_content:
+            original_length = len(previous_content)
+            context = dict(context)
+            while overflow > 0 and previous_content:
+                previous_content = self._trim_to_tokens(
+                    previous_content, estimate_tokens(previous_content) - overflow, keep_end=True
+                )
+                context['previous_content'] = previous_content
+                prompt = build()
+                overflow = estimate_tokens(prompt) - self.PROMPT_TOKEN_BUDGET
+            logger.warning(f"寫作prompt超出上限，前文內容由{original_length}字截短為{len(previous_content)}字")
+        
+        if overflow > 0:
+            message = (f"寫作prompt估算約{self.PROMPT_TOKEN_BUDGET + overflow} tokens，超出上限{self.PROMPT_TOKEN_BUDGET}，"
+                       f"請縮短章節大綱、段落要點或額外指示")
+            logger.error(message)
+            raise ValueError(message)
+        
+        return prompt
+    
+    @staticmethod
+    def _trim_to_tokens(text: str, max_tokens: int, keep_end: bool = False) -> str:
+        """依平均每字token數截短文本至約 max_tokens，每次至少縮短一個字"""
+        if max_tokens <= 0:
+            return ""
+        keep_chars = min(len(text) - 1, len(text) * max_tokens // estimate_tokens(text))
+        if keep_chars <= 0:
+            return ""
+        return text[-keep_chars:] if keep_end else text[:keep_chars]
     
     def _get_previous_paragraphs_content(self, chapter_index: int, paragraph_index: int) -> str:
-        """獲取前面段落的內容"""
+        """獲取前面段落的內容，從最近的段落往前取，直到用完token預算"""
         chapter = self.project.chapters[chapter_index]
+        budget = self.PREVIOUS_CONTENT_TOKEN_BUDGET
+        used_tokens = 0
         content = []
         
-        # 只需要提供最近1-2個段落的完整內容
-        start_index = max(0, paragraph_index - 2)
-        
-        for i in range(start_index, paragraph_index):
+        # 最近一段一律完整提供（其長度已受寫作token上限約束），之後的段落在預算內才加入
+        for i in range(paragraph_index - 1, -1, -1):
             paragraph = chapter.paragraphs[i]
-            if paragraph.content:
-                content.append(f"===== 第{i+1}段（已完成）=====\n{paragraph.content}")
+            if not paragraph.content:
+                continue
+            
+            tokens = paragraph.get_token_count()
+            if content and used_tokens + tokens > budget:
+                break
+            
+            content.append(f"===== 第{i+1}段（已完成）=====\n{paragraph.content}")
+            used_tokens += tokens
+            if used_tokens >= budget:
+                break
         
+        content.reverse()
         return "\n\n".join(content)
     
     def _get_language_instruction(self, language: str, use_traditional_quotes: bool) -> str:
         """獲取語言指令"""
-        language_instructions = {
-            "zh-TW": "請使用繁體中文寫作",
-            "zh-CN": "請使用簡體中文寫作", 
-            "en-US": "Please write in English",
-            "ja-JP": "日本語で書いてください"
-        }
-        
-        base_instruction = language_instructions.get(language, "請使用繁體中文寫作")
-        
-        if language.startswith("zh"):  # 中文
-            if use_traditional_quotes:
-                quote_instruction = "，對話請使用中文引號「」格式"
-            else:
-                quote_instruction = "，對話請使用英文引號\"\"格式"
-        else:  # 其他語言
-            quote_instruction = ', use appropriate quotation marks for dialogue'
-        
-        formatting_instruction = "。請確保內容分段清晰，每個句子後適當換行，避免所有文字擠在一起。" if language.startswith("zh") else ". Please ensure clear paragraph breaks and proper line spacing."
-        
-        return base_instruction + quote_instruction + formatting_instruction
+        instruction = self._LANGUAGE_INSTRUCTIONS.get((language, use_traditional_quotes))
+        if instruction is None:
+            instruction = _build_language_instruction(language, use_traditional_quotes)
+        return instruction
 
 class NovelWriterGUI:
     """小說編寫器GUI - 重構版"""
     
+    # 世界設定文本解析：非空行（已去除首尾空白）與章節標題對應的欄位
+    _WORLD_LINE_PATTERN = re.compile(r'^[^\S\n]*(\S.*?)[^\S\n]*$', re.MULTILINE)
+    _WORLD_SECTIONS = {
+        "人物設定": "characters",
+        "場景設定": "settings",
+        "專有名詞": "terminology",
+        "重要情節點": "plot_points",
+        "章節註記": "chapter_notes",
+    }
+    
+    # 調試日誌寫入間隔（毫秒）
+    LOG_FLUSH_INTERVAL = 50
+    # 樹視圖刷新的合併延遲（毫秒）
+    TREE_REFRESH_DELAY = 100
+    # 調試日誌超過上限行數時，刪除最舊的行只保留最近的部分
+    DEBUG_LOG_MAX_LINES = 3000
+    # 批次寫作時單次LLM調用合併的段落數
+    BATCH_WRITE_SIZE = 4
+    # 「寫作全部空白段落」同時進行寫作的章節數（同一章內的段落仍依序寫作）
+    PARALLEL_WRITE_CHAPTERS = 2
+    # 預設/新增節點的狀態與字數欄位
+    DEFAULT_NODE_VALUES = ("未開始", "0")
+    # 預設示例段落的顯示文字（第1段至第3段）
+    DEFAULT_PARAGRAPH_TEXTS = tuple(f"📄 第{j+1}段: 待定" for j in range(3))
+    
+    # 全局配置窗口的表單欄位：(標籤, 配置屬性, 元件類型, 選項)
+    STYLE_CONFIG_FIELDS = (
+        ("敘述方式", "writing_style", "combo", tuple(style.value for style in WritingStyle)),
+        ("節奏風格", "pacing_style", "combo", tuple(style.value for style in PacingStyle)),
+        ("整體語調", "tone", "entry", None),
+        ("對話風格", "dialogue_style", "entry", None),
+        ("描述密度", "description_density", "combo", ("簡潔", "適中", "豐富")),
+        ("情感強度", "emotional_intensity", "combo", ("克制", "適中", "濃烈")),
+    )
+    LENGTH_CONFIG_FIELDS = (
+        ("章節目標字數", "target_chapter_words", "spin", (1000, 10000, 500)),
+        ("段落目標字數", "target_paragraph_words", "spin", (100, 1000, 50)),
+        ("段落數量偏好", "paragraph_count_preference", "combo", ("簡潔", "適中", "詳細")),
+    )
+    DEBUG_LOG_KEEP_LINES = 2000
+    
     def __init__(self, root):
         self.root = root
         self.root.title("階層式LLM小說創作工具 v3.0 (重構版)")
         self.root.geometry("1400x900")
         
+        # 共用的具名字型，各元件以名稱引用
+        self._create_named_fonts()
+        
         # 初始化項目
         self.project = NovelProject()
         
         # 當前狀態
         self.current_action = ""
         self.selected_context_content = ""  # 存儲選中的上下文內容
+        self._input_dialog = None  # 可重複使用的輸入對話框，首次使用時建立
+        
+        # 背景任務執行緒池（LLM呼叫不阻塞Tk主執行緒）
+        self.executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="novel_writer")
+        self._active_futures = set()
+        # 進行中的重新生成任務：(章節索引, 段落索引或None) -> Future
+        self._regenerating = {}
+        self._closing = False
+        
+        # 世界設定頁面最後一次渲染時的 (核心, 版本號, 世界設定) 識別
+        self._world_rendered_key = None
+        # 世界設定頁面文字（去除首尾空白後）的雜湊，代表與目前世界設定一致的文字內容
+        self._world_text_hash = None
+        
+        # 是否已有排程中的樹視圖刷新
+        self._refresh_pending = False
+        # 章節/段落物件對應的樹節點：id(物件) -> (物件, 節點)，供單一節點更新使用
+        self._tree_nodes = {}
+        
+        # 段落下拉選單目前的選項文字（單段狀態變更時只改寫對應的一列）
+        self._paragraph_labels = []
+        
+        # 章節下拉選單選項快取：以章節列表物件與修改版本號判斷是否需要重建
+        self._chapter_labels_cache = None
+        self._chapter_labels_source = None
+        self._chapter_labels_rev = 0
+        self._chapter_labels_cache_rev = -1
+        
+        # 調試日誌佇列，有內容時才排程批量寫入文字框（可從任意執行緒寫入）
+        self._log_queue = deque(maxlen=5000)
+        # 串流生成的段落文字，與調試日誌共用同一次批量寫入
+        self._stream_queue = deque()
+        self._log_flush_pending = False
+        self._log_flush_lock = threading.Lock()
         
         # 先設置UI
         self.setup_ui()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
         
         # 然後載入配置和初始化服務
         self.load_api_config()
@@ -1491,37 +2417,94 @@ class NovelWriterGUI:
         self.llm_service = LLMService(self.api_connector, self.debug_log)
         self.core = NovelWriterCore(self.project, self.llm_service)
     
+    def submit_task(self, task: Callable, *args, on_done: Optional[Callable] = None) -> Future:
+        """提交背景任務到執行緒池，完成後在主執行緒執行回調
+        
+        未提供 on_done 時，任務中未處理的異常會記錄到調試日誌。
+        """
+        future = self.executor.submit(task, *args)
+        self._active_futures.add(future)
+        future.add_done_callback(self._active_futures.discard)
+        
+        if on_done is None:
+            on_done = self._log_task_exception
+        future.add_done_callback(lambda f: self._dispatch_to_main(on_done, f))
+        return future
+    
+    def _dispatch_to_main(self, callback: Callable, *args):
+        """從背景執行緒將回調排入Tk主執行緒，視窗關閉後略過"""
+        if self._closing:
+            return
+        try:
+            self.root.after(0, callback, *args)
+        except (tk.TclError, RuntimeError):
+            pass  # 窗口已關閉
+    
+    def _log_task_exception(self, future: Future):
+        """記錄背景任務中未處理的異常"""
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            self.debug_log(f"❌ 背景任務發生未處理的錯誤: {str(error)}")
+    
+    def on_closing(self):
+        """關閉窗口：停止自動寫作並取消尚未開始的背景任務"""
+        self._closing = True
+        self.auto_writing = False
+        
+        for future in list(self._active_futures):
+            future.cancel()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        
+        self.root.destroy()
+    
     def tree_callback(self, event_type: str, data: Any):
         """樹視圖回調函數，處理生成階段的樹視圖更新"""
         try:
             if event_type == "outline_generated":
                 self.debug_log("🌳 大綱生成完成，刷新樹視圖")
-                self.root.after(0, self.refresh_tree)
+                self.schedule_refresh()
                 
             elif event_type == "chapters_generated":
                 self.debug_log(f"🌳 章節劃分完成，共{len(data)}章，刷新樹視圖")
-                self.root.after(0, self.refresh_tree)
+                self.schedule_refresh()
                 
             elif event_type == "chapter_outline_generated":
                 chapter_index = data.get("chapter_index", 0)
                 self.debug_log(f"🌳 第{chapter_index+1}章大綱生成完成，刷新樹視圖")
-                self.root.after(0, self.refresh_tree)
+                self.schedule_refresh()
                 
             elif event_type == "paragraphs_generated":
                 chapter_index = data.get("chapter_index", 0)
                 paragraphs = data.get("paragraphs", [])
                 self.debug_log(f"🌳 第{chapter_index+1}章段落劃分完成，共{len(paragraphs)}段，刷新樹視圖")
-                self.root.after(0, self.refresh_tree)
+                self.schedule_refresh()
                 
             elif event_type == "paragraph_written":
                 chapter_index = data.get("chapter_index", 0)
                 paragraph_index = data.get("paragraph_index", 0)
-                self.debug_log(f"🌳 第{chapter_index+1}章第{paragraph_index+1}段寫作完成，刷新樹視圖")
-                self.root.after(0, self.refresh_tree)
+                self.debug_log(f"🌳 第{chapter_index+1}章第{paragraph_index+1}段寫作完成，更新樹節點")
+                # 只有狀態與字數改變，更新段落及所屬章節節點即可
+                chapter = self.project.chapters[chapter_index]
+                self._dispatch_to_main(self.update_tree_nodes, chapter.paragraphs[paragraph_index], chapter)
                 
         except Exception as e:
             self.debug_log(f"❌ 樹視圖回調處理失敗: {str(e)}")
     
+    def _create_named_fonts(self):
+        """建立全介面共用的具名字型（需保留參照，否則物件回收時字型會被刪除）"""
+        self._fonts = {
+            name: tkfont.Font(root=self.root, name=name, family=family, size=size)
+            for name, family, size in (
+                ("nw.small", "Microsoft YaHei", 8),
+                ("nw.body", "Microsoft YaHei", 9),
+                ("nw.text", "Microsoft YaHei", 11),
+                ("nw.content", "Microsoft YaHei", 12),
+                ("nw.mono", "Consolas", 10),
+            )
+        }
+    
     def setup_ui(self):
         """設置UI"""
         # 主框架
@@ -1543,7 +2526,7 @@ class NovelWriterGUI:
         right_panel.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
         
         self.setup_left_panel(left_panel)
-        self.setup_right_panel(right_panel)  # 先設置右側面板，確保debug_text被初始化
+        self.setup_right_panel(right_panel)  # 先設置右側面板，確保content_text被初始化
         self.setup_tree_panel(tree_panel)    # 再設置樹面板
     
     def setup_left_panel(self, parent):
@@ -1557,6 +2540,18 @@ class NovelWriterGUI:
         scrollbar = ttk.Scrollbar(main_container, orient="vertical", command=canvas.yview)
         scrollable_frame = ttk.Frame(canvas)
         
+        # 檢查是否需要滾動條（由幾何變化事件觸發，不再定期輪詢）
+        def check_scrollbar_needed():
+            canvas_height = canvas.winfo_height()
+            content_height = scrollable_frame.winfo_reqheight()
+            
+            if content_height > canvas_height:
+                if not scrollbar.winfo_ismapped():
+                    scrollbar.pack(side="right", fill="y")
+            else:
+                if scrollbar.winfo_ismapped():
+                    scrollbar.pack_forget()
+        
         # 配置滾動區域
         def configure_scroll_region(event=None):
             canvas.configure(scrollregion=canvas.bbox("all"))
@@ -1564,6 +2559,7 @@ class NovelWriterGUI:
             canvas_width = canvas.winfo_width()
             if canvas_width > 1:  # 確保canvas已經渲染
                 canvas.itemconfig(canvas_window, width=canvas_width)
+                check_scrollbar_needed()
         
         scrollable_frame.bind("<Configure>", configure_scroll_region)
         canvas.bind("<Configure>", configure_scroll_region)
@@ -1572,63 +2568,33 @@ class NovelWriterGUI:
         canvas_window = canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
         canvas.configure(yscrollcommand=scrollbar.set)
         
-        # 綁定滑鼠滾輪事件 - 改進版本
+        # 綁定滑鼠滾輪事件 - 單一全域綁定，只處理來自滾動區域內的事件
+        # 以 "路徑." 比對子元件，避免 .!canvas2 這類只是前綴相同的兄弟元件被誤判
+        canvas_path = str(canvas)
+        child_prefix = canvas_path + "."
+        
         def _on_mousewheel(event):
-            if canvas.winfo_exists():
+            widget_path = str(event.widget)
+            if widget_path == canvas_path or widget_path.startswith(child_prefix):
                 canvas.yview_scroll(int(-1*(event.delta/120)), "units")
         
-        def bind_mousewheel(widget):
-            """遞歸綁定滑鼠滾輪事件到所有子控件"""
-            widget.bind("<MouseWheel>", _on_mousewheel)
-            for child in widget.winfo_children():
-                bind_mousewheel(child)
-        
-        # 延遲綁定滑鼠滾輪事件
-        def delayed_bind():
-            bind_mousewheel(scrollable_frame)
-            bind_mousewheel(canvas)
-        
-        parent.after(100, delayed_bind)
+        canvas.bind_all("<MouseWheel>", _on_mousewheel, add="+")
         
         # 配置佈局 - 滾動條只在需要時顯示
         canvas.pack(side="left", fill="both", expand=True)
         scrollbar.pack(side="right", fill="y")
         
-        # 檢查是否需要滾動條
-        def check_scrollbar_needed():
-            if canvas.winfo_exists() and scrollable_frame.winfo_exists():
-                canvas.update_idletasks()
-                canvas_height = canvas.winfo_height()
-                content_height = scrollable_frame.winfo_reqheight()
-                
-                if content_height > canvas_height:
-                    if not scrollbar.winfo_viewable():
-                        scrollbar.pack(side="right", fill="y")
-                else:
-                    if scrollbar.winfo_viewable():
-                        scrollbar.pack_forget()
-        
-        # 定期檢查是否需要滾動條
-        def periodic_check():
-            try:
-                check_scrollbar_needed()
-                parent.after(500, periodic_check)
-            except tk.TclError:
-                pass  # 窗口已關閉
-        
-        parent.after(200, periodic_check)
-        
         # 項目信息 - 更緊湊
         project_frame = ttk.LabelFrame(scrollable_frame, text="項目信息", padding=5)
         project_frame.pack(fill=tk.X, pady=(0, 5))
         
         # 標題和主題使用網格佈局
-        ttk.Label(project_frame, text="標題:", font=("Microsoft YaHei", 9)).grid(row=0, column=0, sticky=tk.W, padx=(0, 5))
-        self.title_entry = ttk.Entry(project_frame, font=("Microsoft YaHei", 9))
+        ttk.Label(project_frame, text="標題:", font="nw.body").grid(row=0, column=0, sticky=tk.W, padx=(0, 5))
+        self.title_entry = ttk.Entry(project_frame, font="nw.body")
         self.title_entry.grid(row=0, column=1, sticky=tk.W+tk.E, pady=1)
         
-        ttk.Label(project_frame, text="主題:", font=("Microsoft YaHei", 9)).grid(row=1, column=0, sticky=tk.W, padx=(0, 5))
-        self.theme_entry = ttk.Entry(project_frame, font=("Microsoft YaHei", 9))
+        ttk.Label(project_frame, text="主題:", font="nw.body").grid(row=1, column=0, sticky=tk.W, padx=(0, 5))
+        self.theme_entry = ttk.Entry(project_frame, font="nw.body")
         self.theme_entry.grid(row=1, column=1, sticky=tk.W+tk.E, pady=1)
         
         project_frame.columnconfigure(1, weight=1)
@@ -1644,10 +2610,12 @@ class NovelWriterGUI:
         main_buttons_frame = ttk.Frame(main_control_frame)
         main_buttons_frame.pack(fill=tk.X, pady=(0, 3))
         
-        ttk.Button(main_buttons_frame, text="1.大綱", 
-                  command=self.generate_outline, width=8).pack(side=tk.LEFT, padx=(0, 1))
-        ttk.Button(main_buttons_frame, text="2.章節", 
-                  command=self.divide_chapters, width=8).pack(side=tk.LEFT, padx=(0, 1))
+        self.outline_button = ttk.Button(main_buttons_frame, text="1.大綱", 
+                                        command=self.generate_outline, width=8)
+        self.outline_button.pack(side=tk.LEFT, padx=(0, 1))
+        self.chapters_button = ttk.Button(main_buttons_frame, text="2.章節", 
+                                         command=self.divide_chapters, width=8)
+        self.chapters_button.pack(side=tk.LEFT, padx=(0, 1))
         ttk.Button(main_buttons_frame, text="3.寫作", 
                   command=self.start_writing, width=8).pack(side=tk.LEFT)
         
@@ -1667,13 +2635,13 @@ class NovelWriterGUI:
         # 大綱指示頁面
         outline_prompt_frame = ttk.Frame(prompt_notebook)
         prompt_notebook.add(outline_prompt_frame, text="大綱")
-        self.outline_prompt_entry = tk.Text(outline_prompt_frame, height=3, wrap=tk.WORD, font=("Microsoft YaHei", 8))
+        self.outline_prompt_entry = tk.Text(outline_prompt_frame, height=3, wrap=tk.WORD, font="nw.small")
         self.outline_prompt_entry.pack(fill=tk.BOTH, expand=True, padx=2, pady=2)
         
         # 章節指示頁面
         chapters_prompt_frame = ttk.Frame(prompt_notebook)
         prompt_notebook.add(chapters_prompt_frame, text="章節")
-        self.chapters_prompt_entry = tk.Text(chapters_prompt_frame, height=3, wrap=tk.WORD, font=("Microsoft YaHei", 8))
+        self.chapters_prompt_entry = tk.Text(chapters_prompt_frame, height=3, wrap=tk.WORD, font="nw.small")
         self.chapters_prompt_entry.pack(fill=tk.BOTH, expand=True, padx=2, pady=2)
         
         # 選擇和寫作控制合併
@@ -1681,17 +2649,17 @@ class NovelWriterGUI:
         work_frame.pack(fill=tk.X, pady=(0, 5))
         
         # 章節和段落選擇 - 網格佈局
-        ttk.Label(work_frame, text="章節:", font=("Microsoft YaHei", 9)).grid(row=0, column=0, sticky=tk.W, padx=(0, 5))
+        ttk.Label(work_frame, text="章節:", font="nw.body").grid(row=0, column=0, sticky=tk.W, padx=(0, 5))
         self.chapter_var = tk.StringVar()
         self.chapter_combo = ttk.Combobox(work_frame, textvariable=self.chapter_var, 
-                                         state="readonly", font=("Microsoft YaHei", 8))
+                                         state="readonly", font="nw.small")
         self.chapter_combo.grid(row=0, column=1, sticky=tk.W+tk.E, pady=1)
         self.chapter_combo.bind('<<ComboboxSelected>>', self.on_chapter_selected)
         
-        ttk.Label(work_frame, text="段落:", font=("Microsoft YaHei", 9)).grid(row=1, column=0, sticky=tk.W, padx=(0, 5))
+        ttk.Label(work_frame, text="段落:", font="nw.body").grid(row=1, column=0, sticky=tk.W, padx=(0, 5))
         self.paragraph_var = tk.StringVar()
         self.paragraph_combo = ttk.Combobox(work_frame, textvariable=self.paragraph_var,
-                                           state="readonly", font=("Microsoft YaHei", 8))
+                                           state="readonly", font="nw.small")
         self.paragraph_combo.grid(row=1, column=1, sticky=tk.W+tk.E, pady=1)
         
         work_frame.columnconfigure(1, weight=1)
@@ -1703,7 +2671,9 @@ class NovelWriterGUI:
         ttk.Button(write_buttons_frame, text="寫作", 
                   command=self.write_current_paragraph, width=10).pack(side=tk.LEFT, padx=(0, 2))
         ttk.Button(write_buttons_frame, text="智能寫作", 
-                  command=self.enhanced_write_paragraph, width=10).pack(side=tk.LEFT)
+                  command=self.enhanced_write_paragraph, width=10).pack(side=tk.LEFT, padx=(0, 2))
+        ttk.Button(write_buttons_frame, text="批次寫作", 
+                  command=self.batch_write_paragraphs, width=10).pack(side=tk.LEFT)
         
         # 自動寫作控制 - 緊湊佈局
         auto_frame = ttk.LabelFrame(scrollable_frame, text="自動寫作", padding=5)
@@ -1722,42 +2692,45 @@ class NovelWriterGUI:
         
         self.smart_auto_button = ttk.Button(auto_buttons_frame, text="智能自動寫作", 
                                            command=self.toggle_smart_auto_writing, width=12)
-        self.smart_auto_button.pack(side=tk.LEFT)
+        self.smart_auto_button.pack(side=tk.LEFT, padx=(0, 2))
+        
+        ttk.Button(auto_buttons_frame, text="寫作空白段落", 
+                  command=self.write_all_empty_paragraphs, width=12).pack(side=tk.LEFT)
         
         # 自動寫作設置 - 水平排列
         settings_frame = ttk.Frame(auto_frame)
         settings_frame.pack(fill=tk.X, pady=(0, 2))
         
-        ttk.Label(settings_frame, text="延遲:", font=("Microsoft YaHei", 9)).pack(side=tk.LEFT)
+        ttk.Label(settings_frame, text="延遲:", font="nw.body").pack(side=tk.LEFT)
         self.delay_var = tk.StringVar(value="2")
         delay_spinbox = ttk.Spinbox(settings_frame, from_=1, to=10, width=4, 
-                                   textvariable=self.delay_var, font=("Microsoft YaHei", 9))
+                                   textvariable=self.delay_var, font="nw.body")
         delay_spinbox.pack(side=tk.LEFT, padx=(3, 2))
-        ttk.Label(settings_frame, text="秒", font=("Microsoft YaHei", 9)).pack(side=tk.LEFT)
+        ttk.Label(settings_frame, text="秒", font="nw.body").pack(side=tk.LEFT)
         
         # 進度顯示
         self.progress_var = tk.StringVar(value="準備就緒")
         ttk.Label(auto_frame, textvariable=self.progress_var, 
-                 font=("Microsoft YaHei", 8), foreground="blue").pack(fill=tk.X)
+                 font="nw.small", foreground="blue").pack(fill=tk.X)
         
         # 快速設定 - 更緊湊
         quick_frame = ttk.LabelFrame(scrollable_frame, text="快速設定", padding=5)
         quick_frame.pack(fill=tk.X, pady=(0, 5))
         
         # 使用網格佈局
-        ttk.Label(quick_frame, text="敘述:", font=("Microsoft YaHei", 9)).grid(row=0, column=0, sticky=tk.W, padx=(0, 3))
+        ttk.Label(quick_frame, text="敘述:", font="nw.body").grid(row=0, column=0, sticky=tk.W, padx=(0, 3))
         self.quick_style_var = tk.StringVar(value="第三人稱限制視角")
         style_combo = ttk.Combobox(quick_frame, textvariable=self.quick_style_var,
                                   values=["第一人稱", "第三人稱限制視角", "第三人稱全知視角"],
-                                  state="readonly", font=("Microsoft YaHei", 8))
+                                  state="readonly", font="nw.small")
         style_combo.grid(row=0, column=1, sticky=tk.W+tk.E, pady=1)
         style_combo.bind('<<ComboboxSelected>>', self.on_quick_style_change)
         
-        ttk.Label(quick_frame, text="篇幅:", font=("Microsoft YaHei", 9)).grid(row=1, column=0, sticky=tk.W, padx=(0, 3))
+        ttk.Label(quick_frame, text="篇幅:", font="nw.body").grid(row=1, column=0, sticky=tk.W, padx=(0, 3))
         self.quick_length_var = tk.StringVar(value="適中")
         length_combo = ttk.Combobox(quick_frame, textvariable=self.quick_length_var,
                                    values=["簡潔", "適中", "詳細"],
-                                   state="readonly", font=("Microsoft YaHei", 8))
+                                   state="readonly", font="nw.small")
         length_combo.grid(row=1, column=1, sticky=tk.W+tk.E, pady=1)
         length_combo.bind('<<ComboboxSelected>>', self.on_quick_length_change)
         
@@ -1776,8 +2749,8 @@ class NovelWriterGUI:
         # 初始隱藏
         
         # 特別要求
-        ttk.Label(self.advanced_area, text="特別要求:", font=("Microsoft YaHei", 9)).pack(anchor=tk.W)
-        self.current_paragraph_prompt = tk.Text(self.advanced_area, height=2, wrap=tk.WORD, font=("Microsoft YaHei", 8))
+        ttk.Label(self.advanced_area, text="特別要求:", font="nw.body").pack(anchor=tk.W)
+        self.current_paragraph_prompt = tk.Text(self.advanced_area, height=2, wrap=tk.WORD, font="nw.small")
         self.current_paragraph_prompt.pack(fill=tk.X, pady=(0, 2))
         
         # 參考和字數控制 - 網格佈局
@@ -1785,7 +2758,7 @@ class NovelWriterGUI:
         control_grid_frame.pack(fill=tk.X, pady=(0, 2))
         
         # 參考內容
-        ttk.Label(control_grid_frame, text="參考:", font=("Microsoft YaHei", 9)).grid(row=0, column=0, sticky=tk.W, padx=(0, 3))
+        ttk.Label(control_grid_frame, text="參考:", font="nw.body").grid(row=0, column=0, sticky=tk.W, padx=(0, 3))
         ref_buttons_frame = ttk.Frame(control_grid_frame)
         ref_buttons_frame.grid(row=0, column=1, sticky=tk.W+tk.E)
         ttk.Button(ref_buttons_frame, text="使用選中", 
@@ -1794,19 +2767,23 @@ class NovelWriterGUI:
                   command=self.clear_reference, width=6).pack(side=tk.LEFT)
         
         # 字數控制
-        ttk.Label(control_grid_frame, text="字數:", font=("Microsoft YaHei", 9)).grid(row=1, column=0, sticky=tk.W, padx=(0, 3))
+        ttk.Label(control_grid_frame, text="字數:", font="nw.body").grid(row=1, column=0, sticky=tk.W, padx=(0, 3))
         words_frame = ttk.Frame(control_grid_frame)
         words_frame.grid(row=1, column=1, sticky=tk.W+tk.E)
         
         self.target_words_var = tk.StringVar(value="300")
         words_spinbox = ttk.Spinbox(words_frame, from_=100, to=1000, width=6,
-                                   textvariable=self.target_words_var, font=("Microsoft YaHei", 9))
+                                   textvariable=self.target_words_var, font="nw.body")
         words_spinbox.pack(side=tk.LEFT, padx=(0, 3))
         
         self.strict_words_var = tk.BooleanVar()
         ttk.Checkbutton(words_frame, text="嚴格", 
                        variable=self.strict_words_var).pack(side=tk.LEFT)
         
+        self.ignore_cache_var = tk.BooleanVar()
+        ttk.Checkbutton(words_frame, text="忽略快取", 
+                       variable=self.ignore_cache_var).pack(side=tk.LEFT)
+        
         control_grid_frame.columnconfigure(1, weight=1)
         
         # 重寫優化按鈕
@@ -1832,6 +2809,11 @@ class NovelWriterGUI:
         ttk.Button(file_buttons_frame, text="保存", command=self.save_project, width=8).pack(side=tk.LEFT, padx=(0, 1))
         ttk.Button(file_buttons_frame, text="載入", command=self.load_project, width=8).pack(side=tk.LEFT, padx=(0, 1))
         ttk.Button(file_buttons_frame, text="導出", command=self.export_novel, width=8).pack(side=tk.LEFT)
+        
+        # 緊湊格式保存：不縮排，檔案約小一半，仍可正常載入
+        self.compact_save_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(tools_frame, text="緊湊格式保存（不縮排）",
+                        variable=self.compact_save_var).pack(anchor=tk.W)
     
     def setup_tree_panel(self, parent):
         """設置階層樹視圖面板"""
@@ -1859,8 +2841,20 @@ class NovelWriterGUI:
         self.tree.heading("status", text="狀態", anchor=tk.CENTER)
         self.tree.heading("words", text="字數", anchor=tk.CENTER)
         
+        # 尚未載入子節點的章節節點（展開時才建立段落節點）
+        self._unpopulated_tree_nodes = set()
+        # 以預設示例內容（而非項目數據）建立子節點的章節節點
+        self._default_chapter_nodes = set()
+        # 節點 -> (章節索引, 段落索引或None)，選擇節點時免去解析標籤字串
+        self._node_meta = {}
+        # 樹上章節節點的數量，即下一個新增章節的索引
+        self._next_chapter_index = 0
+        # 由項目數據建立的根節點（顯示全書總字數）
+        self._tree_root_node = None
+        
         # 綁定事件
         self.tree.bind("<<TreeviewSelect>>", self.on_tree_select)
+        self.tree.bind("<<TreeviewOpen>>", self.on_tree_open)
         self.tree.bind("<Double-1>", self.on_tree_double_click)
         
         # 右鍵菜單
@@ -1907,21 +2901,40 @@ class NovelWriterGUI:
         self.notebook.add(content_frame, text="內容編輯")
         
         self.content_text = scrolledtext.ScrolledText(content_frame, wrap=tk.WORD, 
-                                                     font=("Microsoft YaHei", 12))
+                                                     font="nw.content")
         self.content_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         
-        # 調試日誌頁面
+        # 調試日誌與世界設定頁面先建立空框架，第一次切換到該頁時才建立內部元件
         debug_frame = ttk.Frame(self.notebook)
         self.notebook.add(debug_frame, text="調試日誌")
+        self.debug_text = None
         
-        self.debug_text = scrolledtext.ScrolledText(debug_frame, wrap=tk.WORD,
-                                                   font=("Consolas", 10))
-        self.debug_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-        
-        # 世界設定頁面
         world_frame = ttk.Frame(self.notebook)
         self.notebook.add(world_frame, text="世界設定")
+        self.world_text = None
         
+        self._tab_builders = {
+            str(debug_frame): lambda: self._build_debug_tab(debug_frame),
+            str(world_frame): lambda: self._build_world_tab(world_frame),
+        }
+        self.notebook.bind("<<NotebookTabChanged>>", self._lazy_build_tab)
+    
+    def _lazy_build_tab(self, event=None):
+        """切換頁面時建立尚未建立的頁面內容"""
+        builder = self._tab_builders.pop(self.notebook.select(), None)
+        if builder is not None:
+            builder()
+    
+    def _build_debug_tab(self, debug_frame):
+        """建立調試日誌頁面（之前累積的日誌隨即排程寫入）"""
+        self.debug_text = scrolledtext.ScrolledText(debug_frame, wrap=tk.WORD,
+                                                   font="nw.mono")
+        self.debug_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        if self._log_queue:
+            self._schedule_log_flush()
+    
+    def _build_world_tab(self, world_frame):
+        """建立世界設定頁面"""
         # 世界設定控制按鈕框架
         world_control_frame = ttk.Frame(world_frame)
         world_control_frame.pack(fill=tk.X, padx=5, pady=5)
@@ -1931,60 +2944,135 @@ class NovelWriterGUI:
         ttk.Button(world_control_frame, text="重置設定", 
                   command=self.reset_world_settings).pack(side=tk.LEFT, padx=(0, 5))
         ttk.Button(world_control_frame, text="刷新顯示", 
-                  command=self.update_world_display).pack(side=tk.LEFT)
+                  command=lambda: self.update_world_display(force=True)).pack(side=tk.LEFT)
         
         # 添加分隔線
         ttk.Separator(world_frame, orient='horizontal').pack(fill=tk.X, padx=5, pady=5)
         
         self.world_text = scrolledtext.ScrolledText(world_frame, wrap=tk.WORD,
-                                                   font=("Microsoft YaHei", 11))
+                                                   font="nw.text")
         self.world_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.update_world_display(force=True)
     
     def debug_log(self, message):
-        """添加調試日誌"""
+        """添加調試日誌（先放入佇列，由 _flush_log 批量寫入）"""
         timestamp = datetime.now().strftime("%H:%M:%S")
-        log_message = f"[{timestamp}] {message}\n"
-        
-        self.debug_text.insert(tk.END, log_message)
-        self.debug_text.see(tk.END)
-        self.root.update_idletasks()
+        self._log_queue.append(f"[{timestamp}] {message}\n")
+        self._schedule_log_flush()
+    
+    def _queue_stream_token(self, token: str):
+        """放入串流生成的文字（背景執行緒調用），與日誌一起批量寫入"""
+        self._stream_queue.append(token)
+        self._schedule_log_flush()
+    
+    def _reset_stream_display(self):
+        """請求重試時清除已串流的內容（背景執行緒調用），以 None 標記放入佇列，保持與文字片段的先後順序"""
+        self._stream_queue.append(None)
+        self._schedule_log_flush()
+    
+    def _schedule_log_flush(self):
+        """有待寫入的內容時才排程一次 _flush_log，已有排程時直接合併（可從任意執行緒調用）"""
+        with self._log_flush_lock:
+            if self._log_flush_pending or self._closing:
+                return
+            self._log_flush_pending = True
+        try:
+            self.root.after(self.LOG_FLUSH_INTERVAL, self._flush_log)
+        except (tk.TclError, RuntimeError):
+            self._log_flush_pending = False  # 窗口已關閉
+    
+    def _flush_log(self):
+        """將佇列中的串流文字與日誌一次性寫入對應的文字框"""
+        # 先清除排程旗標，寫入期間新增的內容會再排程下一次
+        with self._log_flush_lock:
+            self._log_flush_pending = False
+        
+        if self._stream_queue:
+            popleft = self._stream_queue.popleft
+            chunks = [popleft() for _ in range(len(self._stream_queue))]
+            if None in chunks:
+                # 只保留最後一次清除標記之後的片段
+                chunks = chunks[len(chunks) - chunks[::-1].index(None):]
+                self.content_text.delete("1.0", tk.END)
+            if chunks:
+                self._append_stream_token("".join(chunks))
+        
+        # 調試日誌頁面尚未建立時日誌留在佇列中
+        if self._log_queue and self.debug_text is not None:
+            # 只取出當下已有的項目，期間其他執行緒新增的留待下次寫入
+            popleft = self._log_queue.popleft
+            pending = [popleft() for _ in range(len(self._log_queue))]
+            
+            self.debug_text.insert(tk.END, "".join(pending))
+            
+            line_count = int(self.debug_text.index("end-1c").split(".")[0])
+            if line_count > self.DEBUG_LOG_MAX_LINES:
+                self.debug_text.delete("1.0", f"{line_count - self.DEBUG_LOG_KEEP_LINES}.0")
+            
+            self.debug_text.see(tk.END)
     
     def load_api_config(self):
-        """載入API配置"""
+        """載入API配置（檔案在背景執行緒讀取，完成後於主執行緒套用）"""
+        self.submit_task(self._read_api_config_file, on_done=self._on_api_config_loaded)
+    
+    @staticmethod
+    def _read_api_config_file() -> Optional[Dict]:
+        """讀取API配置檔案，檔案不存在時返回None"""
+        if not os.path.exists("api_config.json"):
+            return None
+        with open("api_config.json", "r", encoding="utf-8") as f:
+            return json.load(f)
+    
+    @staticmethod
+    def _write_api_config_file(config_data: Dict):
+        """寫入API配置檔案"""
+        with open("api_config.json", "w", encoding="utf-8") as f:
+            json.dump(config_data, f, ensure_ascii=False, indent=2)
+    
+    def _on_api_config_loaded(self, future: Future):
+        """API配置讀取完成回調（主執行緒）"""
         try:
-            if os.path.exists("api_config.json"):
-                with open("api_config.json", "r", encoding="utf-8") as f:
-                    config_data = json.load(f)
-                
-                # 載入主要設定
-                self.project.api_config.base_url = config_data.get("base_url", "https://api.openai.com/v1")
-                self.project.api_config.model = config_data.get("model", "gpt-4.1-mini-2025-04-14")
-                self.project.api_config.provider = config_data.get("provider", "openai")
-                self.project.api_config.api_key = config_data.get("api_key", "")
-                self.project.api_config.max_retries = config_data.get("max_retries", 3)
-                self.project.api_config.timeout = config_data.get("timeout", 60)
-                self.project.api_config.language = config_data.get("language", "zh-TW")
-                self.project.api_config.use_traditional_quotes = config_data.get("use_traditional_quotes", True)
-                self.project.api_config.disable_thinking = config_data.get("disable_thinking", False)
-
-                # 載入規劃模型設定
-                self.project.api_config.use_planning_model = config_data.get("use_planning_model", False)
-                self.project.api_config.planning_base_url = config_data.get("planning_base_url", "https://api.openai.com/v1")
-                self.project.api_config.planning_model = config_data.get("planning_model", "gpt-4-turbo")
-                self.project.api_config.planning_provider = config_data.get("planning_provider", "openai")
-                self.project.api_config.planning_api_key = config_data.get("planning_api_key", "")
-                
-                self.debug_log("✅ API配置載入成功")
-            else:
+            config_data = future.result()
+            if config_data is None:
                 self.debug_log("⚠️ 未找到API配置文件，使用默認配置")
+                return
+            
+            self._apply_api_config(config_data)
+            self.debug_log("✅ API配置載入成功")
         except Exception as e:
             self.debug_log(f"❌ 載入API配置失敗: {str(e)}")
     
+    def _apply_api_config(self, config_data: Dict):
+        """將讀取的配置套用到項目的API配置"""
+        # 載入主要設定
+        self.project.api_config.base_url = config_data.get("base_url", "https://api.openai.com/v1")
+        self.project.api_config.model = config_data.get("model", "gpt-4.1-mini-2025-04-14")
+        self.project.api_config.provider = config_data.get("provider", "openai")
+        self.project.api_config.api_key = config_data.get("api_key", "")
+        self.project.api_config.max_retries = config_data.get("max_retries", 3)
+        self.project.api_config.timeout = config_data.get("timeout", 60)
+        self.project.api_config.language = config_data.get("language", "zh-TW")
+        self.project.api_config.use_traditional_quotes = config_data.get("use_traditional_quotes", True)
+        self.project.api_config.disable_thinking = config_data.get("disable_thinking", False)
+
+        # 載入規劃模型設定
+        self.project.api_config.use_planning_model = config_data.get("use_planning_model", False)
+        self.project.api_config.planning_base_url = config_data.get("planning_base_url", "https://api.openai.com/v1")
+        self.project.api_config.planning_model = config_data.get("planning_model", "gpt-4-turbo")
+        self.project.api_config.planning_provider = config_data.get("planning_provider", "openai")
+        self.project.api_config.planning_api_key = config_data.get("planning_api_key", "")
+        
+        # 載入世界設定模型設定
+        self.project.api_config.world_building_model = config_data.get("world_building_model", "")
+        
+        # 核心快取了語言設定，配置變更後需重新讀取
+        self.core.refresh_language_settings()
+    
     def configure_api(self):
         """配置API"""
         config_window = tk.Toplevel(self.root)
         config_window.title("API配置")
-        config_window.geometry("550x650") # 增加高度以容納新選項
+        config_window.geometry("550x700") # 增加高度以容納新選項
         config_window.transient(self.root)
         config_window.grab_set()
 
@@ -2004,7 +3092,7 @@ class NovelWriterGUI:
         ttk.Label(main_model_frame, text="API提供商:").pack(anchor=tk.W, padx=10, pady=5)
         provider_var = tk.StringVar(value=self.project.api_config.provider)
         provider_combo = ttk.Combobox(main_model_frame, textvariable=provider_var,
-                                     values=["openai", "anthropic", "ollama", "lm-studio", "localai", "text-generation-webui", "vllm", "custom"])
+                                     values=_PROVIDERS)
         provider_combo.pack(fill=tk.X, padx=10, pady=5)
 
         # API地址
@@ -2038,7 +3126,7 @@ class NovelWriterGUI:
         ttk.Label(planning_model_frame, text="規劃API提供商:").pack(anchor=tk.W, padx=10, pady=5)
         planning_provider_var = tk.StringVar(value=getattr(self.project.api_config, 'planning_provider', 'openai'))
         planning_provider_combo = ttk.Combobox(planning_model_frame, textvariable=planning_provider_var,
-                                               values=["openai", "anthropic", "ollama", "lm-studio", "localai", "text-generation-webui", "vllm", "custom"])
+                                               values=_PROVIDERS)
         planning_provider_combo.pack(fill=tk.X, padx=10, pady=5)
 
         # API地址
@@ -2059,6 +3147,12 @@ class NovelWriterGUI:
         planning_key_entry = ttk.Entry(planning_model_frame, textvariable=planning_key_var, show="*")
         planning_key_entry.pack(fill=tk.X, padx=10, pady=5)
 
+        # 世界設定模型
+        ttk.Label(planning_model_frame, text="世界設定提取模型 (留空則使用對應端點的模型，建議填較小較快的模型):").pack(anchor=tk.W, padx=10, pady=5)
+        world_model_var = tk.StringVar(value=getattr(self.project.api_config, 'world_building_model', ''))
+        world_model_entry = ttk.Entry(planning_model_frame, textvariable=world_model_var)
+        world_model_entry.pack(fill=tk.X, padx=10, pady=5)
+
         # --- 通用設定 ---
         common_settings_frame = ttk.Frame(main_frame)
         common_settings_frame.pack(fill=tk.X, pady=(10, 0))
@@ -2080,7 +3174,7 @@ class NovelWriterGUI:
         ttk.Label(common_settings_frame, text="輸出語言:").pack(anchor=tk.W, padx=10, pady=5)
         language_var = tk.StringVar(value=self.project.api_config.language)
         language_combo = ttk.Combobox(common_settings_frame, textvariable=language_var,
-                                     values=["zh-TW", "zh-CN", "en-US", "ja-JP"])
+                                     values=_LANGUAGES)
         language_combo.pack(fill=tk.X, padx=10, pady=5)
 
         # 引號格式設定
@@ -2108,73 +3202,49 @@ class NovelWriterGUI:
             self.project.api_config.planning_base_url = planning_url_var.get()
             self.project.api_config.planning_model = planning_model_var.get()
             self.project.api_config.planning_api_key = planning_key_var.get()
+            self.project.api_config.world_building_model = world_model_var.get().strip()
 
             # 保存通用設定
             self.project.api_config.language = language_var.get()
             self.project.api_config.use_traditional_quotes = quote_var.get()
             self.project.api_config.disable_thinking = thinking_var.get()
             
-            # 保存到文件
-            config_data = asdict(self.project.api_config)
-            
-            with open("api_config.json", "w", encoding="utf-8") as f:
-                json.dump(config_data, f, ensure_ascii=False, indent=2)
+            # 在背景執行緒保存到文件
+            config_data = _api_config_to_dict(self.project.api_config)
+            self.submit_task(self._write_api_config_file, config_data, on_done=self._on_api_config_saved)
             
             # 重新初始化服務
             self.api_connector = APIConnector(self.project.api_config, self.debug_log)
             self.llm_service = LLMService(self.api_connector, self.debug_log)
             self.core = NovelWriterCore(self.project, self.llm_service)
             
-            self.debug_log("✅ API配置已保存")
             config_window.destroy()
         
         ttk.Button(main_frame, text="保存", command=save_config).pack(pady=20)
     
+    def _on_api_config_saved(self, future: Future):
+        """API配置寫入完成回調（主執行緒）"""
+        try:
+            future.result()
+            self.debug_log("✅ API配置已保存")
+        except Exception as e:
+            self.debug_log(f"❌ 保存API配置失敗: {str(e)}")
+    
     def apply_preset(self, preset_type, url_var, model_var, provider_var):
         """應用預設配置"""
-        presets = {
-            "ollama": {
-                "provider": "custom",
-                "base_url": "http://localhost:11434/v1",
-                "model": "gemma3:12b-it-qat",
-                "description": "Ollama 本地模型服務"
-            },
-            "openai": {
-                "provider": "openai",
-                "base_url": "https://api.openai.com/v1",
-                "model": "gpt-4.1-mini-2025-04-14",
-                "description": "OpenAI 官方服務"
-            },
-            "anthropic": {
-                "provider": "anthropic",
-                "base_url": "https://api.anthropic.com",
-                "model": "claude-sonnet-4-20250514",
-                "description": "Anthropic Claude 服務"
-            },
-            "openrouter": {
-                "provider": "custom",
-                "base_url": "https://openrouter.ai/api/v1",
-                "model": "deepseek/deepseek-chat-v3-0324",
-                "description": "OpenRouter 聚合服務"
-            }
-        }
+        preset = _PRESETS.get(preset_type)
+        if preset is None:
+            return
         
-        if preset_type in presets:
-            preset = presets[preset_type]
-            
-            # 更新UI控件的值
-            provider_var.set(preset["provider"])
-            url_var.set(preset["base_url"])
-            model_var.set(preset["model"])
-            
-            # 顯示提示信息
-            messagebox.showinfo("預設配置", 
-                f"已應用 {preset['description']} 的預設配置：\n\n"
-                f"API地址：{preset['base_url']}\n"
-                f"模型：{preset['model']}\n\n"
-                f"請確認設定後點擊保存。")
-            
-            self.debug_log(f"✅ 已應用 {preset['description']} 預設配置")
+        # 更新UI控件的值
+        provider_var.set(preset["provider"])
+        url_var.set(preset["base_url"])
+        model_var.set(preset["model"])
+        
+        # 顯示提示信息
+        messagebox.showinfo("預設配置", _format_preset_message(preset_type))
+        
+        self.debug_log(f"✅ 已應用 {preset['description']} 預設配置")
     
     def generate_outline(self):
         """生成大綱"""
@@ -2192,35 +3262,38 @@ class NovelWriterGUI:
         # 保存額外指示到項目數據中
         self.project.outline_additional_prompt = self.outline_prompt_entry.get("1.0", tk.END).strip()
         
-        def run_task():
-            try:
-                self.current_action = "正在生成大綱..."
-                self.debug_log("🚀 開始生成大綱")
-                
-                # 獲取額外的prompt指示
-                additional_prompt = self.project.outline_additional_prompt
-                if additional_prompt:
-                    self.debug_log(f"📝 使用額外指示: {additional_prompt}")
-                
-                result = self.core.generate_outline(additional_prompt, self.tree_callback)
-                
-                if result:
-                    self.content_text.delete(1.0, tk.END)
-                    self.content_text.insert(tk.END, self.project.outline)
-                    self.update_world_display()
-                    self.debug_log("✅ 大綱生成完成")
-                    messagebox.showinfo("成功", "大綱生成完成！")
-                else:
-                    self.debug_log("❌ 大綱生成失敗")
-                    messagebox.showerror("錯誤", "大綱生成失敗")
-                    
-            except Exception as e:
-                self.debug_log(f"❌ 生成大綱時發生錯誤: {str(e)}")
-                messagebox.showerror("錯誤", f"生成大綱失敗: {str(e)}")
-            finally:
-                self.current_action = ""
+        self.current_action = "正在生成大綱..."
+        self.outline_button.config(state=tk.DISABLED)
+        self.debug_log("🚀 開始生成大綱")
         
-        threading.Thread(target=run_task, daemon=True).start()
+        # 獲取額外的prompt指示
+        additional_prompt = self.project.outline_additional_prompt
+        if additional_prompt:
+            self.debug_log(f"📝 使用額外指示: {additional_prompt}")
+        
+        self.submit_task(self.core.generate_outline, additional_prompt, self.tree_callback,
+                         on_done=self._on_outline_generated)
+    
+    def _on_outline_generated(self, future: Future):
+        """大綱生成完成回調（主執行緒）"""
+        self.current_action = ""
+        self.outline_button.config(state=tk.NORMAL)
+        
+        try:
+            result = future.result()
+        except Exception as e:
+            self.debug_log(f"❌ 生成大綱時發生錯誤: {str(e)}")
+            messagebox.showerror("錯誤", f"生成大綱失敗: {str(e)}")
+            return
+        
+        if result:
+            self._set_text(self.content_text, self.project.outline)
+            self.update_world_display()
+            self.debug_log("✅ 大綱生成完成")
+            messagebox.showinfo("成功", "大綱生成完成！")
+        else:
+            self.debug_log("❌ 大綱生成失敗")
+            messagebox.showerror("錯誤", "大綱生成失敗")
     
     def divide_chapters(self):
         """劃分章節"""
@@ -2231,33 +3304,37 @@ class NovelWriterGUI:
         # 保存額外指示到項目數據中
         self.project.chapters_additional_prompt = self.chapters_prompt_entry.get("1.0", tk.END).strip()
         
-        def run_task():
-            try:
-                self.current_action = "正在劃分章節..."
-                self.debug_log("🚀 開始劃分章節")
-                
-                # 獲取額外的prompt指示
-                additional_prompt = self.project.chapters_additional_prompt
-                if additional_prompt:
-                    self.debug_log(f"📝 使用額外指示: {additional_prompt}")
-                
-                chapters = self.core.divide_chapters(additional_prompt, self.tree_callback)
-                
-                if chapters:
-                    self.update_chapter_list()
-                    self.debug_log(f"✅ 章節劃分完成，共{len(chapters)}章")
-                    messagebox.showinfo("成功", f"章節劃分完成！共{len(chapters)}章")
-                else:
-                    self.debug_log("❌ 章節劃分失敗")
-                    messagebox.showerror("錯誤", "章節劃分失敗")
-                    
-            except Exception as e:
-                self.debug_log(f"❌ 劃分章節時發生錯誤: {str(e)}")
-                messagebox.showerror("錯誤", f"劃分章節失敗: {str(e)}")
-            finally:
-                self.current_action = ""
+        self.current_action = "正在劃分章節..."
+        self.chapters_button.config(state=tk.DISABLED)
+        self.debug_log("🚀 開始劃分章節")
         
-        threading.Thread(target=run_task, daemon=True).start()
+        # 獲取額外的prompt指示
+        additional_prompt = self.project.chapters_additional_prompt
+        if additional_prompt:
+            self.debug_log(f"📝 使用額外指示: {additional_prompt}")
+        
+        self.submit_task(self.core.divide_chapters, additional_prompt, self.tree_callback,
+                         on_done=self._on_chapters_divided)
+    
+    def _on_chapters_divided(self, future: Future):
+        """章節劃分完成回調（主執行緒）"""
+        self.current_action = ""
+        self.chapters_button.config(state=tk.NORMAL)
+        
+        try:
+            chapters = future.result()
+        except Exception as e:
+            self.debug_log(f"❌ 劃分章節時發生錯誤: {str(e)}")
+            messagebox.showerror("錯誤", f"劃分章節失敗: {str(e)}")
+            return
+        
+        if chapters:
+            self.update_chapter_list()
+            self.debug_log(f"✅ 章節劃分完成，共{len(chapters)}章")
+            messagebox.showinfo("成功", f"章節劃分完成！共{len(chapters)}章")
+        else:
+            self.debug_log("❌ 章節劃分失敗")
+            messagebox.showerror("錯誤", "章節劃分失敗")
     
     def start_writing(self):
         """開始寫作"""
@@ -2267,11 +3344,20 @@ class NovelWriterGUI:
         
         messagebox.showinfo("提示", "請選擇章節，然後點擊相應的寫作按鈕開始創作")
     
+    def invalidate_chapter_labels(self):
+        """章節列表原地增刪後呼叫，使章節下拉選單選項重建"""
+        self._chapter_labels_rev += 1
+    
     def update_chapter_list(self):
         """更新章節列表"""
-        chapter_list = []
-        for i, chapter in enumerate(self.project.chapters):
-            chapter_list.append(f"第{i+1}章: {chapter.title}")
+        chapters = self.project.chapters
+        # 整個章節列表被替換（劃分章節、載入項目）時物件不同，原地增刪則靠版本號
+        if (self._chapter_labels_source is not chapters or
+                self._chapter_labels_cache_rev != self._chapter_labels_rev):
+            self._chapter_labels_cache = [f"第{i+1}章: {chapter.title}" for i, chapter in enumerate(chapters)]
+            self._chapter_labels_source = chapters
+            self._chapter_labels_cache_rev = self._chapter_labels_rev
+        chapter_list = self._chapter_labels_cache
         
         self.chapter_combo['values'] = chapter_list
         if chapter_list:
@@ -2292,24 +3378,26 @@ class NovelWriterGUI:
         # 如果章節還沒有段落，先生成章節大綱和段落劃分
         if not chapter.paragraphs:
             def run_task():
+                self.debug_log(f"🚀 為第{chapter_index+1}章生成大綱和段落")
+                
+                # 生成章節大綱
+                self.core.generate_chapter_outline(chapter_index)
+                
+                # 劃分段落
+                self.core.divide_paragraphs(chapter_index)
+            
+            def on_done(future: Future):
                 try:
-                    self.debug_log(f"🚀 為第{chapter_index+1}章生成大綱和段落")
-                    
-                    # 生成章節大綱
-                    self.core.generate_chapter_outline(chapter_index)
-                    
-                    # 劃分段落
-                    self.core.divide_paragraphs(chapter_index)
-                    
-                    # 更新段落列表
-                    self.root.after(0, self.update_paragraph_list)
-                    
-                    self.debug_log(f"✅ 第{chapter_index+1}章準備完成")
-                    
+                    future.result()
                 except Exception as e:
                     self.debug_log(f"❌ 準備第{chapter_index+1}章時發生錯誤: {str(e)}")
+                    return
+                
+                # 更新段落列表
+                self.update_paragraph_list()
+                self.debug_log(f"✅ 第{chapter_index+1}章準備完成")
             
-            threading.Thread(target=run_task, daemon=True).start()
+            self.submit_task(run_task, on_done=on_done)
         else:
             self.update_paragraph_list()
     
@@ -2320,16 +3408,38 @@ class NovelWriterGUI:
             return
         
         chapter = self.project.chapters[chapter_index]
-        paragraph_list = []
-        
-        for i, paragraph in enumerate(chapter.paragraphs):
-            status = paragraph.status.value
-            paragraph_list.append(f"第{i+1}段: {paragraph.purpose} [{status}]")
+        paragraph_list = [self._paragraph_label(i, paragraph) for i, paragraph in enumerate(chapter.paragraphs)]
         
+        self._paragraph_labels = paragraph_list
         self.paragraph_combo['values'] = paragraph_list
         if paragraph_list:
             self.paragraph_combo.current(0)
     
+    @staticmethod
+    def _paragraph_label(index: int, paragraph: Paragraph) -> str:
+        """段落下拉選單中單一選項的顯示文字"""
+        return f"第{index+1}段: {paragraph.purpose} [{paragraph.status.value}]"
+    
+    def update_paragraph_row(self, chapter_index: int, paragraph_index: int):
+        """只更新段落下拉選單中的單一選項，保留目前的選擇"""
+        if chapter_index != self.chapter_combo.current():
+            return
+        if not 0 <= paragraph_index < len(self._paragraph_labels):
+            self.update_paragraph_list()
+            return
+        
+        paragraph = self.project.chapters[chapter_index].paragraphs[paragraph_index]
+        new_label = self._paragraph_label(paragraph_index, paragraph)
+        if self._paragraph_labels[paragraph_index] == new_label:
+            return
+        
+        # 選項文字改變後 current() 無法再比對到原選項，需先記下目前的選擇
+        selected = self.paragraph_combo.current()
+        self._paragraph_labels[paragraph_index] = new_label
+        self.paragraph_combo['values'] = self._paragraph_labels
+        if selected == paragraph_index:
+            self.paragraph_combo.current(paragraph_index)
+    
     def write_current_paragraph(self):
         """寫作當前段落"""
         chapter_index = self.chapter_combo.current()
@@ -2339,71 +3449,187 @@ class NovelWriterGUI:
             messagebox.showerror("錯誤", "請先選擇章節和段落")
             return
         
-        def run_task():
+        self.current_action = f"正在寫作第{chapter_index+1}章第{paragraph_index+1}段..."
+        self.debug_log(f"🚀 開始寫作第{chapter_index+1}章第{paragraph_index+1}段")
+        
+        # 串流顯示生成中的內容，完成後再以格式化結果取代
+        self._begin_stream_display()
+        
+        def on_done(future: Future):
+            self.current_action = ""
             try:
-                self.current_action = f"正在寫作第{chapter_index+1}章第{paragraph_index+1}段..."
-                self.debug_log(f"🚀 開始寫作第{chapter_index+1}章第{paragraph_index+1}段")
-                
-                content = self.core.write_paragraph(chapter_index, paragraph_index, self.tree_callback, self.selected_context_content)
-                
-                if content:
-                    self.root.after(0, lambda: self.display_paragraph_content(content))
-                    self.root.after(0, self.update_paragraph_list)
-                    self.root.after(0, self.update_world_display)
-                    self.debug_log(f"✅ 第{chapter_index+1}章第{paragraph_index+1}段寫作完成")
-                else:
-                    self.debug_log(f"❌ 第{chapter_index+1}章第{paragraph_index+1}段寫作失敗")
-                    
+                content = future.result()
             except Exception as e:
                 self.debug_log(f"❌ 寫作段落時發生錯誤: {str(e)}")
-                self.root.after(0, lambda: messagebox.showerror("錯誤", f"寫作失敗: {str(e)}"))
-            finally:
-                self.current_action = ""
+                messagebox.showerror("錯誤", f"寫作失敗: {str(e)}")
+                return
+            
+            if content:
+                self._on_paragraph_written(chapter_index, paragraph_index, content)
+                self.debug_log(f"✅ 第{chapter_index+1}章第{paragraph_index+1}段寫作完成")
+            else:
+                self.debug_log(f"❌ 第{chapter_index+1}章第{paragraph_index+1}段寫作失敗")
+        
+        self.submit_task(
+            self.core.write_paragraph,
+            chapter_index, paragraph_index, self.tree_callback, self.selected_context_content,
+            self._paragraph_stream(),
+            on_done=on_done
+        )
+    
+    def _on_paragraph_written(self, chapter_index: int, paragraph_index: int, content: str):
+        """單段寫作完成後在主線程中一次更新內容區、段落選項與世界設定
         
-        threading.Thread(target=run_task, daemon=True).start()
+        樹節點已由 tree_callback 的 paragraph_written 事件更新，不需再整棵刷新。
+        """
+        self.display_paragraph_content(content)
+        self.update_paragraph_row(chapter_index, paragraph_index)
+        self.update_world_display()
+    
+    def batch_write_paragraphs(self):
+        """從選中的段落起，將本章未完成的段落分批合併到同一次LLM調用中寫作"""
+        chapter_index = self.chapter_combo.current()
+        if chapter_index < 0 or chapter_index >= len(self.project.chapters):
+            messagebox.showerror("錯誤", "請先選擇章節")
+            return
+        
+        chapter = self.project.chapters[chapter_index]
+        start_index = max(self.paragraph_combo.current(), 0)
+        
+        # 只合併連續的未完成段落，中間已完成的段落會作為下一批的前文
+        batches = []
+        run = []
+        for i in range(start_index, len(chapter.paragraphs)):
+            if chapter.paragraphs[i].status == CreationStatus.COMPLETED:
+                if run:
+                    batches.append(run)
+                    run = []
+                continue
+            run.append(i)
+            if len(run) == self.BATCH_WRITE_SIZE:
+                batches.append(run)
+                run = []
+        if run:
+            batches.append(run)
+        
+        if not batches:
+            messagebox.showinfo("提示", "本章選中段落之後沒有未完成的段落")
+            return
+        
+        pending_count = sum(len(batch) for batch in batches)
+        self.current_action = f"正在批次寫作第{chapter_index+1}章（共{pending_count}段）..."
+        self.debug_log(f"🚀 開始批次寫作第{chapter_index+1}章，共{pending_count}段，分{len(batches)}次調用")
+        selected_context = self.selected_context_content
+        
+        def run_batches() -> int:
+            written_count = 0
+            for batch in batches:
+                if self._closing:
+                    break
+                self.debug_log(f"📦 批次寫作第{chapter_index+1}章第{batch[0]+1}-{batch[-1]+1}段")
+                written = self.core.write_paragraphs_batch(
+                    chapter_index, batch, self.tree_callback, selected_context
+                )
+                missing = [i + 1 for i in batch if i not in written]
+                if missing:
+                    self.debug_log(f"⚠️ 回應中缺少第{', '.join(map(str, missing))}段，請稍後單獨寫作")
+                written_count += len(written)
+            return written_count
+        
+        def on_done(future: Future):
+            self.current_action = ""
+            try:
+                written_count = future.result()
+            except Exception as e:
+                self.debug_log(f"❌ 批次寫作時發生錯誤: {str(e)}")
+                messagebox.showerror("錯誤", f"批次寫作失敗: {str(e)}")
+                return
+            
+            self.update_paragraph_list()
+            self.update_world_display()
+            self.debug_log(f"✅ 第{chapter_index+1}章批次寫作完成，共寫作{written_count}/{pending_count}段")
+        
+        self.submit_task(run_batches, on_done=on_done)
+    
+    @staticmethod
+    def _set_text(widget, text: str):
+        """以單次 replace 取代文字框的全部內容"""
+        widget.replace("1.0", "end-1c", text)
+    
+    @staticmethod
+    def _text_lines(widget) -> List[str]:
+        """讀取文字框內容，單次走訪得到去除空白後的非空行"""
+        return [line for line in map(str.strip, widget.get("1.0", "end-1c").split("\n")) if line]
+    
+    def _paragraph_stream(self) -> JSONContentStream:
+        """段落寫作的串流回調：只顯示回應中 content 欄位的文字，每次重試前清空編輯區"""
+        return JSONContentStream(self._queue_stream_token, self._reset_stream_display)
+    
+    def _begin_stream_display(self):
+        """清空內容編輯區，準備接收串流內容"""
+        self._stream_queue.clear()
+        self.content_text.delete(1.0, tk.END)
+        self.notebook.select(0)
+    
+    def _append_stream_token(self, token):
+        """將串流收到的文字附加到內容編輯區"""
+        self.content_text.insert(tk.END, token)
+        self.content_text.see(tk.END)
     
     def display_paragraph_content(self, content):
         """顯示段落內容"""
-        self.content_text.delete(1.0, tk.END)
-        self.content_text.insert(tk.END, content)
+        # 最終結果為準，丟棄尚未寫入的串流片段
+        self._stream_queue.clear()
+        self._set_text(self.content_text, content)
         self.notebook.select(0)  # 切換到內容編輯頁面
     
-    def update_world_display(self):
-        """更新世界設定顯示"""
+    def update_world_display(self, force: bool = False):
+        """更新世界設定顯示，世界設定未變動時略過重繪（force=True 時強制重繪）"""
+        if self.world_text is None:
+            # 頁面尚未建立，建立時會重新渲染
+            return
+        
         world = self.project.world_building
-        content = []
+        render_key = (id(self.core), self.core.world_version, id(world))
+        if not force and render_key == self._world_rendered_key:
+            return
+        self._world_rendered_key = render_key
+        
+        buf = io.StringIO()
         
         if world.characters:
-            content.append("=== 人物設定 ===")
-            for name, desc in world.characters.items():
-                content.append(f"{name}: {desc}")
-            content.append("")
+            buf.write("=== 人物設定 ===\n")
+            buf.writelines(f"{name}: {desc}\n" for name, desc in world.characters.items())
+            buf.write("\n")
         
         if world.settings:
-            content.append("=== 場景設定 ===")
-            for name, desc in world.settings.items():
-                content.append(f"{name}: {desc}")
-            content.append("")
+            buf.write("=== 場景設定 ===\n")
+            buf.writelines(f"{name}: {desc}\n" for name, desc in world.settings.items())
+            buf.write("\n")
         
         if world.terminology:
-            content.append("=== 專有名詞 ===")
-            for term, desc in world.terminology.items():
-                content.append(f"{term}: {desc}")
-            content.append("")
+            buf.write("=== 專有名詞 ===\n")
+            buf.writelines(f"{term}: {desc}\n" for term, desc in world.terminology.items())
+            buf.write("\n")
         
         if world.plot_points:
-            content.append("=== 重要情節點 ===")
-            for point in world.plot_points:
-                content.append(f"• {point}")
-            content.append("")
+            buf.write("=== 重要情節點 ===\n")
+            buf.writelines(f"• {point}\n" for point in world.plot_points)
+            buf.write("\n")
         
         if world.chapter_notes:
-            content.append("=== 章節註記 ===")
-            for note in world.chapter_notes:
-                content.append(f"• {note}")
+            buf.write("=== 章節註記 ===\n")
+            buf.writelines(f"• {note}\n" for note in world.chapter_notes)
         
-        self.world_text.delete(1.0, tk.END)
-        self.world_text.insert(tk.END, "\n".join(content))
+        # 每行都以換行結尾，去掉最後一個換行即與逐行join的結果相同
+        content = buf.getvalue()[:-1]
+        
+        # 渲染結果與頁面上已同步的內容相同時不動文字框
+        content_hash = hash(content.strip())
+        if not force and content_hash == self._world_text_hash:
+            return
+        self._set_text(self.world_text, content)
+        self._world_text_hash = content_hash
     
     def save_world_settings(self):
         """保存世界設定修改"""
@@ -2415,8 +3641,16 @@ class NovelWriterGUI:
                 messagebox.showwarning("提示", "世界設定內容為空")
                 return
             
+            # 內容未修改時不重新解析，避免覆蓋期間由生成流程加入的設定
+            content_hash = hash(content)
+            if content_hash == self._world_text_hash:
+                self.debug_log("ℹ️ 世界設定內容未修改，略過保存")
+                messagebox.showinfo("提示", "世界設定內容沒有修改")
+                return
+            
             # 解析文本內容並更新世界設定
             self._parse_world_content(content)
+            self._world_text_hash = content_hash
             
             self.debug_log("✅ 世界設定已保存")
             messagebox.showinfo("成功", "世界設定修改已保存！")
@@ -2433,6 +3667,7 @@ class NovelWriterGUI:
         try:
             # 重置世界設定數據
             self.project.world_building = WorldBuilding()
+            self.core.invalidate_world_cache()
             
             # 更新顯示
             self.update_world_display()
@@ -2448,66 +3683,38 @@ class NovelWriterGUI:
         """解析世界設定文本內容"""
         # 重置世界設定
         world = WorldBuilding()
+        target = None
+        is_mapping = False
         
-        lines = content.split('\n')
-        current_section = None
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
+        # 正則一次掃描取得所有去除首尾空白的非空行
+        for match in self._WORLD_LINE_PATTERN.finditer(content):
+            line = match.group(1)
             
             # 檢查是否是章節標題
             if line.startswith("=== ") and line.endswith(" ==="):
-                section_name = line[4:-4].strip()
-                if section_name == "人物設定":
-                    current_section = "characters"
-                elif section_name == "場景設定":
-                    current_section = "settings"
-                elif section_name == "專有名詞":
-                    current_section = "terminology"
-                elif section_name == "重要情節點":
-                    current_section = "plot_points"
-                elif section_name == "章節註記":
-                    current_section = "chapter_notes"
-                else:
-                    current_section = None
+                current_section = self._WORLD_SECTIONS.get(line[4:-4].strip())
+                target = getattr(world, current_section) if current_section else None
+                is_mapping = isinstance(target, dict)
                 continue
             
-            # 根據當前章節解析內容
-            if current_section == "characters":
-                if ":" in line:
-                    name, desc = line.split(":", 1)
-                    world.characters[name.strip()] = desc.strip()
-            
-            elif current_section == "settings":
-                if ":" in line:
-                    name, desc = line.split(":", 1)
-                    world.settings[name.strip()] = desc.strip()
-            
-            elif current_section == "terminology":
-                if ":" in line:
-                    term, desc = line.split(":", 1)
-                    world.terminology[term.strip()] = desc.strip()
-            
-            elif current_section == "plot_points":
-                if line.startswith("• "):
-                    world.plot_points.append(line[2:].strip())
-                elif line.startswith("- "):
-                    world.plot_points.append(line[2:].strip())
-                else:
-                    world.plot_points.append(line.strip())
+            if target is None:
+                continue
             
-            elif current_section == "chapter_notes":
-                if line.startswith("• "):
-                    world.chapter_notes.append(line[2:].strip())
-                elif line.startswith("- "):
-                    world.chapter_notes.append(line[2:].strip())
-                else:
-                    world.chapter_notes.append(line.strip())
+            # 根據當前章節解析內容
+            if is_mapping:
+                # 人物、場景、名詞：「名稱: 描述」
+                name, sep, desc = line.partition(":")
+                if sep:
+                    target[name.strip()] = desc.strip()
+            else:
+                # 情節點、章節註記：可帶「• 」或「- 」前綴
+                if line.startswith(("• ", "- ")):
+                    line = line[2:].strip()
+                target.append(line)
         
         # 更新項目的世界設定
         self.project.world_building = world
+        self.core.invalidate_world_cache()
         self.debug_log("📝 世界設定內容解析完成")
     
     def save_project(self):
@@ -2520,42 +3727,37 @@ class NovelWriterGUI:
             
             if filename:
                 # 將項目數據轉換為可序列化的格式
-                chapters_data = []
-                for chapter in self.project.chapters:
-                    chapter_dict = asdict(chapter)
-                    # 轉換章節狀態枚舉為字符串
-                    chapter_dict["status"] = chapter.status.value
-                    
-                    # 轉換段落狀態枚舉為字符串
-                    for paragraph_dict in chapter_dict["paragraphs"]:
-                        if "status" in paragraph_dict:
-                            # 找到對應的段落對象來獲取狀態
-                            para_index = next(i for i, p in enumerate(chapter.paragraphs) 
-                                            if p.order == paragraph_dict["order"])
-                            paragraph_dict["status"] = chapter.paragraphs[para_index].status.value
-                    
-                    chapters_data.append(chapter_dict)
-                
-                project_data = {
-                    "title": self.project.title,
-                    "theme": self.project.theme,
-                    "outline": self.project.outline,
-                    "outline_additional_prompt": self.project.outline_additional_prompt,
-                    "chapters_additional_prompt": self.project.chapters_additional_prompt,
-                    "chapters": chapters_data,
-                    "world_building": asdict(self.project.world_building)
-                }
+                project_data = self.project.to_dict()
                 
-                with open(filename, "w", encoding="utf-8") as f:
-                    json.dump(project_data, f, ensure_ascii=False, indent=2)
-                
-                self.debug_log(f"✅ 項目已保存到: {filename}")
-                messagebox.showinfo("成功", "項目保存成功！")
+                # 數據快照已在主執行緒建立，序列化與寫檔交給背景執行緒
+                indent = not self.compact_save_var.get()
+                self.submit_task(self._write_project_file, filename, project_data, indent,
+                                 on_done=lambda future: self._on_project_saved(future, filename))
                 
         except Exception as e:
             self.debug_log(f"❌ 保存項目失敗: {str(e)}")
             messagebox.showerror("錯誤", f"保存失敗: {str(e)}")
     
+    @staticmethod
+    def _write_project_file(filename: str, project_data: Dict, indent: bool = True):
+        """將項目數據寫入文件（indent=False 時輸出不縮排的緊湊JSON）"""
+        # 先完整序列化為位元組再一次寫入（可用時由orjson處理），省去字串解碼與重新編碼
+        content = json_dumps_bytes(project_data, indent=indent)
+        with open(filename, "wb", buffering=1 << 20) as f:
+            f.write(content)
+    
+    def _on_project_saved(self, future: Future, filename: str):
+        """項目寫入完成回調（主執行緒）"""
+        try:
+            future.result()
+        except Exception as e:
+            self.debug_log(f"❌ 保存項目失敗: {str(e)}")
+            messagebox.showerror("錯誤", f"保存失敗: {str(e)}")
+            return
+        
+        self.debug_log(f"✅ 項目已保存到: {filename}")
+        messagebox.showinfo("成功", "項目保存成功！")
+    
     def load_project(self):
         """載入項目"""
         try:
@@ -2564,88 +3766,76 @@ class NovelWriterGUI:
             )
             
             if filename:
-                with open(filename, "r", encoding="utf-8") as f:
-                    project_data = json.load(f)
-                
-                # 重建項目數據
-                self.project.title = project_data.get("title", "")
-                self.project.theme = project_data.get("theme", "")
-                self.project.outline = project_data.get("outline", "")
-                self.project.outline_additional_prompt = project_data.get("outline_additional_prompt", "")
-                self.project.chapters_additional_prompt = project_data.get("chapters_additional_prompt", "")
-                
-                # 重建章節數據
-                self.project.chapters = []
-                for chapter_data in project_data.get("chapters", []):
-                    chapter = Chapter(
-                        title=chapter_data["title"],
-                        summary=chapter_data["summary"],
-                        key_events=chapter_data.get("key_events", []),
-                        characters_involved=chapter_data.get("characters_involved", []),
-                        estimated_words=chapter_data.get("estimated_words", 3000),
-                        outline=chapter_data.get("outline", {}),
-                        content=chapter_data.get("content", ""),
-                        status=CreationStatus(chapter_data.get("status", "未開始"))
-                    )
-                    
-                    # 重建段落數據
-                    chapter.paragraphs = []
-                    for para_data in chapter_data.get("paragraphs", []):
-                        paragraph = Paragraph(
-                            order=para_data["order"],
-                            purpose=para_data["purpose"],
-                            content_type=para_data.get("content_type", ""),
-                            key_points=para_data.get("key_points", []),
-                            estimated_words=para_data.get("estimated_words", 0),
-                            mood=para_data.get("mood", ""),
-                            content=para_data.get("content", ""),
-                            status=CreationStatus(para_data.get("status", "未開始")),
-                            word_count=para_data.get("word_count", 0)
-                        )
-                        chapter.paragraphs.append(paragraph)
-                    
-                    self.project.chapters.append(chapter)
-                
-                # 重建世界設定
-                world_data = project_data.get("world_building", {})
-                self.project.world_building = WorldBuilding(
-                    characters=world_data.get("characters", {}),
-                    settings=world_data.get("settings", {}),
-                    terminology=world_data.get("terminology", {}),
-                    plot_points=world_data.get("plot_points", []),
-                    relationships=world_data.get("relationships", []),
-                    style_guide=world_data.get("style_guide", "")
-                )
-                
-                # 更新UI
-                self.title_entry.delete(0, tk.END)
-                self.title_entry.insert(0, self.project.title)
-                self.theme_entry.delete(0, tk.END)
-                self.theme_entry.insert(0, self.project.theme)
-                
-                # 更新額外指示輸入框
-                self.outline_prompt_entry.delete("1.0", tk.END)
-                self.outline_prompt_entry.insert("1.0", self.project.outline_additional_prompt)
-                self.chapters_prompt_entry.delete("1.0", tk.END)
-                self.chapters_prompt_entry.insert("1.0", self.project.chapters_additional_prompt)
-                
-                if self.project.outline:
-                    self.content_text.delete(1.0, tk.END)
-                    self.content_text.insert(tk.END, self.project.outline)
-                
-                self.update_chapter_list()
-                self.update_world_display()
-                
-                # 重要：載入項目後刷新樹狀圖
-                self.refresh_tree()
-                
-                self.debug_log(f"✅ 項目已載入: {filename}")
-                messagebox.showinfo("成功", "項目載入成功！")
+                # 讀檔、解析與重建章節在背景執行緒進行
+                self.submit_task(self._read_project_file, filename,
+                                 on_done=lambda future: self._on_project_loaded(future, filename))
                 
         except Exception as e:
             self.debug_log(f"❌ 載入項目失敗: {str(e)}")
             messagebox.showerror("錯誤", f"載入失敗: {str(e)}")
     
+    @staticmethod
+    def _read_project_file(filename: str) -> Dict:
+        """讀取並解析項目文件，章節數據直接重建為 Chapter 物件"""
+        with open(filename, "rb") as f:
+            project_data = json_loads(f.read())
+        
+        # 在背景執行緒中完成解析與物件重建，主執行緒只需套用結果
+        project_data["chapters"] = [Chapter.from_dict(chapter_data)
+                                    for chapter_data in project_data.get("chapters") or []]
+        return project_data
+    
+    def _on_project_loaded(self, future: Future, filename: str):
+        """項目文件讀取完成回調（主執行緒），套用到目前項目並刷新介面"""
+        try:
+            project_data = future.result()
+            
+            # 重建項目數據
+            self.project.title = project_data.get("title", "")
+            self.project.theme = project_data.get("theme", "")
+            self.project.outline = project_data.get("outline", "")
+            self.project.outline_additional_prompt = project_data.get("outline_additional_prompt", "")
+            self.project.chapters_additional_prompt = project_data.get("chapters_additional_prompt", "")
+            self.project.chapters = project_data["chapters"]
+            
+            # 重建世界設定
+            world_data = project_data.get("world_building", {})
+            self.project.world_building = WorldBuilding(
+                characters=world_data.get("characters", {}),
+                settings=world_data.get("settings", {}),
+                terminology=world_data.get("terminology", {}),
+                plot_points=world_data.get("plot_points", []),
+                relationships=world_data.get("relationships", []),
+                style_guide=world_data.get("style_guide", "")
+            )
+            self.core.invalidate_world_cache()
+            
+            # 更新UI
+            self.title_entry.delete(0, tk.END)
+            self.title_entry.insert(0, self.project.title)
+            self.theme_entry.delete(0, tk.END)
+            self.theme_entry.insert(0, self.project.theme)
+            
+            # 更新額外指示輸入框
+            self._set_text(self.outline_prompt_entry, self.project.outline_additional_prompt)
+            self._set_text(self.chapters_prompt_entry, self.project.chapters_additional_prompt)
+            
+            if self.project.outline:
+                self._set_text(self.content_text, self.project.outline)
+            
+            self.update_chapter_list()
+            self.update_world_display()
+            
+            # 重要：載入項目後刷新樹狀圖
+            self.refresh_tree()
+            
+            self.debug_log(f"✅ 項目已載入: {filename}")
+            messagebox.showinfo("成功", "項目載入成功！")
+            
+        except Exception as e:
+            self.debug_log(f"❌ 載入項目失敗: {str(e)}")
+            messagebox.showerror("錯誤", f"載入失敗: {str(e)}")
+    
     def export_novel(self):
         """導出小說"""
         try:
@@ -2655,25 +3845,19 @@ class NovelWriterGUI:
             )
             
             if filename:
-                content = []
-                content.append(f"《{self.project.title}》")
-                content.append("=" * 50)
-                content.append("")
-                
-                for i, chapter in enumerate(self.project.chapters):
-                    content.append(f"第{i+1}章 {chapter.title}")
-                    content.append("-" * 30)
-                    content.append("")
+                # 直接逐段寫入文件，不在記憶體中組出整本小說的字串
+                with open(filename, "w", encoding="utf-8", buffering=1 << 20) as f:
+                    write = f.write
+                    write(f"《{self.project.title}》\n{'=' * 50}\n")
                     
-                    for paragraph in chapter.paragraphs:
-                        if paragraph.content:
-                            content.append(paragraph.content)
-                            content.append("")
-                    
-                    content.append("")
-                
-                with open(filename, "w", encoding="utf-8") as f:
-                    f.write("\n".join(content))
+                    for i, chapter in enumerate(self.project.chapters):
+                        write(f"\n第{i+1}章 {chapter.title}\n{'-' * 30}\n")
+                        
+                        for paragraph in chapter.paragraphs:
+                            if paragraph.content:
+                                write(f"\n{paragraph.content}\n")
+                        
+                        write("\n")
                 
                 self.debug_log(f"✅ 小說已導出到: {filename}")
                 messagebox.showinfo("成功", "小說導出成功！")
@@ -2732,10 +3916,40 @@ class NovelWriterGUI:
             self.progress_var.set("智能自動寫作已停止")
             self.debug_log("⏹️ 智能自動寫作模式停止")
     
+    def _prepare_chapter_for_auto_writing(self, chapter_index: int):
+        """為自動寫作生成章節大綱並劃分段落（可在執行緒池中預先執行）
+        
+        每個步驟前檢查自動寫作是否已停止，停止後不再調用API或修改章節。
+        """
+        if not self.auto_writing:
+            return
+        self.debug_log(f"🚀 為第{chapter_index+1}章生成大綱和段落")
+        chapter = self.project.chapters[chapter_index]
+        
+        # 標記章節為進行中狀態
+        chapter.status = CreationStatus.IN_PROGRESS
+        self.schedule_node_update(chapter)
+        
+        # 生成章節大綱
+        self.core.generate_chapter_outline(chapter_index, self.tree_callback)
+        
+        if not self.auto_writing:
+            # 大綱已保留，段落尚未劃分，恢復為未開始狀態
+            chapter.status = CreationStatus.NOT_STARTED
+            self.schedule_node_update(chapter)
+            self.debug_log(f"⏹️ 自動寫作已停止，略過第{chapter_index+1}章的段落劃分")
+            return
+        
+        # 劃分段落
+        self.core.divide_paragraphs(chapter_index, self.tree_callback)
+    
     def auto_writing_worker(self):
         """自動寫作工作線程"""
+        # 已提交背景準備的章節：章節索引 -> Future
+        prepared = {}
         try:
             delay = int(self.delay_var.get())
+            sleep = time.sleep
             
             for chapter_index, chapter in enumerate(self.project.chapters):
                 if not self.auto_writing:
@@ -2745,34 +3959,36 @@ class NovelWriterGUI:
                 self.root.after(0, lambda ci=chapter_index: self.progress_var.set(
                     f"處理第{ci+1}章: {self.project.chapters[ci].title}"))
                 
-                # 確保章節有段落
-                if not chapter.paragraphs:
-                    self.debug_log(f"🚀 為第{chapter_index+1}章生成大綱和段落")
-                    
+                # 確保章節有段落（可能已在寫作上一章時於背景預先準備）
+                prepare_future = prepared.pop(chapter_index, None)
+                if prepare_future is not None or not chapter.paragraphs:
                     try:
-                        # 標記章節為進行中狀態
-                        chapter.status = CreationStatus.IN_PROGRESS
-                        self.root.after(0, self.refresh_tree)
-                        
-                        # 生成章節大綱
-                        self.core.generate_chapter_outline(chapter_index, self.tree_callback)
-                        
-                        # 劃分段落
-                        self.core.divide_paragraphs(chapter_index, self.tree_callback)
+                        if prepare_future is not None:
+                            prepare_future.result()
+                        else:
+                            self._prepare_chapter_for_auto_writing(chapter_index)
+                        if not self.auto_writing:
+                            break
                         
                         # 更新UI和樹狀圖
                         if chapter_index == self.chapter_combo.current():
                             self.root.after(0, self.update_paragraph_list)
-                        self.root.after(0, self.refresh_tree)
+                        self.schedule_refresh()
                         
                         self.debug_log(f"✅ 第{chapter_index+1}章準備完成")
                         
                     except Exception as e:
                         chapter.status = CreationStatus.ERROR
-                        self.root.after(0, self.refresh_tree)
+                        self.schedule_node_update(chapter)
                         self.debug_log(f"❌ 準備第{chapter_index+1}章時發生錯誤: {str(e)}")
                         continue
                 
+                # 寫作本章段落的同時，在執行緒池中預先生成下一章的大綱和段落
+                next_index = chapter_index + 1
+                if (self.auto_writing and next_index < len(self.project.chapters) and
+                        not self.project.chapters[next_index].paragraphs):
+                    prepared[next_index] = self.submit_task(self._prepare_chapter_for_auto_writing, next_index)
+                
                 # 寫作所有段落
                 for paragraph_index, paragraph in enumerate(chapter.paragraphs):
                     if not self.auto_writing:
@@ -2788,7 +4004,7 @@ class NovelWriterGUI:
                     
                     # 標記段落為進行中狀態並更新樹狀圖
                     paragraph.status = CreationStatus.IN_PROGRESS
-                    self.root.after(0, self.refresh_tree)
+                    self.schedule_node_update(paragraph)
                     
                     # 段落寫作重試機制
                     paragraph_retry_max = 2  # 段落寫作重試次數
@@ -2829,15 +4045,14 @@ class NovelWriterGUI:
                                 self.root.after(0, self.update_world_display)
                                 
                                 # 立即更新樹狀圖以顯示完成狀態
-                                self.root.after(0, self.refresh_tree)
+                                self.schedule_node_update(paragraph, chapter)
                                 
                                 self.debug_log(f"✅ 第{chapter_index+1}章第{paragraph_index+1}段自動寫作完成")
                                 paragraph_success = True
                                 
                                 # 延遲
                                 if self.auto_writing:
-                                    import time
-                                    time.sleep(delay)
+                                    sleep(delay)
                                 break  # 成功後跳出重試循環
                             else:
                                 self.debug_log(f"❌ 第{chapter_index+1}章第{paragraph_index+1}段寫作失敗，內容為空")
@@ -2845,71 +4060,75 @@ class NovelWriterGUI:
                                     self.debug_log(f"⚠️ 第{chapter_index+1}章第{paragraph_index+1}段重試次數已用盡，跳過此段落")
                                     # 標記段落為錯誤狀態
                                     paragraph.status = CreationStatus.ERROR
-                                    self.root.after(0, self.refresh_tree)
+                                    self.schedule_node_update(paragraph)
                                 
                         except JSONParseException as e:
                             self.debug_log(f"❌ 第{chapter_index+1}章第{paragraph_index+1}段JSON解析失敗: {str(e)}")
                             if retry_attempt == paragraph_retry_max - 1:
                                 self.debug_log(f"⚠️ 第{chapter_index+1}章第{paragraph_index+1}段JSON解析重試次數已用盡，跳過此段落")
                                 paragraph.status = CreationStatus.ERROR
-                                self.root.after(0, self.refresh_tree)
+                                self.schedule_node_update(paragraph)
                             else:
                                 # JSON解析失敗時稍微延遲再重試
-                                import time
-                                time.sleep(1)
+                                sleep(1)
                                 
                         except APIException as e:
                             self.debug_log(f"❌ 第{chapter_index+1}章第{paragraph_index+1}段API調用失敗: {str(e)}")
                             if retry_attempt == paragraph_retry_max - 1:
                                 self.debug_log(f"⚠️ 第{chapter_index+1}章第{paragraph_index+1}段API重試次數已用盡，跳過此段落")
                                 paragraph.status = CreationStatus.ERROR
-                                self.root.after(0, self.refresh_tree)
+                                self.schedule_node_update(paragraph)
                             else:
                                 # API失敗時延遲更長時間再重試
-                                import time
-                                time.sleep(3)
+                                sleep(3)
                                 
                         except Exception as e:
                             self.debug_log(f"❌ 自動寫作第{chapter_index+1}章第{paragraph_index+1}段時發生未預期錯誤: {str(e)}")
                             if retry_attempt == paragraph_retry_max - 1:
                                 self.debug_log(f"⚠️ 第{chapter_index+1}章第{paragraph_index+1}段重試次數已用盡，跳過此段落")
                                 paragraph.status = CreationStatus.ERROR
-                                self.root.after(0, self.refresh_tree)
+                                self.schedule_node_update(paragraph)
                             else:
-                                import time
-                                time.sleep(2)
+                                sleep(2)
                     
                     # 如果段落寫作失敗，更新段落列表和樹狀圖以顯示錯誤狀態
                     if not paragraph_success:
                         if chapter_index == self.chapter_combo.current():
                             self.root.after(0, self.update_paragraph_list)
-                        self.root.after(0, self.refresh_tree)
+                        self.schedule_node_update(paragraph)
+                
+                # 檢查章節是否完成：單次遍歷，遇到錯誤段落即可確定結果
+                chapter_completed = True
+                has_error = False
+                for p in chapter.paragraphs:
+                    if p.status is not CreationStatus.COMPLETED:
+                        chapter_completed = False
+                        if p.status is CreationStatus.ERROR:
+                            has_error = True
+                            break
                 
-                # 檢查章節是否完成
-                chapter_completed = all(p.status == CreationStatus.COMPLETED for p in chapter.paragraphs)
                 if chapter_completed:
                     chapter.status = CreationStatus.COMPLETED
                     self.debug_log(f"🎉 第{chapter_index+1}章全部完成！")
-                elif any(p.status == CreationStatus.ERROR for p in chapter.paragraphs):
+                elif has_error:
                     chapter.status = CreationStatus.ERROR
                     self.debug_log(f"⚠️ 第{chapter_index+1}章包含錯誤段落")
                 else:
                     chapter.status = CreationStatus.IN_PROGRESS
                 
                 # 更新樹狀圖以顯示章節狀態
-                self.root.after(0, self.refresh_tree)
+                self.schedule_node_update(chapter)
                 
                 # 章節完成後的延遲
                 if self.auto_writing and chapter_index < len(self.project.chapters) - 1:
-                    import time
-                    time.sleep(delay * 2)  # 章節間延遲更長
+                    sleep(delay * 2)  # 章節間延遲更長
             
             # 自動寫作完成
             if self.auto_writing:
                 self.auto_writing = False
                 self.root.after(0, lambda: self.auto_button.config(text="開始自動寫作", style=""))
                 self.root.after(0, lambda: self.progress_var.set("自動寫作完成！"))
-                self.root.after(0, self.refresh_tree)  # 最終更新樹狀圖
+                self.schedule_refresh()  # 最終更新樹狀圖
                 self.debug_log("🎉 自動寫作全部完成！")
                 self.root.after(0, lambda: messagebox.showinfo("完成", "自動寫作已完成！"))
                 
@@ -2918,7 +4137,11 @@ class NovelWriterGUI:
             self.auto_writing = False
             self.root.after(0, lambda: self.auto_button.config(text="開始自動寫作", style=""))
             self.root.after(0, lambda: self.progress_var.set("自動寫作出錯"))
-            self.root.after(0, self.refresh_tree)  # 出錯時也更新樹狀圖
+            self.schedule_refresh()  # 出錯時也更新樹狀圖
+        finally:
+            # 停止或出錯時取消尚未開始的章節準備；執行中的準備會在下一步前檢查停止旗標
+            for future in prepared.values():
+                future.cancel()
     
     def get_writing_progress(self):
         """獲取寫作進度"""
@@ -2930,66 +4153,250 @@ class NovelWriterGUI:
         
         for chapter in self.project.chapters:
             total_paragraphs += len(chapter.paragraphs)
-            for paragraph in chapter.paragraphs:
-                if paragraph.status == CreationStatus.COMPLETED:
-                    completed_paragraphs += 1
+            completed_paragraphs += chapter.get_paragraph_stats()[1]
         
         progress_percent = (completed_paragraphs / total_paragraphs * 100) if total_paragraphs > 0 else 0
         
         return completed_paragraphs, total_paragraphs, progress_percent
     
     # 階層樹視圖相關方法
+    @contextmanager
+    def _bulk_tree_update(self, detached_item: str = ""):
+        """批量修改樹視圖：期間暫停欄位佈局與自動伸縮，可選擇暫時分離節點，結束後一次性恢復"""
+        display_columns = self.tree["displaycolumns"]
+        self.tree.configure(displaycolumns=())
+        
+        # 暫時固定各欄寬度，避免插入期間重新計算伸縮
+        column = self.tree.column
+        stretch_states = {col: column(col, "stretch") for col in ("#0", *self.tree["columns"])}
+        for col in stretch_states:
+            column(col, stretch=False)
+        
+        if detached_item:
+            parent = self.tree.parent(detached_item)
+            index = self.tree.index(detached_item)
+            self.tree.detach(detached_item)
+        
+        try:
+            yield
+        finally:
+            if detached_item:
+                self.tree.move(detached_item, parent, index)
+            for col, stretch in stretch_states.items():
+                column(col, stretch=stretch)
+            self.tree.configure(displaycolumns=display_columns)
+    
+    def update_tree_nodes(self, *items):
+        """只更新指定章節/段落節點的狀態與字數欄位（主執行緒），節點尚未建立時略過"""
+        updated = False
+        for item in items:
+            entry = self._tree_nodes.get(id(item))
+            if entry is None or entry[0] is not item or not self.tree.exists(entry[1]):
+                continue
+            if isinstance(item, Chapter):
+                values = (item.status.value, item.get_paragraph_stats()[0])
+            else:
+                values = (item.status.value, item.word_count)
+            self.tree.item(entry[1], values=values)
+            updated = True
+        
+        # 同步根節點的全書總字數
+        root = self._tree_root_node
+        if updated and root is not None and self.tree.exists(root):
+            self.tree.set(root, "words", self.project.get_total_word_count())
+    
+    def _registered_chapter_node(self, chapter_index: int) -> Optional[str]:
+        """獲取由項目數據建立、仍在樹上的章節節點，找不到時回傳None"""
+        if chapter_index is None or not 0 <= chapter_index < len(self.project.chapters):
+            return None
+        chapter = self.project.chapters[chapter_index]
+        entry = self._tree_nodes.get(id(chapter))
+        if entry is None or entry[0] is not chapter or not self.tree.exists(entry[1]):
+            return None
+        return entry[1]
+    
+    def refresh_paragraph_node(self, chapter_index: int, paragraph_index: int):
+        """段落內容修改後只更新該段落節點與所屬章節的字數，無法定位節點時才完整刷新"""
+        if (self._registered_chapter_node(chapter_index) is None or
+                paragraph_index >= len(self.project.chapters[chapter_index].paragraphs)):
+            self.refresh_tree()
+            return
+        
+        chapter = self.project.chapters[chapter_index]
+        paragraph = chapter.paragraphs[paragraph_index]
+        entry = self._tree_nodes.get(id(paragraph))
+        # 章節尚未展開時段落節點不存在，展開時會以最新數據建立
+        if entry is not None and entry[0] is paragraph and self.tree.exists(entry[1]):
+            self.tree.item(entry[1], text=paragraph.get_tree_label(paragraph_index),
+                           values=(paragraph.status.value, paragraph.word_count))
+        self.update_tree_nodes(chapter)
+    
+    def refresh_chapter_outline_node(self, chapter_index: int):
+        """章節大綱修改後只更新大綱節點，大綱節點需要新增或移除時才完整刷新"""
+        chapter_node = self._registered_chapter_node(chapter_index)
+        chapter = self.project.chapters[chapter_index] if chapter_node is not None else None
+        if chapter is None or not chapter.outline:
+            self.refresh_tree()
+            return
+        
+        if chapter_node in self._unpopulated_tree_nodes:
+            return  # 展開時會以最新數據建立
+        
+        for child in self.tree.get_children(chapter_node):
+            if "chapter_outline" in self.tree.item(child, "tags"):
+                self.tree.item(child, values=("已完成", len(str(chapter.outline))))
+                return
+        
+        self.refresh_tree()
+    
+    def schedule_node_update(self, *items):
+        """從背景執行緒排程單一節點更新"""
+        self._dispatch_to_main(self.update_tree_nodes, *items)
+    
+    def schedule_refresh(self):
+        """排程刷新樹視圖，已有排程中的刷新時直接合併（可從任意執行緒調用）"""
+        if self._refresh_pending or self._closing:
+            return
+        self._refresh_pending = True
+        try:
+            self.root.after(self.TREE_REFRESH_DELAY, self._do_refresh)
+        except (tk.TclError, RuntimeError):
+            self._refresh_pending = False  # 窗口已關閉
+    
+    def _do_refresh(self):
+        """執行排程中的樹視圖刷新"""
+        self._refresh_pending = False
+        self.refresh_tree()
+    
     def refresh_tree(self):
         """刷新階層樹視圖"""
         # 清空樹
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        self.tree.delete(*self.tree.get_children())
+        self._unpopulated_tree_nodes.clear()
+        self._default_chapter_nodes.clear()
+        self._tree_nodes.clear()
+        self._node_meta.clear()
+        self._next_chapter_index = 0
+        self._tree_root_node = None
         
         if not self.project.title:
             return
         
-        # 添加根節點（小說標題）
+        # 添加根節點（小說標題），建立時即設為展開
         root_node = self.tree.insert("", "end", text=f"📖 {self.project.title}", 
-                                     values=("", ""), tags=("root",))
+                                     values=("", self.project.get_total_word_count()),
+                                     tags=("root",), open=True)
+        self._tree_root_node = root_node
+        
+        # 根節點分離狀態下建立子節點，完成後再掛回樹上
+        with self._bulk_tree_update(root_node):
+            self._build_root_children(root_node)
+        self._next_chapter_index = len(self.project.chapters)
+        
+        # 更新樹視圖後，同步更新章節列表
+        self.update_chapter_list()
+    
+    def _build_root_children(self, root_node):
+        """建立根節點下的大綱與章節節點"""
+        insert = self.tree.insert
+        mark_unpopulated = self._unpopulated_tree_nodes.add
+        tree_nodes = self._tree_nodes
+        node_meta = self._node_meta
         
         # 添加大綱節點
         if self.project.outline:
-            outline_node = self.tree.insert(root_node, "end", text="📋 整體大綱", 
-                                           values=("已完成", len(self.project.outline)), 
-                                           tags=("outline",))
+            insert(root_node, "end", text="📋 整體大綱", 
+                   values=("已完成", len(self.project.outline)), 
+                   tags=("outline",))
         
         # 添加章節節點
         for i, chapter in enumerate(self.project.chapters):
-            chapter_status = chapter.status.value if hasattr(chapter, 'status') else "未開始"
-            chapter_words = sum(p.word_count for p in chapter.paragraphs)
-            
-            chapter_node = self.tree.insert(root_node, "end", 
-                                           text=f"📚 第{i+1}章: {chapter.title}", 
-                                           values=(chapter_status, chapter_words), 
-                                           tags=("chapter", f"chapter_{i}"))
-            
-            # 添加章節大綱節點
-            if chapter.outline:
-                outline_text = "📝 章節大綱"
-                self.tree.insert(chapter_node, "end", text=outline_text, 
-                               values=("已完成", len(str(chapter.outline))), 
-                               tags=("chapter_outline", f"chapter_{i}"))
-            
-            # 添加段落節點
-            for j, paragraph in enumerate(chapter.paragraphs):
-                para_status = paragraph.status.value
-                para_words = paragraph.word_count
-                
-                para_node = self.tree.insert(chapter_node, "end", 
-                                           text=f"📄 第{j+1}段: {paragraph.purpose[:20]}...", 
-                                           values=(para_status, para_words), 
-                                           tags=("paragraph", f"chapter_{i}", f"paragraph_{j}"))
+            text = f"📚 第{i+1}章: {chapter.title}"
+            values = (chapter.status.value, chapter.get_paragraph_stats()[0])
+            chapter_node = insert(root_node, "end", text=text, values=values,
+                                  tags=("chapter", f"chapter_{i}"))
+            tree_nodes[id(chapter)] = (chapter, chapter_node)
+            node_meta[chapter_node] = (i, None)
+            
+            # 子節點延遲到章節展開時才建立，先放一個佔位節點以顯示展開箭頭
+            if chapter.outline or chapter.paragraphs:
+                insert(chapter_node, "end", text="…", values=("", ""), tags=("placeholder",))
+                mark_unpopulated(chapter_node)
+    
+    def on_tree_open(self, event):
+        """樹視圖展開事件，首次展開章節時載入其子節點"""
+        self._populate_tree_node(self.tree.focus())
+    
+    def _populate_tree_node(self, item):
+        """為延遲載入的章節節點建立章節大綱和段落子節點"""
+        if item not in self._unpopulated_tree_nodes:
+            return
+        self._unpopulated_tree_nodes.discard(item)
         
-        # 展開根節點
-        self.tree.item(root_node, open=True)
+        # 移除佔位節點
+        self.tree.delete(*self.tree.get_children(item))
         
-        # 更新樹視圖後，同步更新章節列表
-        self.update_chapter_list()
+        i = self._get_node_indices(item)[0]
+        if i is None:
+            return
+        
+        if item in self._default_chapter_nodes:
+            self._default_chapter_nodes.discard(item)
+            with self._bulk_tree_update():
+                self._build_default_chapter_children(item, i)
+            return
+        
+        if i >= len(self.project.chapters):
+            return
+        
+        with self._bulk_tree_update():
+            self._build_chapter_children(item, i, self.project.chapters[i])
+    
+    def _build_chapter_children(self, item, i, chapter):
+        """建立章節節點下的章節大綱與段落節點"""
+        insert = self.tree.insert
+        tree_nodes = self._tree_nodes
+        node_meta = self._node_meta
+        chapter_tag = f"chapter_{i}"
+        
+        # 添加章節大綱節點
+        if chapter.outline:
+            outline_node = insert(item, "end", text="📝 章節大綱", 
+                                  values=("已完成", len(str(chapter.outline))), 
+                                  tags=("chapter_outline", chapter_tag))
+            node_meta[outline_node] = (i, None)
+        
+        # 添加段落節點
+        for j, paragraph in enumerate(chapter.paragraphs):
+            text = paragraph.get_tree_label(j)
+            values = (paragraph.status.value, paragraph.word_count)
+            paragraph_node = insert(item, "end", text=text, values=values,
+                                    tags=("paragraph", chapter_tag, f"paragraph_{j}"))
+            tree_nodes[id(paragraph)] = (paragraph, paragraph_node)
+            node_meta[paragraph_node] = (i, j)
+    
+    def _build_default_chapter_children(self, item, i):
+        """建立預設章節的章節大綱與三個示例段落節點"""
+        insert = self.tree.insert
+        node_meta = self._node_meta
+        default_values = self.DEFAULT_NODE_VALUES
+        chapter_tag = f"chapter_{i}"
+        
+        outline_node = insert(item, "end", text="📝 章節大綱", 
+                              values=default_values, 
+                              tags=("chapter_outline", chapter_tag))
+        node_meta[outline_node] = (i, None)
+        
+        for j, text in enumerate(self.DEFAULT_PARAGRAPH_TEXTS):
+            paragraph_node = insert(item, "end", text=text, values=default_values, 
+                                    tags=("paragraph", chapter_tag, f"paragraph_{j}"))
+            node_meta[paragraph_node] = (i, j)
+    
+    def _defer_default_chapter_children(self, chapter_node):
+        """以佔位節點代替預設子節點，待章節展開時才建立"""
+        self.tree.insert(chapter_node, "end", text="…", values=("", ""), tags=("placeholder",))
+        self._unpopulated_tree_nodes.add(chapter_node)
+        self._default_chapter_nodes.add(chapter_node)
     
     def on_tree_select(self, event):
         """樹視圖選擇事件"""
@@ -3003,21 +4410,20 @@ class NovelWriterGUI:
         if not tags:
             return
         
+        chapter_index, paragraph_index = self._get_node_indices(item, tags)
+        
         # 根據標籤類型處理選擇
         if "outline" in tags:
             # 選擇了整體大綱
             self.display_content(self.project.outline, "整體大綱")
         elif "chapter_outline" in tags:
             # 選擇了章節大綱
-            chapter_index = self._extract_chapter_index(tags)
             if chapter_index is not None and chapter_index < len(self.project.chapters):
                 chapter = self.project.chapters[chapter_index]
-                outline_text = json.dumps(chapter.outline, ensure_ascii=False, indent=2)
+                outline_text = chapter.get_outline_json()
                 self.display_content(outline_text, f"第{chapter_index+1}章大綱")
         elif "paragraph" in tags:
             # 選擇了段落
-            chapter_index = self._extract_chapter_index(tags)
-            paragraph_index = self._extract_paragraph_index(tags)
             if (chapter_index is not None and paragraph_index is not None and 
                 chapter_index < len(self.project.chapters) and 
                 paragraph_index < len(self.project.chapters[chapter_index].paragraphs)):
@@ -3031,7 +4437,6 @@ class NovelWriterGUI:
                 self.paragraph_combo.current(paragraph_index)
         elif "chapter" in tags:
             # 選擇了章節
-            chapter_index = self._extract_chapter_index(tags)
             if chapter_index is not None and chapter_index < len(self.project.chapters):
                 chapter = self.project.chapters[chapter_index]
                 
@@ -3072,15 +4477,14 @@ class NovelWriterGUI:
         if not tags:
             return
         
+        chapter_index, paragraph_index = self._get_node_indices(item, tags)
+        
         # 根據選中的項目類型打開編輯窗口
         if "outline" in tags:
             self._edit_outline()
         elif "chapter_outline" in tags:
-            chapter_index = self._extract_chapter_index(tags)
             self._edit_chapter_outline(chapter_index)
         elif "paragraph" in tags:
-            chapter_index = self._extract_chapter_index(tags)
-            paragraph_index = self._extract_paragraph_index(tags)
             self._edit_paragraph_content(chapter_index, paragraph_index)
     
     def regenerate_selected_content(self):
@@ -3100,39 +4504,40 @@ class NovelWriterGUI:
         if not messagebox.askyesno("確認", "確定要重新生成選中的內容嗎？這將覆蓋現有內容。"):
             return
         
+        chapter_index, paragraph_index = self._get_node_indices(item, tags)
+        
         # 根據選中的項目類型重新生成
         if "chapter_outline" in tags:
-            chapter_index = self._extract_chapter_index(tags)
             self._regenerate_chapter_outline(chapter_index)
         elif "paragraph" in tags:
-            chapter_index = self._extract_chapter_index(tags)
-            paragraph_index = self._extract_paragraph_index(tags)
             self._regenerate_paragraph(chapter_index, paragraph_index)
     
     def expand_all_tree(self):
         """展開所有樹節點"""
-        def expand_item(item):
-            self.tree.item(item, open=True)
-            for child in self.tree.get_children(item):
-                expand_item(child)
-        
-        for item in self.tree.get_children():
-            expand_item(item)
+        self._set_tree_open_state(True)
     
     def collapse_all_tree(self):
         """收起所有樹節點"""
-        def collapse_item(item):
-            self.tree.item(item, open=False)
-            for child in self.tree.get_children(item):
-                collapse_item(child)
-        
-        for item in self.tree.get_children():
-            collapse_item(item)
+        self._set_tree_open_state(False)
+    
+    def _set_tree_open_state(self, is_open: bool):
+        """以迭代方式走訪整棵樹並設定展開狀態（展開時先載入延遲建立的子節點）"""
+        get_children = self.tree.get_children
+        set_item = self.tree.item
+        populate = self._populate_tree_node
+        
+        with self._bulk_tree_update():
+            stack = list(get_children())
+            while stack:
+                item = stack.pop()
+                if is_open:
+                    populate(item)
+                set_item(item, open=is_open)
+                stack.extend(get_children(item))
     
     def display_content(self, content, title):
         """在內容編輯區顯示內容"""
-        self.content_text.delete(1.0, tk.END)
-        self.content_text.insert(tk.END, content)
+        self._set_text(self.content_text, content)
         self.notebook.select(0)  # 切換到內容編輯頁面
         
         # 更新選中的上下文內容
@@ -3141,6 +4546,20 @@ class NovelWriterGUI:
         self.debug_log(f"📖 顯示內容: {title}")
         self.debug_log(f"🎯 已設定選中內容作為下次生成的參考上下文")
     
+    def _get_node_indices(self, item, tags=None) -> tuple:
+        """獲取節點對應的 (章節索引, 段落索引)，未登記的節點才退回解析標籤"""
+        meta = self._node_meta.get(item)
+        if meta is not None:
+            return meta
+        if tags is None:
+            tags = self.tree.item(item, "tags")
+        return self._extract_chapter_index(tags), self._extract_paragraph_index(tags)
+    
+    @staticmethod
+    def _node_kind(tags) -> str:
+        """節點類型（root/outline/chapter/chapter_outline/paragraph/placeholder），插入時固定放在第一個標籤"""
+        return tags[0] if tags else ""
+    
     def _extract_chapter_index(self, tags):
         """從標籤中提取章節索引"""
         for tag in tags:
@@ -3172,7 +4591,7 @@ class NovelWriterGUI:
         text_frame = ttk.Frame(edit_window)
         text_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
-        text_widget = scrolledtext.ScrolledText(text_frame, wrap=tk.WORD, font=("Microsoft YaHei", 11))
+        text_widget = scrolledtext.ScrolledText(text_frame, wrap=tk.WORD, font="nw.text")
         text_widget.pack(fill=tk.BOTH, expand=True)
         text_widget.insert(tk.END, self.project.outline)
         
@@ -3209,10 +4628,10 @@ class NovelWriterGUI:
         text_frame = ttk.Frame(edit_window)
         text_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
-        text_widget = scrolledtext.ScrolledText(text_frame, wrap=tk.WORD, font=("Microsoft YaHei", 11))
+        text_widget = scrolledtext.ScrolledText(text_frame, wrap=tk.WORD, font="nw.text")
         text_widget.pack(fill=tk.BOTH, expand=True)
         
-        outline_text = json.dumps(chapter.outline, ensure_ascii=False, indent=2)
+        outline_text = chapter.get_outline_json()
         text_widget.insert(tk.END, outline_text)
         
         # 按鈕框架
@@ -3223,8 +4642,13 @@ class NovelWriterGUI:
             new_content = text_widget.get(1.0, tk.END).strip()
             try:
                 # 嘗試解析為JSON
-                chapter.outline = json.loads(new_content)
-                self.refresh_tree()
+                new_outline = json_loads(new_content)
+                if new_outline == chapter.outline:
+                    # 大綱未修改，不需要更新樹視圖
+                    edit_window.destroy()
+                    return
+                chapter.outline = new_outline
+                self.refresh_chapter_outline_node(chapter_index)
                 self.debug_log(f"✅ 第{chapter_index+1}章大綱已更新")
                 edit_window.destroy()
             except json.JSONDecodeError:
@@ -3255,7 +4679,7 @@ class NovelWriterGUI:
         text_frame = ttk.Frame(edit_window)
         text_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
-        text_widget = scrolledtext.ScrolledText(text_frame, wrap=tk.WORD, font=("Microsoft YaHei", 12))
+        text_widget = scrolledtext.ScrolledText(text_frame, wrap=tk.WORD, font="nw.content")
         text_widget.pack(fill=tk.BOTH, expand=True)
         text_widget.insert(tk.END, paragraph.content)
         
@@ -3265,14 +4689,21 @@ class NovelWriterGUI:
         
         def save_content():
             new_content = text_widget.get(1.0, tk.END).strip()
+            if new_content == paragraph.content:
+                # 內容未修改，不需要更新狀態與樹視圖
+                edit_window.destroy()
+                return
+            
             paragraph.content = new_content
             paragraph.word_count = len(new_content)
+            self.core.invalidate_write_cache(chapter_index, paragraph_index)
             if new_content:
                 paragraph.status = CreationStatus.COMPLETED
             else:
                 paragraph.status = CreationStatus.NOT_STARTED
+            chapter.mark_paragraphs_changed()
             
-            self.refresh_tree()
+            self.refresh_paragraph_node(chapter_index, paragraph_index)
             self.update_paragraph_list()
             self.debug_log(f"✅ 第{chapter_index+1}章第{paragraph_index+1}段內容已更新")
             edit_window.destroy()
@@ -3283,6 +4714,20 @@ class NovelWriterGUI:
         ttk.Button(button_frame, text="保存", command=save_content).pack(side=tk.RIGHT, padx=(5, 0))
         ttk.Button(button_frame, text="取消", command=cancel_edit).pack(side=tk.RIGHT)
     
+    def _submit_regeneration(self, key: tuple, task: Callable, label: str):
+        """提交重新生成任務到執行緒池，同一項目已在重新生成時不重複提交"""
+        running = self._regenerating.get(key)
+        if running is not None and not running.done():
+            self.debug_log(f"⏳ {label}正在重新生成中，略過重複請求")
+            return
+        
+        def on_done(future: Future):
+            if self._regenerating.get(key) is future:
+                del self._regenerating[key]
+            self._log_task_exception(future)
+        
+        self._regenerating[key] = self.submit_task(task, on_done=on_done)
+    
     def _regenerate_chapter_outline(self, chapter_index):
         """重新生成章節大綱"""
         if chapter_index is None or chapter_index >= len(self.project.chapters):
@@ -3292,13 +4737,13 @@ class NovelWriterGUI:
             try:
                 self.debug_log(f"🔄 重新生成第{chapter_index+1}章大綱")
                 self.core.generate_chapter_outline(chapter_index)
-                self.root.after(0, self.refresh_tree)
+                self.schedule_refresh()
                 self.debug_log(f"✅ 第{chapter_index+1}章大綱重新生成完成")
             except Exception as e:
                 self.debug_log(f"❌ 重新生成第{chapter_index+1}章大綱失敗: {str(e)}")
                 self.root.after(0, lambda: messagebox.showerror("錯誤", f"重新生成失敗: {str(e)}"))
         
-        threading.Thread(target=run_task, daemon=True).start()
+        self._submit_regeneration((chapter_index, None), run_task, f"第{chapter_index+1}章大綱")
     
     def _regenerate_paragraph(self, chapter_index, paragraph_index):
         """重新生成段落內容"""
@@ -3312,7 +4757,7 @@ class NovelWriterGUI:
                 self.debug_log(f"🔄 重新生成第{chapter_index+1}章第{paragraph_index+1}段")
                 content = self.core.write_paragraph(chapter_index, paragraph_index)
                 if content:
-                    self.root.after(0, self.refresh_tree)
+                    self._dispatch_to_main(self.refresh_paragraph_node, chapter_index, paragraph_index)
                     self.root.after(0, self.update_paragraph_list)
                     self.root.after(0, self.update_world_display)
                     self.debug_log(f"✅ 第{chapter_index+1}章第{paragraph_index+1}段重新生成完成")
@@ -3322,47 +4767,107 @@ class NovelWriterGUI:
                 self.debug_log(f"❌ 重新生成第{chapter_index+1}章第{paragraph_index+1}段失敗: {str(e)}")
                 self.root.after(0, lambda: messagebox.showerror("錯誤", f"重新生成失敗: {str(e)}"))
         
-        threading.Thread(target=run_task, daemon=True).start()
+        self._submit_regeneration((chapter_index, paragraph_index), run_task,
+                                  f"第{chapter_index+1}章第{paragraph_index+1}段")
     
     def initialize_default_tree(self):
         """初始化預設樹結構"""
         # 清空樹
         for item in self.tree.get_children():
             self.tree.delete(item)
+        self._unpopulated_tree_nodes.clear()
+        self._default_chapter_nodes.clear()
+        self._node_meta.clear()
+        self._tree_root_node = None
         
-        # 創建預設根節點
-        project_title = self.project.title if self.project.title else "新小說項目"
-        root_node = self.tree.insert("", "end", text=f"📖 {project_title}", 
-                                     values=("未開始", "0"), tags=("root",))
-        
-        # 創建預設大綱節點
-        outline_node = self.tree.insert(root_node, "end", text="📋 整體大綱", 
-                                       values=("未開始", "0"), tags=("outline",))
-        
-        # 創建預設章節節點（3個示例章節）
-        for i in range(3):
-            chapter_node = self.tree.insert(root_node, "end", 
-                                           text=f"📚 第{i+1}章: 待定", 
-                                           values=("未開始", "0"), 
-                                           tags=("chapter", f"chapter_{i}"))
-            
-            # 為每個章節添加預設大綱節點
-            self.tree.insert(chapter_node, "end", text="📝 章節大綱", 
-                           values=("未開始", "0"), 
-                           tags=("chapter_outline", f"chapter_{i}"))
-            
-            # 為每個章節添加預設段落節點（3個示例段落）
-            for j in range(3):
-                self.tree.insert(chapter_node, "end", 
-                               text=f"📄 第{j+1}段: 待定", 
-                               values=("未開始", "0"), 
-                               tags=("paragraph", f"chapter_{i}", f"paragraph_{j}"))
+        insert = self.tree.insert
+        node_meta = self._node_meta
+        default_values = self.DEFAULT_NODE_VALUES
         
-        # 展開根節點
-        self.tree.item(root_node, open=True)
+        # 創建預設根節點（建立時即設為展開）
+        project_title = self.project.title if self.project.title else "新小說項目"
+        root_node = insert("", "end", text=f"📖 {project_title}", 
+                           values=default_values, tags=("root",), open=True)
+        
+        # 根節點在建立子節點期間暫時分離，結束後一次性佈局
+        with self._bulk_tree_update(root_node):
+            # 創建預設大綱節點
+            insert(root_node, "end", text="📋 整體大綱", 
+                   values=default_values, tags=("outline",))
+            
+            # 創建預設章節節點（3個示例章節）
+            for i in range(3):
+                chapter_node = insert(root_node, "end", 
+                                      text=f"📚 第{i+1}章: 待定", 
+                                      values=default_values, 
+                                      tags=("chapter", f"chapter_{i}"))
+                node_meta[chapter_node] = (i, None)
+                
+                # 章節大綱與3個示例段落延遲到展開時才建立
+                self._defer_default_chapter_children(chapter_node)
+        self._next_chapter_index = 3
         
         self.debug_log("🌳 預設樹結構已初始化")
     
+    def _build_input_dialog(self):
+        """建立單行輸入對話框（關閉時只隱藏，之後重複使用）"""
+        dialog = tk.Toplevel(self.root)
+        dialog.withdraw()
+        dialog.transient(self.root)
+        dialog.resizable(False, False)
+        
+        self._input_var = tk.StringVar()
+        self._input_done = tk.BooleanVar(value=False)
+        self._input_result = None
+        
+        def finish(result):
+            self._input_result = result
+            self._input_done.set(True)
+        
+        self._input_prompt = ttk.Label(dialog)
+        self._input_prompt.pack(anchor=tk.W, padx=10, pady=(10, 5))
+        self._input_entry = ttk.Entry(dialog, textvariable=self._input_var, width=40)
+        self._input_entry.pack(fill=tk.X, padx=10)
+        
+        button_frame = ttk.Frame(dialog)
+        button_frame.pack(fill=tk.X, padx=10, pady=10)
+        ttk.Button(button_frame, text="確定", 
+                  command=lambda: finish(self._input_var.get())).pack(side=tk.RIGHT, padx=(5, 0))
+        ttk.Button(button_frame, text="取消", 
+                  command=lambda: finish(None)).pack(side=tk.RIGHT)
+        
+        dialog.bind("<Return>", lambda e: finish(self._input_var.get()))
+        dialog.bind("<Escape>", lambda e: finish(None))
+        dialog.protocol("WM_DELETE_WINDOW", lambda: finish(None))
+        
+        self._input_dialog = dialog
+    
+    def ask_string(self, title: str, prompt: str, initialvalue: str = "") -> Optional[str]:
+        """以可重複使用的對話框詢問一行文字，取消時返回None"""
+        if self._input_dialog is None:
+            self._build_input_dialog()
+        
+        dialog = self._input_dialog
+        dialog.title(title)
+        self._input_prompt.configure(text=prompt)
+        self._input_var.set(initialvalue)
+        self._input_result = None
+        self._input_done.set(False)
+        
+        dialog.geometry(f"+{self.root.winfo_rootx() + 50}+{self.root.winfo_rooty() + 50}")
+        dialog.deiconify()
+        dialog.lift()
+        self._input_entry.focus_set()
+        self._input_entry.select_range(0, tk.END)
+        dialog.grab_set()
+        try:
+            dialog.wait_variable(self._input_done)
+        finally:
+            dialog.grab_release()
+            dialog.withdraw()
+        
+        return self._input_result
+    
     def add_chapter_node(self):
         """添加章節節點"""
         selection = self.tree.selection()
@@ -3390,36 +4895,25 @@ class NovelWriterGUI:
                     messagebox.showerror("錯誤", "找不到根節點")
                     return
         
-        # 計算新章節的索引
-        chapter_count = 0
-        for child in self.tree.get_children(parent_item):
-            child_tags = self.tree.item(child, "tags")
-            if any(tag.startswith("chapter_") for tag in child_tags):
-                chapter_count += 1
+        # 新章節的索引
+        chapter_count = self._next_chapter_index
         
         # 彈出對話框讓用戶輸入章節標題
-        title = tk.simpledialog.askstring("添加章節", "請輸入章節標題:", 
-                                         initialvalue=f"第{chapter_count+1}章")
+        title = self.ask_string("添加章節", "請輸入章節標題:", 
+                                initialvalue=f"第{chapter_count+1}章")
         if not title:
             return
         
         # 添加章節節點
         chapter_node = self.tree.insert(parent_item, "end", 
                                        text=f"📚 {title}", 
-                                       values=("未開始", "0"), 
+                                       values=self.DEFAULT_NODE_VALUES, 
                                        tags=("chapter", f"chapter_{chapter_count}"))
+        self._node_meta[chapter_node] = (chapter_count, None)
+        self._next_chapter_index = chapter_count + 1
         
-        # 添加章節大綱節點
-        self.tree.insert(chapter_node, "end", text="📝 章節大綱", 
-                       values=("未開始", "0"), 
-                       tags=("chapter_outline", f"chapter_{chapter_count}"))
-        
-        # 添加預設段落節點
-        for j in range(3):
-            self.tree.insert(chapter_node, "end", 
-                           text=f"📄 第{j+1}段: 待定", 
-                           values=("未開始", "0"), 
-                           tags=("paragraph", f"chapter_{chapter_count}", f"paragraph_{j}"))
+        # 章節大綱與預設段落節點延遲到展開時才建立
+        self._defer_default_chapter_children(chapter_node)
         
         # 同時在項目數據中添加章節
         if chapter_count >= len(self.project.chapters):
@@ -3438,6 +4932,7 @@ class NovelWriterGUI:
                 new_chapter.paragraphs.append(paragraph)
             
             self.project.chapters.append(new_chapter)
+            self.invalidate_chapter_labels()
         
         self.debug_log(f"✅ 已添加章節: {title}")
         self.update_chapter_list()
@@ -3450,17 +4945,16 @@ class NovelWriterGUI:
             return
         
         item = selection[0]
-        tags = self.tree.item(item, "tags")
+        kind = self._node_kind(self.tree.item(item, "tags"))
         
         # 確定父章節
         chapter_index = None
-        if "chapter" in tags:
+        if kind == "chapter":
             parent_item = item
-            chapter_index = self._extract_chapter_index(tags)
-        elif "paragraph" in tags or "chapter_outline" in tags:
+            chapter_index = self._get_node_indices(item)[0]
+        elif kind == "paragraph" or kind == "chapter_outline":
             parent_item = self.tree.parent(item)
-            parent_tags = self.tree.item(parent_item, "tags")
-            chapter_index = self._extract_chapter_index(parent_tags)
+            chapter_index = self._get_node_indices(parent_item)[0]
         else:
             messagebox.showwarning("提示", "請選擇章節或段落節點")
             return
@@ -3469,24 +4963,26 @@ class NovelWriterGUI:
             messagebox.showerror("錯誤", "無法確定章節索引")
             return
         
-        # 計算新段落的索引
-        paragraph_count = 0
-        for child in self.tree.get_children(parent_item):
-            child_tags = self.tree.item(child, "tags")
-            if "paragraph" in child_tags:
-                paragraph_count += 1
+        # 確保章節的段落節點已載入
+        self._populate_tree_node(parent_item)
+        
+        # 計算新段落的索引（段落節點在索引表中帶有段落索引）
+        node_meta = self._node_meta
+        paragraph_count = sum(1 for child in self.tree.get_children(parent_item)
+                              if node_meta.get(child, (None, None))[1] is not None)
         
         # 彈出對話框讓用戶輸入段落目的
-        purpose = tk.simpledialog.askstring("添加段落", "請輸入段落目的:", 
-                                           initialvalue=f"第{paragraph_count+1}段內容")
+        purpose = self.ask_string("添加段落", "請輸入段落目的:", 
+                                  initialvalue=f"第{paragraph_count+1}段內容")
         if not purpose:
             return
         
         # 添加段落節點
         para_node = self.tree.insert(parent_item, "end", 
                                    text=f"📄 第{paragraph_count+1}段: {purpose[:20]}...", 
-                                   values=("未開始", "0"), 
+                                   values=self.DEFAULT_NODE_VALUES, 
                                    tags=("paragraph", f"chapter_{chapter_index}", f"paragraph_{paragraph_count}"))
+        self._node_meta[para_node] = (chapter_index, paragraph_count)
         
         # 同時在項目數據中添加段落
         if chapter_index < len(self.project.chapters):
@@ -3498,6 +4994,7 @@ class NovelWriterGUI:
                     estimated_words=400
                 )
                 chapter.paragraphs.append(new_paragraph)
+                chapter.mark_paragraphs_changed()
         
         self.debug_log(f"✅ 已添加段落: {purpose}")
         self.update_paragraph_list()
@@ -3510,15 +5007,18 @@ class NovelWriterGUI:
             return
         
         item = selection[0]
-        tags = self.tree.item(item, "tags")
-        item_text = self.tree.item(item, "text")
+        # 一次取得節點的全部選項
+        info = self.tree.item(item)
+        tags = info["tags"]
+        item_text = info["text"]
+        kind = self._node_kind(tags)
         
         # 不允許刪除根節點和整體大綱
-        if "root" in tags:
+        if kind == "root":
             messagebox.showwarning("提示", "不能刪除根節點")
             return
         
-        if "outline" in tags and "chapter_outline" not in tags:
+        if kind == "outline":
             messagebox.showwarning("提示", "不能刪除整體大綱節點")
             return
         
@@ -3526,41 +5026,47 @@ class NovelWriterGUI:
         if not messagebox.askyesno("確認刪除", f"確定要刪除「{item_text}」嗎？\n此操作不可撤銷。"):
             return
         
+        chapter_index, paragraph_index = self._get_node_indices(item, tags)
+        
+        # 先刪除樹節點，重新整理索引時才不會把它算進去
+        for child in self.tree.get_children(item):
+            self._node_meta.pop(child, None)
+        self._node_meta.pop(item, None)
+        self.tree.delete(item)
+        self._unpopulated_tree_nodes.discard(item)
+        self._default_chapter_nodes.discard(item)
+        
         # 根據節點類型進行刪除
-        if "chapter" in tags and "chapter_outline" not in tags:
+        if kind == "chapter":
             # 刪除章節
-            chapter_index = self._extract_chapter_index(tags)
             if chapter_index is not None and chapter_index < len(self.project.chapters):
                 del self.project.chapters[chapter_index]
+                self.invalidate_chapter_labels()
                 self.debug_log(f"✅ 已刪除章節: {item_text}")
+            
+            # 重新整理章節索引（預設樹的章節沒有項目數據，也需要更新）
+            self._reindex_chapters()
                 
-                # 重新整理章節索引
-                self._reindex_chapters()
-                
-        elif "paragraph" in tags:
+        elif kind == "paragraph":
             # 刪除段落
-            chapter_index = self._extract_chapter_index(tags)
-            paragraph_index = self._extract_paragraph_index(tags)
             if (chapter_index is not None and paragraph_index is not None and 
                 chapter_index < len(self.project.chapters) and 
                 paragraph_index < len(self.project.chapters[chapter_index].paragraphs)):
                 
-                del self.project.chapters[chapter_index].paragraphs[paragraph_index]
+                chapter = self.project.chapters[chapter_index]
+                del chapter.paragraphs[paragraph_index]
+                chapter.mark_paragraphs_changed()
                 self.debug_log(f"✅ 已刪除段落: {item_text}")
                 
                 # 重新整理段落索引
                 self._reindex_paragraphs(chapter_index)
         
-        elif "chapter_outline" in tags:
+        elif kind == "chapter_outline":
             # 刪除章節大綱（清空大綱內容）
-            chapter_index = self._extract_chapter_index(tags)
             if chapter_index is not None and chapter_index < len(self.project.chapters):
                 self.project.chapters[chapter_index].outline = {}
                 self.debug_log(f"✅ 已清空第{chapter_index+1}章大綱")
         
-        # 刪除樹節點
-        self.tree.delete(item)
-        
         # 更新相關UI
         self.update_chapter_list()
         self.update_paragraph_list()
@@ -3568,84 +5074,81 @@ class NovelWriterGUI:
     def _reindex_chapters(self):
         """重新整理章節索引"""
         # 更新樹視圖中的章節標籤
-        root_items = self.tree.get_children()
+        get_children = self.tree.get_children
+        tree_item = self.tree.item
+        node_meta = self._node_meta
+        
+        root_items = get_children()
         if not root_items:
             return
         
-        root_item = root_items[0]
+        # 每個節點只讀取一次標籤
         chapter_nodes = []
-        
-        for child in self.tree.get_children(root_item):
-            child_tags = self.tree.item(child, "tags")
+        for child in get_children(root_items[0]):
+            child_tags = tree_item(child, "tags")
             if any(tag.startswith("chapter_") for tag in child_tags):
-                chapter_nodes.append(child)
+                chapter_nodes.append((child, child_tags))
+        self._next_chapter_index = len(chapter_nodes)
         
         # 重新設置章節標籤
-        for i, chapter_node in enumerate(chapter_nodes):
-            old_tags = list(self.tree.item(chapter_node, "tags"))
-            new_tags = []
-            for tag in old_tags:
-                if tag.startswith("chapter_"):
-                    new_tags.append(f"chapter_{i}")
-                else:
-                    new_tags.append(tag)
-            
-            self.tree.item(chapter_node, tags=tuple(new_tags))
+        for i, (chapter_node, old_tags) in enumerate(chapter_nodes):
+            chapter_tag = f"chapter_{i}"
+            tree_item(chapter_node, tags=tuple(
+                chapter_tag if tag.startswith("chapter_") else tag for tag in old_tags))
+            if chapter_node in node_meta:
+                node_meta[chapter_node] = (i, None)
             
             # 更新子節點的標籤
-            for child in self.tree.get_children(chapter_node):
-                child_tags = list(self.tree.item(child, "tags"))
-                updated_child_tags = []
-                for tag in child_tags:
-                    if tag.startswith("chapter_"):
-                        updated_child_tags.append(f"chapter_{i}")
-                    else:
-                        updated_child_tags.append(tag)
-                
-                self.tree.item(child, tags=tuple(updated_child_tags))
+            for child in get_children(chapter_node):
+                tree_item(child, tags=tuple(
+                    chapter_tag if tag.startswith("chapter_") else tag
+                    for tag in tree_item(child, "tags")))
+                child_meta = node_meta.get(child)
+                if child_meta is not None:
+                    node_meta[child] = (i, child_meta[1])
     
     def _reindex_paragraphs(self, chapter_index):
         """重新整理指定章節的段落索引"""
-        root_items = self.tree.get_children()
+        get_children = self.tree.get_children
+        tree_item = self.tree.item
+        node_meta = self._node_meta
+        
+        root_items = get_children()
         if not root_items:
             return
         
-        root_item = root_items[0]
-        chapter_node = None
-        
         # 找到對應的章節節點
-        for child in self.tree.get_children(root_item):
-            child_tags = self.tree.item(child, "tags")
-            if f"chapter_{chapter_index}" in child_tags:
+        chapter_tag = f"chapter_{chapter_index}"
+        chapter_node = None
+        for child in get_children(root_items[0]):
+            if chapter_tag in tree_item(child, "tags"):
                 chapter_node = child
                 break
         
         if not chapter_node:
             return
         
-        # 重新整理段落索引
+        # 重新整理段落索引（每個節點只讀取一次標籤）
         paragraph_nodes = []
-        for child in self.tree.get_children(chapter_node):
-            child_tags = self.tree.item(child, "tags")
+        for child in get_children(chapter_node):
+            child_tags = tree_item(child, "tags")
             if "paragraph" in child_tags:
-                paragraph_nodes.append(child)
+                paragraph_nodes.append((child, child_tags))
+        
+        paragraphs = (self.project.chapters[chapter_index].paragraphs
+                      if chapter_index < len(self.project.chapters) else [])
         
         # 重新設置段落標籤和order
-        for i, para_node in enumerate(paragraph_nodes):
-            old_tags = list(self.tree.item(para_node, "tags"))
-            new_tags = []
-            for tag in old_tags:
-                if tag.startswith("paragraph_"):
-                    new_tags.append(f"paragraph_{i}")
-                else:
-                    new_tags.append(tag)
-            
-            self.tree.item(para_node, tags=tuple(new_tags))
+        for i, (para_node, old_tags) in enumerate(paragraph_nodes):
+            paragraph_tag = f"paragraph_{i}"
+            tree_item(para_node, tags=tuple(
+                paragraph_tag if tag.startswith("paragraph_") else tag for tag in old_tags))
+            if para_node in node_meta:
+                node_meta[para_node] = (chapter_index, i)
             
             # 更新項目數據中的段落order
-            if (chapter_index < len(self.project.chapters) and 
-                i < len(self.project.chapters[chapter_index].paragraphs)):
-                self.project.chapters[chapter_index].paragraphs[i].order = i
+            if i < len(paragraphs):
+                paragraphs[i].order = i
     
     # 新增的增強功能方法
     def open_global_config(self):
@@ -3659,6 +5162,9 @@ class NovelWriterGUI:
         notebook = ttk.Notebook(config_window)
         notebook.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
+        # 各表單欄位的變數：配置屬性 -> tk變數
+        self._config_vars = {}
+        
         # 基本風格頁面
         self.setup_style_tab(notebook)
         
@@ -3680,103 +5186,67 @@ class NovelWriterGUI:
         ttk.Button(button_frame, text="取消", 
                   command=config_window.destroy).pack(side=tk.RIGHT)
     
+    def _build_config_fields(self, frame, config_fields, config):
+        """依欄位定義逐行建立標籤與輸入元件，變數登記到 self._config_vars"""
+        for row, (label, attr, kind, options) in enumerate(config_fields):
+            ttk.Label(frame, text=f"{label}:").grid(row=row, column=0, sticky=tk.W, padx=10, pady=5)
+            
+            value = getattr(config, attr)
+            if kind == "spin":
+                var = tk.IntVar(value=value)
+                from_, to, increment = options
+                widget = ttk.Spinbox(frame, from_=from_, to=to, increment=increment, textvariable=var)
+            else:
+                var = tk.StringVar(value=value.value if isinstance(value, Enum) else value)
+                if kind == "combo":
+                    widget = ttk.Combobox(frame, textvariable=var, values=options, state="readonly")
+                else:
+                    widget = ttk.Entry(frame, textvariable=var)
+            
+            widget.grid(row=row, column=1, sticky=tk.W+tk.E, padx=10, pady=5)
+            self._config_vars[attr] = var
+        
+        frame.columnconfigure(1, weight=1)
+    
     def setup_style_tab(self, notebook):
         """設置風格配置頁面"""
         style_frame = ttk.Frame(notebook)
         notebook.add(style_frame, text="寫作風格")
         
-        # 敘述方式
-        ttk.Label(style_frame, text="敘述方式:").grid(row=0, column=0, sticky=tk.W, padx=10, pady=5)
-        self.writing_style_var = tk.StringVar(value=self.core.project.global_config.writing_style.value)
-        style_combo = ttk.Combobox(style_frame, textvariable=self.writing_style_var,
-                                  values=[style.value for style in WritingStyle], state="readonly")
-        style_combo.grid(row=0, column=1, sticky=tk.W+tk.E, padx=10, pady=5)
-        
-        # 節奏風格
-        ttk.Label(style_frame, text="節奏風格:").grid(row=1, column=0, sticky=tk.W, padx=10, pady=5)
-        self.pacing_style_var = tk.StringVar(value=self.core.project.global_config.pacing_style.value)
-        pacing_combo = ttk.Combobox(style_frame, textvariable=self.pacing_style_var,
-                                   values=[style.value for style in PacingStyle], state="readonly")
-        pacing_combo.grid(row=1, column=1, sticky=tk.W+tk.E, padx=10, pady=5)
-        
-        # 語調
-        ttk.Label(style_frame, text="整體語調:").grid(row=2, column=0, sticky=tk.W, padx=10, pady=5)
-        self.tone_var = tk.StringVar(value=self.core.project.global_config.tone)
-        tone_entry = ttk.Entry(style_frame, textvariable=self.tone_var)
-        tone_entry.grid(row=2, column=1, sticky=tk.W+tk.E, padx=10, pady=5)
-        
-        # 對話風格
-        ttk.Label(style_frame, text="對話風格:").grid(row=3, column=0, sticky=tk.W, padx=10, pady=5)
-        self.dialogue_style_var = tk.StringVar(value=self.core.project.global_config.dialogue_style)
-        dialogue_entry = ttk.Entry(style_frame, textvariable=self.dialogue_style_var)
-        dialogue_entry.grid(row=3, column=1, sticky=tk.W+tk.E, padx=10, pady=5)
-        
-        # 描述密度
-        ttk.Label(style_frame, text="描述密度:").grid(row=4, column=0, sticky=tk.W, padx=10, pady=5)
-        self.description_density_var = tk.StringVar(value=self.core.project.global_config.description_density)
-        desc_combo = ttk.Combobox(style_frame, textvariable=self.description_density_var,
-                                 values=["簡潔", "適中", "豐富"], state="readonly")
-        desc_combo.grid(row=4, column=1, sticky=tk.W+tk.E, padx=10, pady=5)
-        
-        # 情感強度
-        ttk.Label(style_frame, text="情感強度:").grid(row=5, column=0, sticky=tk.W, padx=10, pady=5)
-        self.emotional_intensity_var = tk.StringVar(value=self.core.project.global_config.emotional_intensity)
-        emotion_combo = ttk.Combobox(style_frame, textvariable=self.emotional_intensity_var,
-                                    values=["克制", "適中", "濃烈"], state="readonly")
-        emotion_combo.grid(row=5, column=1, sticky=tk.W+tk.E, padx=10, pady=5)
-        
-        style_frame.columnconfigure(1, weight=1)
+        self._build_config_fields(style_frame, self.STYLE_CONFIG_FIELDS,
+                                  self.core.project.global_config)
     
     def setup_continuous_elements_tab(self, notebook):
         """設置持續要素頁面"""
         elements_frame = ttk.Frame(notebook)
         notebook.add(elements_frame, text="持續要素")
+        global_config = self.core.project.global_config
         
         # 核心主題
         ttk.Label(elements_frame, text="核心主題（每行一個）:").pack(anchor=tk.W, padx=10, pady=5)
         self.themes_text = scrolledtext.ScrolledText(elements_frame, height=4)
         self.themes_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
-        self.themes_text.insert(tk.END, '\n'.join(self.core.project.global_config.continuous_themes))
+        self.themes_text.insert(tk.END, '\n'.join(global_config.continuous_themes))
         
         # 必須包含要素
         ttk.Label(elements_frame, text="必須包含要素（每行一個）:").pack(anchor=tk.W, padx=10, pady=5)
         self.must_include_text = scrolledtext.ScrolledText(elements_frame, height=4)
         self.must_include_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
-        self.must_include_text.insert(tk.END, '\n'.join(self.core.project.global_config.must_include_elements))
+        self.must_include_text.insert(tk.END, '\n'.join(global_config.must_include_elements))
         
         # 避免要素
         ttk.Label(elements_frame, text="避免要素（每行一個）:").pack(anchor=tk.W, padx=10, pady=5)
         self.avoid_text = scrolledtext.ScrolledText(elements_frame, height=4)
         self.avoid_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
-        self.avoid_text.insert(tk.END, '\n'.join(self.core.project.global_config.avoid_elements))
+        self.avoid_text.insert(tk.END, '\n'.join(global_config.avoid_elements))
     
     def setup_length_control_tab(self, notebook):
         """設置篇幅控制頁面"""
         length_frame = ttk.Frame(notebook)
         notebook.add(length_frame, text="篇幅控制")
         
-        # 章節目標字數
-        ttk.Label(length_frame, text="章節目標字數:").grid(row=0, column=0, sticky=tk.W, padx=10, pady=5)
-        self.target_chapter_words_var = tk.IntVar(value=self.core.project.global_config.target_chapter_words)
-        chapter_spinbox = ttk.Spinbox(length_frame, from_=1000, to=10000, increment=500,
-                                     textvariable=self.target_chapter_words_var)
-        chapter_spinbox.grid(row=0, column=1, sticky=tk.W+tk.E, padx=10, pady=5)
-        
-        # 段落目標字數
-        ttk.Label(length_frame, text="段落目標字數:").grid(row=1, column=0, sticky=tk.W, padx=10, pady=5)
-        self.target_paragraph_words_var = tk.IntVar(value=self.core.project.global_config.target_paragraph_words)
-        paragraph_spinbox = ttk.Spinbox(length_frame, from_=100, to=1000, increment=50,
-                                       textvariable=self.target_paragraph_words_var)
-        paragraph_spinbox.grid(row=1, column=1, sticky=tk.W+tk.E, padx=10, pady=5)
-        
-        # 段落數量偏好
-        ttk.Label(length_frame, text="段落數量偏好:").grid(row=2, column=0, sticky=tk.W, padx=10, pady=5)
-        self.paragraph_count_var = tk.StringVar(value=self.core.project.global_config.paragraph_count_preference)
-        count_combo = ttk.Combobox(length_frame, textvariable=self.paragraph_count_var,
-                                  values=["簡潔", "適中", "詳細"], state="readonly")
-        count_combo.grid(row=2, column=1, sticky=tk.W+tk.E, padx=10, pady=5)
-        
-        length_frame.columnconfigure(1, weight=1)
+        self._build_config_fields(length_frame, self.LENGTH_CONFIG_FIELDS,
+                                  self.core.project.global_config)
     
     def setup_global_instructions_tab(self, notebook):
         """設置全局指示頁面"""
@@ -3799,35 +5269,39 @@ class NovelWriterGUI:
         """
         
         tips_label = tk.Label(instructions_frame, text=tips_text, justify=tk.LEFT, 
-                             fg="gray", font=("Microsoft YaHei", 9))
+                             fg="gray", font="nw.body")
         tips_label.pack(anchor=tk.W, padx=10, pady=(5, 10))
     
     def save_global_config(self, window):
         """保存全局配置"""
-        # 收集所有配置
-        themes = [line.strip() for line in self.themes_text.get("1.0", tk.END).split('\n') if line.strip()]
-        must_include = [line.strip() for line in self.must_include_text.get("1.0", tk.END).split('\n') if line.strip()]
-        avoid = [line.strip() for line in self.avoid_text.get("1.0", tk.END).split('\n') if line.strip()]
+        global_config = self.core.project.global_config
+        
+        # 收集表單欄位，枚舉類型的屬性轉回對應的枚舉值
+        payload = {}
+        for attr, var in self._config_vars.items():
+            value = var.get()
+            current = getattr(global_config, attr)
+            payload[attr] = current.__class__(value) if isinstance(current, Enum) else value
+        
+        # 收集持續要素與全局指導
+        payload["continuous_themes"] = self._text_lines(self.themes_text)
+        payload["must_include_elements"] = self._text_lines(self.must_include_text)
+        payload["avoid_elements"] = self._text_lines(self.avoid_text)
+        payload["global_instructions"] = self.global_instructions_text.get("1.0", "end-1c").strip()
+        
+        # 只套用有變動的項目，全部未變動時不重建prompt構建器
+        changed = {key: value for key, value in payload.items()
+                   if getattr(global_config, key) != value}
+        if not changed:
+            self.debug_log("ℹ️ 全局配置未修改，略過保存")
+            window.destroy()
+            return
         
         # 更新核心配置
-        self.core.set_global_config(
-            writing_style=WritingStyle(self.writing_style_var.get()),
-            pacing_style=PacingStyle(self.pacing_style_var.get()),
-            tone=self.tone_var.get(),
-            dialogue_style=self.dialogue_style_var.get(),
-            description_density=self.description_density_var.get(),
-            emotional_intensity=self.emotional_intensity_var.get(),
-            continuous_themes=themes,
-            must_include_elements=must_include,
-            avoid_elements=avoid,
-            target_chapter_words=self.target_chapter_words_var.get(),
-            target_paragraph_words=self.target_paragraph_words_var.get(),
-            paragraph_count_preference=self.paragraph_count_var.get(),
-            global_instructions=self.global_instructions_text.get("1.0", tk.END).strip()
-        )
+        self.core.set_global_config(**changed)
         
         # 同步快速設定
-        self.quick_style_var.set(self.writing_style_var.get())
+        self.quick_style_var.set(payload["writing_style"].value)
         
         self.debug_log("✅ 全局配置已更新")
         messagebox.showinfo("成功", "全局配置已保存！")
@@ -3907,8 +5381,8 @@ class NovelWriterGUI:
         messagebox.showinfo("成功", "階段配置已保存！")
         window.destroy()
     
-    def enhanced_write_paragraph(self):
-        """增強版段落寫作"""
+    def enhanced_write_paragraph(self, prompt_override: Optional[str] = None):
+        """增強版段落寫作，prompt_override 提供時取代額外指示欄位的內容"""
         chapter_index = self.chapter_combo.current()
         paragraph_index = self.paragraph_combo.current()
         
@@ -3917,9 +5391,13 @@ class NovelWriterGUI:
             return
         
         # 收集當前設定
-        additional_prompt = self.current_paragraph_prompt.get("1.0", tk.END).strip()
+        if prompt_override is not None:
+            additional_prompt = prompt_override
+        else:
+            additional_prompt = self.current_paragraph_prompt.get("1.0", tk.END).strip()
         target_words = int(self.target_words_var.get())
         strict_words = self.strict_words_var.get()
+        use_cache = not self.ignore_cache_var.get()
         
         # 更新段落配置
         self.core.set_stage_config(
@@ -3929,9 +5407,11 @@ class NovelWriterGUI:
         )
         
         # 更新段落目標字數
-        if chapter_index < len(self.project.chapters):
-            if paragraph_index < len(self.project.chapters[chapter_index].paragraphs):
-                self.project.chapters[chapter_index].paragraphs[paragraph_index].estimated_words = target_words
+        chapters = self.project.chapters
+        if chapter_index < len(chapters):
+            paragraphs = chapters[chapter_index].paragraphs
+            if paragraph_index < len(paragraphs):
+                paragraphs[paragraph_index].estimated_words = target_words
         
         def run_task():
             try:
@@ -3941,14 +5421,12 @@ class NovelWriterGUI:
                 self.debug_log(f"📏 目標字數: {target_words}字，嚴格控制: {strict_words}")
                 
                 content = self.core.write_paragraph(
-                    chapter_index, paragraph_index, self.tree_callback, self.selected_context_content
+                    chapter_index, paragraph_index, self.tree_callback, self.selected_context_content,
+                    stream, use_cache=use_cache
                 )
                 
                 if content:
-                    self.root.after(0, lambda: self.display_paragraph_content(content))
-                    self.root.after(0, self.update_paragraph_list)
-                    self.root.after(0, self.update_world_display)
-                    self.root.after(0, self.refresh_tree)
+                    self.root.after(0, self._on_paragraph_written, chapter_index, paragraph_index, content)
                     self.debug_log(f"✅ 第{chapter_index+1}章第{paragraph_index+1}段智能寫作完成")
                 else:
                     self.debug_log(f"❌ 第{chapter_index+1}章第{paragraph_index+1}段智能寫作失敗")
@@ -3959,15 +5437,77 @@ class NovelWriterGUI:
             finally:
                 self.current_action = ""
         
-        threading.Thread(target=run_task, daemon=True).start()
+        # 串流顯示生成中的內容，完成後再以格式化結果取代
+        self._begin_stream_display()
+        stream = self._paragraph_stream()
+        self.submit_task(run_task)
+    
+    def write_all_empty_paragraphs(self):
+        """寫作所有章節中尚無內容的段落：不同章節並行，同一章內依序寫作以保持前文連貫"""
+        pending = deque()
+        for chapter_index, chapter in enumerate(self.project.chapters):
+            indices = [i for i, paragraph in enumerate(chapter.paragraphs) if not paragraph.content]
+            if indices:
+                pending.append((chapter_index, indices))
+        
+        if not pending:
+            messagebox.showinfo("提示", "沒有需要寫作的空白段落")
+            return
+        
+        total = sum(len(indices) for _, indices in pending)
+        selected_context = self.selected_context_content
+        state = {"running": 0, "written": 0}
+        
+        self.current_action = f"正在寫作{total}個空白段落..."
+        self.debug_log(f"🚀 開始寫作{len(pending)}章中的{total}個空白段落，"
+                       f"最多同時寫作{self.PARALLEL_WRITE_CHAPTERS}章")
+        
+        def write_chapter(chapter_index: int, indices: List[int]) -> int:
+            written = 0
+            for paragraph_index in indices:
+                if self._closing:
+                    break
+                content = self.core.write_paragraph(
+                    chapter_index, paragraph_index, self.tree_callback, selected_context
+                )
+                if content:
+                    written += 1
+            return written
+        
+        def start_next():
+            # 章節任務完成後才提交下一章，避免長時間佔滿執行緒池
+            if not pending or self._closing:
+                return
+            chapter_index, indices = pending.popleft()
+            state["running"] += 1
+            self.submit_task(write_chapter, chapter_index, indices,
+                             on_done=lambda future: on_chapter_done(future, chapter_index))
+        
+        def on_chapter_done(future: Future, chapter_index: int):
+            state["running"] -= 1
+            try:
+                state["written"] += future.result()
+                self.debug_log(f"✅ 第{chapter_index+1}章空白段落寫作完成")
+            except Exception as e:
+                self.debug_log(f"❌ 第{chapter_index+1}章空白段落寫作失敗: {str(e)}")
+            
+            self.update_paragraph_list()
+            self.update_world_display()
+            start_next()
+            
+            if state["running"] == 0:
+                self.current_action = ""
+                self.debug_log(f"🏁 空白段落寫作結束，共寫作{state['written']}/{total}段")
+        
+        for _ in range(min(self.PARALLEL_WRITE_CHAPTERS, len(pending))):
+            start_next()
     
     def on_quick_style_change(self, event):
         """快速風格變更"""
         selected_style = self.quick_style_var.get()
-        for style in WritingStyle:
-            if style.value == selected_style:
-                self.core.set_global_config(writing_style=style)
-                break
+        style = _STYLE_BY_VALUE.get(selected_style)
+        if style is not None:
+            self.core.set_global_config(writing_style=style)
         self.debug_log(f"📝 快速設定敘述方式: {selected_style}")
     
     def on_quick_length_change(self, event):
@@ -3990,15 +5530,17 @@ class NovelWriterGUI:
     def use_selected_as_reference(self):
         """使用選中內容作為參考"""
         selected_text = ""
-        try:
-            # 嘗試獲取當前編輯區的選中文本
-            if self.content_text.tag_ranges(tk.SEL):
-                selected_text = self.content_text.get(tk.SEL_FIRST, tk.SEL_LAST)
-            else:
-                # 如果沒有選中，使用整個內容
-                selected_text = self.content_text.get("1.0", tk.END).strip()
-        except tk.TclError:
-            selected_text = self.content_text.get("1.0", tk.END).strip()
+        # 以索引判斷編輯區是否為空，避免空白時仍複製整段文字
+        if self.content_text.index("end-1c") != "1.0":
+            try:
+                # 嘗試獲取當前編輯區的選中文本
+                if self.content_text.tag_ranges(tk.SEL):
+                    selected_text = self.content_text.get(tk.SEL_FIRST, tk.SEL_LAST)
+                else:
+                    # 如果沒有選中，使用整個內容
+                    selected_text = self.content_text.get("1.0", "end-1c").strip()
+            except tk.TclError:
+                selected_text = self.content_text.get("1.0", "end-1c").strip()
         
         if selected_text:
             self.selected_context_content = selected_text
@@ -4023,19 +5565,22 @@ class NovelWriterGUI:
             return
         
         current_content = ""
-        if (chapter_index < len(self.project.chapters) and 
-            paragraph_index < len(self.project.chapters[chapter_index].paragraphs)):
-            current_content = self.project.chapters[chapter_index].paragraphs[paragraph_index].content
+        chapters = self.project.chapters
+        if chapter_index < len(chapters):
+            paragraphs = chapters[chapter_index].paragraphs
+            if paragraph_index < len(paragraphs):
+                current_content = paragraphs[paragraph_index].content
         
         if not current_content:
             messagebox.showwarning("提示", "此段落尚無內容，請先使用智能寫作")
             return
         
         # 添加優化提示到額外指示中
-        optimization_prompt = self.current_paragraph_prompt.get("1.0", tk.END).strip()
-        if optimization_prompt:
-            optimization_prompt += "\n\n"
-        optimization_prompt += f"""【重寫優化任務】
+        parts = []
+        base_prompt = self.current_paragraph_prompt.get("1.0", "end-1c").strip()
+        if base_prompt:
+            parts.append(base_prompt)
+        parts.append(f"""【重寫優化任務】
 請基於以下原始內容進行優化重寫：
 
 {current_content}
@@ -4044,19 +5589,11 @@ class NovelWriterGUI:
 1. 保持原意和情節發展
 2. 改善文字表達和流暢度
 3. 調整篇幅至目標字數
-4. 增強情感表達和畫面感"""
-        
-        # 臨時更新額外指示
-        original_prompt = self.current_paragraph_prompt.get("1.0", tk.END)
-        self.current_paragraph_prompt.delete("1.0", tk.END)
-        self.current_paragraph_prompt.insert("1.0", optimization_prompt)
-        
-        # 執行重寫
-        self.enhanced_write_paragraph()
+4. 增強情感表達和畫面感""")
+        optimization_prompt = "\n\n".join(parts)
         
-        # 恢復原始指示
-        self.current_paragraph_prompt.delete("1.0", tk.END)
-        self.current_paragraph_prompt.insert("1.0", original_prompt)
+        # 直接傳入優化指示執行重寫，不更動額外指示欄位
+        self.enhanced_write_paragraph(prompt_override=optimization_prompt)
     
     def toggle_prompt_area(self):
         """切換額外指示區域顯示"""